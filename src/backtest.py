@@ -0,0 +1,184 @@
+# FGI恐慌贪婪指数监控项目 - 历史回测模块
+# 用与监控完全相同的规则（rules_for：默认为上穿、连续2天、独立冷却、SELL_MAP）回放整段FGI历史
+
+import os
+import sys
+import time
+import argparse
+
+from src.config import PRIMARY_SERIES, FGI7_WINDOW
+from src.history import HISTORY_FILE, load_history, append_history, merge_history
+from src.rules import FGI7, RAW, rules_for
+from src.sources import load_values_file
+
+
+def load_fixture(path):
+    """
+    读取回测用的历史数据文件
+
+    支持两种格式:
+    - 本地历史CSV（state/fgi_history.csv 同格式，每行 "YYYY-MM-DD,value"）
+    - alternative.me原始JSON（如 ?limit=0&format=json 的完整响应）
+
+    返回:
+        list - [(date, value)] 按日期升序
+    """
+    return load_values_file(path)
+
+
+def primary_spec():
+    """主序列的参数（阈值、卖出比例、冷却天数等，见series.enabled_series）"""
+    from src.series import enabled_series  # 延迟导入，回测不需要网络相关模块时不加载
+
+    return next(s for s in enabled_series() if s["key"] == PRIMARY_SERIES)
+
+
+def run_backtest(values, spec=None, rules=None, window=FGI7_WINDOW, fgi7=None):
+    """
+    回放整段历史，输出每一次触发与冷却抑制
+
+    判定使用与监控相同的规则（rules_for，rules.yaml不存在时为默认规则：上穿、最高档连续2天）:
+    - 每条规则对整列指标一次算出逐日结果，同日多档按规则顺序依次触发
+    - 冷却: 每个档位独立冷却（天数取自触发它的规则），按自然日计算，被抑制的触发不重置冷却
+    历史首日起直接判定，不做上线首日抑制；说明类规则不产生事件
+
+    参数:
+        values: [(date, value)] 按日期升序的FGI历史
+        spec: 序列参数，默认主序列
+        rules: 已编译的规则，默认 rules_for(spec)
+        window: FGI7窗口长度
+        fgi7: 预先算好的滑动平均序列（可选，参数扫描时按窗口复用）
+
+    返回:
+        dict - {"events": [...], "summary": {...}}
+            events按日期与规则顺序排列，每项包含 date/level/kind/rule/action/fgi/fgi7/sell_pct/cumulative_sell_pct
+    """
+    spec = spec or primary_spec()
+    rules = rules or rules_for(spec)
+    sell_map = spec["sell_map"]
+
+    columns = rules.columns(values, fgi7=fgi7, window=window)
+    vals, s = columns[RAW], columns[FGI7]
+
+    events = []
+    last = {}  # 档位 -> 上次触发日序数
+    cumulative = 0
+    for i, fired in enumerate(rules.scan(columns)):
+        for rule in fired:
+            if rule.level is None:
+                continue
+            d = values[i][0].toordinal()
+            prev = last.get(rule.level)
+            ok = rule.cooldown is None or prev is None or d - prev >= rule.cooldown
+            if ok:
+                last[rule.level] = d
+            pct = sell_map.get(rule.level, 0) if ok else 0
+            cumulative += pct
+            events.append(
+                {
+                    "date": values[i][0],
+                    "level": rule.level,
+                    "kind": rule.kind,
+                    "rule": rule.name,
+                    "action": "trigger" if ok else "suppressed",
+                    "fgi": vals[i],
+                    "fgi7": s[i],
+                    "sell_pct": pct,
+                    "cumulative_sell_pct": cumulative,
+                }
+            )
+
+    triggers = [e for e in events if e["action"] == "trigger"]
+    levels = list(dict.fromkeys(r.level for r in rules.rules if r.level is not None))
+    summary = {
+        "days": len(values),
+        "evaluated_days": max(0, len(values) - window),
+        "start": values[0][0] if values else None,
+        "end": values[-1][0] if values else None,
+        "triggers": len(triggers),
+        "suppressed": len(events) - len(triggers),
+        "total_sell_pct": cumulative,
+        # 按卖出比例加权的触发日FGI均值，越高说明卖在越贪婪的位置
+        "avg_sell_fgi": (
+            sum(e["fgi"] * e["sell_pct"] for e in triggers) / cumulative
+            if cumulative
+            else None
+        ),
+        "by_level": {
+            t: sum(1 for e in triggers if e["level"] == t) for t in sorted(levels)
+        },
+    }
+    return {"events": events, "summary": summary}
+
+
+# 事件类型的显示文字（按规则的第一个条件）
+KIND_LABELS = {"cross": "上穿", "streak": "连续2天≥", "band": "区间"}
+
+
+def format_backtest(result):
+    """将回测结果格式化为可读文本"""
+    lines = []
+    for e in result["events"]:
+        kind = KIND_LABELS.get(e["kind"], e["kind"])
+        if e["action"] == "trigger":
+            action = f"卖出{e['sell_pct']}% (累计{e['cumulative_sell_pct']}%)"
+        else:
+            action = "冷却中，抑制"
+        fgi7 = f"{e['fgi7']:.2f}" if e["fgi7"] is not None else "-"
+        lines.append(f"{e['date']} {kind}{e['level']} FGI={e['fgi']} FGI7={fgi7} → {action}")
+
+    summary = result["summary"]
+    by_level = "，".join(f"{t}: {n}次" for t, n in summary["by_level"].items())
+    lines.append("")
+    lines.append(f"回测区间: {summary['start']} ~ {summary['end']} ({summary['days']}天)")
+    lines.append(
+        f"触发: {summary['triggers']}次 ({by_level})；冷却抑制: {summary['suppressed']}次"
+    )
+    lines.append(f"累计卖出比例: {summary['total_sell_pct']}%")
+    if summary["avg_sell_fgi"] is not None:
+        lines.append(f"加权卖出FGI均值: {summary['avg_sell_fgi']:.2f}")
+    return "\n".join(lines)
+
+
+def sync_full_history(path=HISTORY_FILE):
+    """从alternative.me拉取完整历史（limit=0）并追加到本地历史文件"""
+    from src.fgi_notifier import request_fgi
+
+    history = load_history(path)
+    added = append_history(request_fgi(0), history, path)
+    return merge_history(history, added)
+
+
+def main(argv=None):
+    """命令行入口：python -m src.backtest [--file PATH] [--sync]"""
+    parser = argparse.ArgumentParser(description="FGI策略历史回测")
+    parser.add_argument(
+        "--file",
+        default=os.getenv("FGI_BACKTEST_FILE", HISTORY_FILE),
+        help="历史数据文件（CSV或alternative.me JSON），默认本地历史",
+    )
+    parser.add_argument(
+        "--sync", action="store_true", help="回测前从API拉取完整历史到本地"
+    )
+    args = parser.parse_args(argv)
+
+    if args.sync:
+        values = sync_full_history(args.file)
+    else:
+        values = load_fixture(args.file)
+
+    if len(values) < FGI7_WINDOW + 1:
+        print(f"Insufficient history in {args.file}; need >= {FGI7_WINDOW + 1} days.")
+        return 1
+
+    started = time.perf_counter()
+    result = run_backtest(values)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    print(format_backtest(result))
+    print(f"耗时: {elapsed:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
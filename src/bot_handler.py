@@ -8,10 +8,9 @@ FGI监控系统 - Telegram Bot命令处理器
 import os
 import sys
 import asyncio
+import secrets
 import logging
-from datetime import datetime, timedelta
 from typing import Dict, Set
-from collections import defaultdict
 
 # 导入telegram相关库
 try:
@@ -36,9 +35,14 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.config import (
     BOT_COMMANDS_ENABLED,
     BOT_ADMIN_ONLY,
-    BOT_RATE_LIMIT,
     BOT_COMMANDS,
+    BOT_UPDATE_MODE,
+    BOT_WEBHOOK_HOST,
+    BOT_WEBHOOK_PORT,
+    BOT_WEBHOOK_PATH,
 )
+from src.notify import TG_API_BASE
+from src.ratelimit import make_limiter
 from src.report_generator import (
     report_generator,
     get_status_report,
@@ -47,6 +51,28 @@ from src.report_generator import (
 )
 
 
+def webhook_listen_config():
+    """
+    Webhook的监听地址、校验密钥与公网地址
+
+    - 设置了 TELEGRAM_WEBHOOK_URL 但未设置 TELEGRAM_WEBHOOK_SECRET：随机生成本次运行的密钥，
+      注册时交给Telegram，未携带该密钥的请求一律拒绝
+    - 两者都未设置（本地测试）：只监听127.0.0.1，不对外暴露不校验密钥的入口
+
+    返回:
+        tuple - (host, secret, public_url)
+    """
+    public_url = os.getenv("TELEGRAM_WEBHOOK_URL")
+    secret = os.getenv("TELEGRAM_WEBHOOK_SECRET") or None
+    host = BOT_WEBHOOK_HOST
+    if secret is None:
+        if public_url:
+            secret = secrets.token_urlsafe(32)
+        else:
+            host = "127.0.0.1"
+    return host, secret, public_url
+
+
 class FGIBotHandler:
     """FGI Bot命令处理器"""
 
@@ -55,7 +81,8 @@ class FGIBotHandler:
         self.app = None
         self.bot_token = None
         self.admin_id = None
-        self.rate_limiter = defaultdict(list)  # 用户ID -> 命令时间列表
+        self.rate_limiter = make_limiter()  # 按用户的令牌桶
+        self.webhook = None  # webhook模式下的WebhookServer
 
         # 配置日志
         logging.basicConfig(
@@ -91,7 +118,13 @@ class FGIBotHandler:
 
         # 创建Application
         try:
-            self.app = Application.builder().token(self.bot_token).build()
+            self.app = (
+                Application.builder()
+                .token(self.bot_token)
+                .base_url(f"{TG_API_BASE}/bot")
+                .concurrent_updates(True)  # 命令并发处理，慢命令不阻塞其它用户
+                .build()
+            )
             self.logger.info("Bot初始化成功")
             return True
         except Exception as e:
@@ -158,22 +191,8 @@ class FGIBotHandler:
         return user_id == self.admin_id
 
     def check_rate_limit(self, user_id: int) -> bool:
-        """检查速率限制"""
-        now = datetime.now()
-        minute_ago = now - timedelta(minutes=1)
-
-        # 清理过期的请求记录
-        self.rate_limiter[user_id] = [
-            req_time for req_time in self.rate_limiter[user_id] if req_time > minute_ago
-        ]
-
-        # 检查是否超过限制
-        if len(self.rate_limiter[user_id]) >= BOT_RATE_LIMIT:
-            return False
-
-        # 记录本次请求
-        self.rate_limiter[user_id].append(now)
-        return True
+        """检查速率限制（令牌桶，每次检查O(1)）"""
+        return self.rate_limiter.allow(user_id)
 
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """处理 /start 命令"""
@@ -272,8 +291,8 @@ class FGIBotHandler:
         processing_msg = await update.message.reply_text("⏳ 正在获取FGI状态...")
 
         try:
-            # 获取状态汇报
-            report = get_status_report()
+            # 获取状态汇报（在线程池中生成，不阻塞其它命令）
+            report = await self.render_report(get_status_report)
 
             # 更新消息内容
             await processing_msg.edit_text(
@@ -300,8 +319,8 @@ class FGIBotHandler:
         processing_msg = await update.message.reply_text("⏳ 正在分析FGI数据...")
 
         try:
-            # 获取详细汇报
-            report = get_detailed_report()
+            # 获取详细汇报（在线程池中生成，不阻塞其它命令）
+            report = await self.render_report(get_detailed_report)
 
             # 由于消息可能很长，需要分段发送或使用代码块格式
             if len(report) > 4000:  # Telegram消息长度限制
@@ -340,8 +359,8 @@ class FGIBotHandler:
         processing_msg = await update.message.reply_text("⏳ 正在分析趋势...")
 
         try:
-            # 获取趋势分析
-            report = get_trend_report()
+            # 获取趋势分析（在线程池中生成，不阻塞其它命令）
+            report = await self.render_report(get_trend_report)
 
             await processing_msg.edit_text(
                 f"```\n{report}\n```", parse_mode=ParseMode.MARKDOWN_V2
@@ -382,6 +401,29 @@ class FGIBotHandler:
             except Exception:
                 pass  # 忽略发送错误消息的失败
 
+    async def render_report(self, render) -> str:
+        """
+        在线程池中生成汇报
+
+        数据刷新（可能访问网络）和状态文件读取都是阻塞操作，放到线程池中执行，
+        事件循环上的其它命令处理器、监控检测和定时汇报不受影响
+        """
+
+        def _render():
+            # 共享缓存过期时先用旧数据立即回复，后台刷新；
+            # 数据未变化时直接取报告快照中预生成的文本
+            report_generator.refresh_data()
+            return render()
+
+        return await asyncio.to_thread(_render)
+
+    async def prerender(self):
+        """预先生成报告快照（数据更新后调用，命令到达时直接命中）"""
+        try:
+            await self.render_report(get_status_report)
+        except Exception as e:
+            self.logger.error(f"预生成汇报失败: {e}")
+
     def _split_message(self, text: str, max_length: int = 3900) -> list:
         """分割长消息"""
         if len(text) <= max_length:
@@ -408,46 +450,85 @@ class FGIBotHandler:
 
         return parts
 
-    async def run_polling(self):
-        """运行Bot（轮询模式）"""
-        if not self.app:
-            self.logger.error("Bot未初始化")
-            return
-
-        try:
-            # 设置Bot命令菜单
-            await self.setup_bot_commands()
-
-            # 开始轮询
-            self.logger.info("开始Bot轮询...")
-            await self.app.run_polling()
+    async def start(self, update_mode: str = BOT_UPDATE_MODE) -> bool:
+        """
+        在当前事件循环上启动Bot（初始化、设置菜单命令、开始接收更新）
 
-        except Exception as e:
-            self.logger.error(f"Bot运行失败: {e}")
-            raise
+        不会接管事件循环，便于与监控、定时汇报共用同一个循环；停止时调用stop()
 
-    def run_bot_sync(self):
-        """同步运行Bot（用于测试）"""
+        参数:
+            update_mode: "polling" 长轮询；"webhook" 启动本地HTTP服务接收Telegram推送
+        """
         if not self.initialize():
             return False
 
         self.setup_handlers()
-
         try:
-            # 先设置Bot命令菜单（同步方式）
-            asyncio.run(self.setup_bot_commands())
-
-            # 简化的运行方式 - 让 python-telegram-bot 自己管理事件循环
-            self.logger.info("开始Bot轮询...")
-            self.app.run_polling()
-            return True
-        except KeyboardInterrupt:
-            self.logger.info("Bot已停止")
-            return True
+            await self.app.initialize()
+            await self.setup_bot_commands()
+            await self.app.start()
+            if update_mode == "webhook":
+                await self._start_webhook()
+            else:
+                await self.app.updater.start_polling()
+                self.logger.info("开始Bot轮询...")
         except Exception as e:
-            self.logger.error(f"Bot运行异常: {e}")
+            self.logger.error(f"Bot启动失败: {e}")
+            await self.stop()
             return False
 
+        await self.prerender()
+        return True
+
+    async def _start_webhook(self):
+        """
+        启动Webhook服务
+
+        设置了 TELEGRAM_WEBHOOK_URL 时向Telegram注册该地址；未设置时只在本机监听，
+        可直接POST录制的更新JSON进行测试
+        """
+        from src.webhook import WebhookServer
+
+        host, secret, public_url = webhook_listen_config()
+        port = int(os.getenv("TELEGRAM_WEBHOOK_PORT") or BOT_WEBHOOK_PORT)
+        self.webhook = WebhookServer(self.app, host, port, BOT_WEBHOOK_PATH, secret_token=secret)
+        await self.webhook.start()
+
+        if public_url:
+            await self.app.bot.set_webhook(
+                url=public_url.rstrip("/") + BOT_WEBHOOK_PATH,
+                secret_token=secret,
+                allowed_updates=Update.ALL_TYPES,
+            )
+            self.logger.info(f"Webhook已注册: {public_url}")
+        else:
+            self.logger.warning("未设置 TELEGRAM_WEBHOOK_URL，仅本地监听，不向Telegram注册")
+
+    async def stop(self):
+        """停止Bot轮询并释放资源"""
+        if not self.app:
+            return
+
+        if self.webhook:
+            await self.webhook.stop()
+            self.webhook = None
+        if self.app.updater and self.app.updater.running:
+            await self.app.updater.stop()
+        if self.app.running:
+            await self.app.stop()
+        await self.app.shutdown()
+        self.logger.info("Bot已停止")
+
+    def run_bot_sync(self) -> bool:
+        """
+        同步运行Bot（阻塞直至收到停止信号）
+
+        由常驻运行时托管：Bot与其它任务共用同一个事件循环，不再单独创建循环
+        """
+        from src.runtime import run_runtime
+
+        return run_runtime(enable_monitor=False, enable_reports=False) == 0
+
 
 # 全局Bot实例
 bot_handler = FGIBotHandler()
@@ -456,15 +537,13 @@ bot_handler = FGIBotHandler()
 async def process_bot_command(command: str, user_id: int = None) -> str:
     """处理Bot命令（供外部调用）"""
     try:
-        # 刷新数据
-        report_generator.refresh_data()
-
-        if command == "status":
-            return get_status_report()
-        elif command == "fgi":
-            return get_detailed_report()
-        elif command == "trend":
-            return get_trend_report()
+        renderers = {
+            "status": get_status_report,
+            "fgi": get_detailed_report,
+            "trend": get_trend_report,
+        }
+        if command in renderers:
+            return await bot_handler.render_report(renderers[command])
         elif command == "help":
             return """
 🆘 FGI监控Bot帮助
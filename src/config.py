@@ -1,8 +1,37 @@
 # FGI恐慌贪婪指数监控项目配置文件
 # 包含API地址、策略参数、冷却设置等所有配置项
 
-# API数据源配置
-FGI_API = "https://api.alternative.me/fng/?limit=14&format=json"
+import os
+
+# API数据源配置（地址可用同名环境变量覆盖，便于指向本地测试服务）
+FGI_API_BASE = os.getenv("FGI_API_BASE", "https://api.alternative.me/fng/")  # 增量拉取地址，limit按本地缺口动态计算
+FGI_WINDOW_DAYS = 14  # fetch_fgi 返回的窗口天数（与原 limit=14 一致）
+
+# FGI数据源（见 src/sources.py）：全部并发请求，按策略合并
+# type: "alternative.me"（官方接口或返回相同格式的镜像，需url）/ "file"（本地CSV或JSON，需path）
+FGI_SOURCES = [
+    {"name": "alternative.me", "type": "alternative.me", "url": FGI_API_BASE},
+    # {"name": "mirror", "type": "alternative.me", "url": "https://fgi-mirror.example.com/fng/"},
+    # {"name": "local", "type": "file", "path": "data/fgi.csv"},
+]
+FGI_SOURCE_STRATEGY = "first"  # "first"：第一个有效响应胜出 / "quorum"：多个数据源逐日取中位数
+FGI_SOURCE_QUORUM = 2  # quorum策略下需要成功的数据源个数（不超过启用的数据源数）
+
+# 数据获取配置 - 重试、超时与熔断（见 src/fetcher.py）
+FETCH_CONNECT_TIMEOUT_SECONDS = 5  # 单次请求的连接超时
+FETCH_READ_TIMEOUT_SECONDS = 10  # 单次请求的读取超时
+FETCH_DEADLINE_SECONDS = 30  # 一次获取（含全部重试与等待）的总时限
+FETCH_RETRIES = 3  # 超时/5xx/429时的最大重试次数
+FETCH_BACKOFF_SECONDS = 1.0  # 退避基数：第n次重试前随机等待 0 ~ 基数×2^n 秒
+FETCH_BREAKER_FAILURES = 3  # 连续失败几次后熔断
+FETCH_BREAKER_COOLDOWN_SECONDS = 600  # 熔断持续时间，期间直接使用本地历史；之后放行一次试探请求
+
+# 进程内数据缓存配置 - TTL对齐alternative.me每日UTC零点更新
+FGI_CACHE_GRACE_MINUTES = 5  # 过了UTC零点后再等几分钟才视为过期，等待数据源发布
+FGI_CACHE_RETRY_SECONDS = 60  # 尚无当日数据或拉取失败时的重试间隔（常驻模式下即新数据的检测延迟）
+
+# FGI7滑动窗口长度（天）
+FGI7_WINDOW = 7
 
 # 策略阈值配置 - 顺序重要，用于跨级同日触发
 THRESHOLDS = [70, 80, 90]
@@ -16,6 +45,34 @@ COOLDOWN_DAYS = 7  # 每个阈值独立7天冷却期
 # 最小卖出阈值 - 低于此值不触发任何卖出信号
 MIN_SELL_LEVEL = 60
 
+# 触发规则文件（YAML，格式见 rules.example.yaml）；文件不存在时按各序列的阈值、
+# 卖出比例、冷却天数与最低卖出水平生成默认规则（上穿、最高档连续2天、低于最低卖出水平的说明）
+RULES_FILE = "rules.yaml"
+
+# 多指数监控配置 - 每个序列独立阈值、卖出比例、冷却与状态
+# source: "alternative.me"（加密FGI，含本地历史与缓存）/ "cnn"（CNN美股恐慌贪婪指数）/ "file"（本地CSV，内部指数）
+# 未列出的参数沿用上方全局配置；主序列的状态保存在state.json根级（兼容原schema）
+PRIMARY_SERIES = "crypto_fgi"
+SERIES = {
+    "crypto_fgi": {
+        "label": "FGI",
+        "source": "alternative.me",
+        "enabled": True,
+    },
+    "cnn_fgi": {
+        "label": "CNN FGI",
+        "source": "cnn",
+        "url": "https://production.dataviz.cnn.io/index/fearandgreed/graphdata",
+        "enabled": False,
+    },
+    "internal": {
+        "label": "内部指数",
+        "source": "file",
+        "path": "state/series/internal.csv",
+        "enabled": False,
+    },
+}
+
 # 时区配置 - 状态日期使用UTC自然日
 TIMEZONE = "UTC"
 
@@ -26,17 +83,68 @@ BOOTSTRAP_SUPPRESS_FIRST_DAY = True
 ENABLE_DAILY_REPORT = True  # 是否启用每日数据汇报（即使无触发）
 VERBOSE_MODE = False  # 是否启用详细模式（显示更多调试信息）
 REPORT_THRESHOLD_DISTANCE = 10  # 当FGI7距离阈值小于此值时发送接近提醒
+REPORT_LOCALE = "zh"  # 汇报默认语言（模板见 src/report_templates.py，可选 zh / en）
+
+# Telegram发送配置
+TELEGRAM_SEND_CONCURRENCY = 8  # 同时进行的发送请求上限（共用一个keep-alive连接池）
+TELEGRAM_MAX_RETRIES = 3  # 遇到429时按retry_after重试的最大次数
+TELEGRAM_GLOBAL_RATE = 30  # 全局每秒发送上限（Telegram约30条/秒）
+TELEGRAM_CHAT_INTERVAL_SECONDS = 1.0  # 同一私聊两条消息的最小间隔
+TELEGRAM_GROUP_RATE_PER_MINUTE = 20  # 群组/频道每分钟发送上限
+TELEGRAM_GLOBAL_PAUSE_CHATS = 3  # 窗口内有这么多个不同收件人收到429时才暂停全局发送
+TELEGRAM_GLOBAL_PAUSE_WINDOW_SECONDS = 5.0  # 判定全局限流的时间窗口
+
+# 技术指标 - 趋势分析中展示，规则中可按name引用；所有指标一次遍历同时计算
+# type: sma / ema / wma / median / std / zscore / roc / pctrank，window为窗口天数
+# （fetch_fgi默认只返回FGI_WINDOW_DAYS天，窗口不宜超过该值）
+INDICATORS = [
+    {"name": "ema7", "type": "ema", "window": 7},
+    {"name": "wma7", "type": "wma", "window": 7},
+    {"name": "median7", "type": "median", "window": 7},
+    {"name": "zscore14", "type": "zscore", "window": 14},
+    {"name": "roc7", "type": "roc", "window": 7},
+    {"name": "pctrank14", "type": "pctrank", "window": 14},
+]
+
+# 状态日志配置 - 状态变化追加到 state/journal.jsonl，state.json 为定期压缩的快照
+STATE_SNAPSHOT_EVERY = 50  # 快照之后累积多少条事件时重写快照（加载时最多重放这么多条）
+# SQLite存储 - 设置后状态、FGI/FGI7序列、触发记录与投递日志保存在该文件中（如 "state/fgi.sqlite"）；
+# None表示使用上面的事件日志（GitHub Actions按提交保存状态时建议保持None）
+STATE_DB = None
+
+# 发件箱配置 - 提醒先落盘再投递，失败按指数退避重试
+OUTBOX_MAX_ATTEMPTS = 8  # 单条消息最多投递次数，超过后放弃
+OUTBOX_BACKOFF_BASE_SECONDS = 60  # 首次重试等待秒数，之后每次翻倍
+OUTBOX_BACKOFF_MAX_SECONDS = 6 * 3600  # 重试等待上限
+OUTBOX_RETENTION_DAYS = 14  # 已发送记录保留天数（用于幂等去重）
+OUTBOX_LEASE_SECONDS = 120  # 投递中的消息租约，期间不会被其它投递者重复选中
 
 # Telegram Bot配置
 BOT_COMMANDS_ENABLED = True  # 是否启用Bot命令功能
 BOT_ADMIN_ONLY = True  # 是否限制仅管理员可使用Bot命令
 BOT_RATE_LIMIT = 5  # Bot命令使用频率限制（每分钟最多次数）
+BOT_RATE_LIMIT_BURST = 5  # 允许的连续突发次数（令牌桶容量），之后按上面的速率恢复；第一分钟最多约 BURST+RATE 次
+BOT_RATE_LIMIT_MAX_USERS = 10000  # 进程内最多跟踪的用户数，超出时淘汰最久未使用的用户
+BOT_RATE_LIMIT_STORE = None  # 多进程共享限流额度的SQLite文件（如 "state/ratelimit.sqlite"），None表示仅进程内
+BOT_UPDATE_MODE = "polling"  # 接收更新方式："polling"长轮询 / "webhook"本地HTTP服务接收推送
+
+# Webhook配置（BOT_UPDATE_MODE="webhook"时生效）
+# 公网地址与校验密钥通过环境变量 TELEGRAM_WEBHOOK_URL / TELEGRAM_WEBHOOK_SECRET 提供；
+# 设置了公网地址而未设置密钥时自动生成随机密钥，两者都未设置时只监听127.0.0.1
+BOT_WEBHOOK_HOST = "0.0.0.0"  # 监听地址（通常由反向代理终止TLS后转发到此）
+BOT_WEBHOOK_PORT = 8443  # 监听端口
+BOT_WEBHOOK_PATH = "/telegram/webhook"  # 接收更新的URL路径
+BOT_WEBHOOK_MAX_BODY = 1024 * 1024  # 单个更新请求体上限（字节）
 
 # 定时汇报配置
 SCHEDULED_REPORTS_ENABLED = True  # 是否启用定时汇报
 MORNING_REPORT_UTC = 0  # 早报时间 (UTC小时，对应北京08:00)
 NOON_REPORT_UTC = 4  # 午报时间 (UTC小时，对应北京12:00)
 EVENING_REPORT_UTC = 12  # 晚报时间 (UTC小时，对应北京20:00)
+REPORT_MINUTE_UTC = 30  # 常驻模式下汇报的分钟（与工作流的UTC半点一致）
+
+# 常驻模式配置
+DAEMON_MONITOR_INTERVAL_SECONDS = 60  # 监控检测间隔；数据未更新时命中进程内缓存，几乎无开销
 
 # Bot命令配置
 BOT_COMMANDS = {
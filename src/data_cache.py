@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FGI监控系统 - 进程内共享数据缓存
+report_generator、bot_handler、scheduled_reports 和监控主流程共用一份FGI数据，
+TTL对齐alternative.me的每日更新，并发请求合并为一次拉取，过期时先返回旧数据再后台刷新
+"""
+
+import threading
+import datetime as dt
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+
+from src.config import FGI_CACHE_GRACE_MINUTES, FGI_CACHE_RETRY_SECONDS
+
+
+def _default_loader():
+    """动态导入fetch_fgi，避免循环导入"""
+    from src.fgi_notifier import fetch_fgi
+
+    return fetch_fgi()
+
+
+class FGIDataCache:
+    """FGI数据TTL缓存（线程安全）"""
+
+    def __init__(self, loader: Optional[Callable[[], List[Tuple]]] = None):
+        """初始化缓存，loader为实际的数据获取函数，默认fetch_fgi"""
+        self.loader = loader or _default_loader
+        self.version = 0  # 每次成功刷新+1，供调用方判断数据是否更新
+        self._values = None
+        self._expires_at = None
+        self._inflight = None  # 正在进行的拉取（Future），用于合并并发请求
+        self._lock = threading.Lock()
+
+    def _expiry(self, values) -> dt.datetime:
+        """
+        计算缓存过期时间
+
+        已拿到今日数据：有效至下一个UTC零点（加少量宽限，等待数据源发布）
+        尚无今日数据：短间隔后重试，尽快拿到当日新值
+        """
+        now = dt.datetime.utcnow()
+        latest = values[-1][0] if values else None
+        if latest is not None and latest >= now.date():
+            next_day = dt.datetime.combine(now.date() + dt.timedelta(days=1), dt.time())
+            return next_day + dt.timedelta(minutes=FGI_CACHE_GRACE_MINUTES)
+        return now + dt.timedelta(seconds=FGI_CACHE_RETRY_SECONDS)
+
+    def is_fresh(self) -> bool:
+        """缓存是否在有效期内"""
+        return self._values is not None and dt.datetime.utcnow() < self._expires_at
+
+    def get(self, allow_stale: bool = True):
+        """
+        获取FGI数据
+
+        参数:
+            allow_stale: 过期时是否先返回旧数据并在后台刷新（stale-while-revalidate）；
+                         为False时等待本次刷新完成
+
+        返回:
+            list - [(date, value)] 按日期升序
+
+        异常:
+            缓存为空且拉取失败时抛出拉取异常
+        """
+        with self._lock:
+            if self.is_fresh():
+                return self._values
+            stale = self._values
+            future = self._inflight
+            start = future is None
+            if start:
+                future = self._inflight = Future()
+
+        serve_stale = allow_stale and stale is not None
+        if start:
+            if serve_stale:
+                threading.Thread(
+                    target=self._refresh, args=(future,), daemon=True
+                ).start()
+            else:
+                self._refresh(future)
+
+        if serve_stale:
+            return stale
+        return future.result()
+
+    def _refresh(self, future: Future):
+        """执行一次实际拉取，并把结果交给所有等待者"""
+        try:
+            values = self.loader()
+        except Exception as e:
+            with self._lock:
+                self._inflight = None
+                if self._values is not None:
+                    # 保留旧数据，短间隔后再试，避免每次请求都打到数据源
+                    self._expires_at = dt.datetime.utcnow() + dt.timedelta(
+                        seconds=FGI_CACHE_RETRY_SECONDS
+                    )
+            print(f"FGI数据刷新失败: {e}")
+            future.set_exception(e)
+            return
+
+        self.put(values)
+        with self._lock:
+            self._inflight = None
+        future.set_result(values)
+
+    def put(self, values):
+        """写入新数据（如监控流程刚拉取到的结果）"""
+        with self._lock:
+            self._values = values
+            self._expires_at = self._expiry(values)
+            self.version += 1
+
+    def invalidate(self):
+        """使缓存立即过期，下次get时重新拉取"""
+        with self._lock:
+            if self._values is not None:
+                self._expires_at = dt.datetime.utcnow()
+
+
+# 全局实例
+fgi_cache = FGIDataCache()
+
+
+def get_fgi_data(allow_stale: bool = True):
+    """获取共享缓存中的FGI数据"""
+    return fgi_cache.get(allow_stale=allow_stale)
@@ -0,0 +1,325 @@
+# FGI恐慌贪婪指数监控项目 - 数据获取模块
+# 所有数据源的HTTP请求统一经过这里：
+#   - 共享连接池（requests.Session），同一进程内的请求复用keep-alive连接
+#   - 超时、5xx、429时带随机抖动的指数退避重试，整个获取过程有总时限，慢接口不会拖住整次运行
+#   - 熔断：连续失败达到阈值后一段时间内直接失败，不再访问数据源，由调用方回退到本地历史
+#   - 条件请求：记录ETag/Last-Modified，数据源返回304时直接复用上次的响应
+# 熔断状态与条件请求的校验信息保存在 state/fetch_state.json，同一台机器上的独立进程之间同样生效
+# （该文件不提交到仓库：校验信息每小时都会变化，GitHub Actions每次运行从空状态开始）
+
+import os
+import json
+import time
+import random
+import threading
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.config import (
+    FETCH_CONNECT_TIMEOUT_SECONDS,
+    FETCH_READ_TIMEOUT_SECONDS,
+    FETCH_DEADLINE_SECONDS,
+    FETCH_RETRIES,
+    FETCH_BACKOFF_SECONDS,
+    FETCH_BREAKER_FAILURES,
+    FETCH_BREAKER_COOLDOWN_SECONDS,
+)
+from src.state import STATE_DIR, atomic_write_json
+
+FETCH_STATE_FILE = os.path.join(STATE_DIR, "fetch_state.json")
+
+# 值得重试的HTTP状态（限流与服务端临时错误）；其它4xx说明请求本身有问题，重试无益
+RETRY_STATUS = {429, 500, 502, 503, 504}
+# 响应体不超过该大小时才持久化用于条件请求（完整历史等大响应只保留在内存中）
+_PERSIST_MAX_BYTES = 64 * 1024
+
+
+class FetchError(Exception):
+    """数据获取失败（已用尽重试或超过总时限）"""
+
+
+class CircuitOpenError(FetchError):
+    """数据源处于熔断期，未发起请求"""
+
+
+class _FetchState:
+    """熔断状态与条件请求校验信息的持久化（进程内共享一份，写入时整体原子替换）"""
+
+    def __init__(self, path=FETCH_STATE_FILE):
+        self.path = path
+        self._data = None
+        self._stamp = None
+        self._lock = threading.Lock()
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load(self):
+        """读取状态；文件被其它进程改写过时重新读取"""
+        stamp = self._file_stamp()
+        if self._data is None or stamp != self._stamp:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._data = json.load(f)
+            except (OSError, ValueError):
+                self._data = {}
+            self._stamp = stamp
+            self._data.setdefault("breakers", {})
+            self._data.setdefault("validators", {})
+        return self._data
+
+    def get(self, section, key):
+        with self._lock:
+            return self._load()[section].get(key)
+
+    def set(self, section, key, value):
+        """更新一项并写盘；写盘失败不影响数据获取"""
+        with self._lock:
+            self._write(section, key, value)
+
+    def update(self, section, key, fn):
+        """
+        在锁内读-改-写一项
+
+        参数:
+            fn: fn(旧值) -> (新值, 返回值)；新值与旧值相同时不写盘
+        """
+        with self._lock:
+            old = self._load()[section].get(key)
+            value, result = fn(old)
+            if value != old:
+                self._write(section, key, value)
+            return result
+
+    def _write(self, section, key, value):
+        data = self._load()
+        if value is None:
+            data[section].pop(key, None)
+        else:
+            data[section][key] = value
+        try:
+            atomic_write_json(self.path, data)
+            self._stamp = self._file_stamp()
+        except OSError as e:
+            print(f"获取状态写入失败: {e}")
+
+
+_fetch_state = _FetchState()
+
+
+class CircuitBreaker:
+    """
+    熔断器
+
+    连续失败达到failures次后打开，cooldown秒内allow()返回False；
+    冷却结束后只放行一个试探请求，成功则关闭，失败则重新计时
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failures: int = FETCH_BREAKER_FAILURES,
+        cooldown: float = FETCH_BREAKER_COOLDOWN_SECONDS,
+        store: _FetchState = None,
+    ):
+        self.name = name
+        self.failures = failures
+        self.cooldown = cooldown
+        self.store = store or _fetch_state
+
+    def _state(self):
+        return self.store.get("breakers", self.name) or {"failures": 0, "opened_at": None}
+
+    def allow(self) -> bool:
+        """
+        是否允许发起请求
+
+        冷却结束后第一个调用方取得试探资格，同时把打开时间推到当前：
+        试探结果出来之前（或试探方异常退出后的又一个冷却期内）其它调用方仍被拒绝
+        """
+
+        def claim(state):
+            if state is None or state["opened_at"] is None:
+                return state, True
+            now = time.time()
+            if now - state["opened_at"] < self.cooldown:
+                return state, False
+            return {**state, "opened_at": now}, True
+
+        return self.store.update("breakers", self.name, claim)
+
+    def retry_in(self) -> float:
+        """距离允许试探请求还有多少秒"""
+        opened_at = self._state()["opened_at"]
+        return 0.0 if opened_at is None else max(0.0, opened_at + self.cooldown - time.time())
+
+    def record_success(self):
+        def close(state):
+            if state is None or not state["failures"]:
+                return state, None
+            return None, None
+
+        self.store.update("breakers", self.name, close)
+
+    def record_failure(self):
+        def count(state):
+            state = state or {"failures": 0, "opened_at": None}
+            failures = state["failures"] + 1
+            opened_at = state["opened_at"]
+            if failures >= self.failures:
+                opened_at = time.time()  # 打开，或试探失败后重新计时
+            return {"failures": failures, "opened_at": opened_at}, None
+
+        # 与allow()相同在锁内读-改-写，并发失败不会丢失计数或覆盖刚取得的试探资格
+        self.store.update("breakers", self.name, count)
+
+
+_breakers = {}
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """按数据源名称获取熔断器（同名共享）"""
+    if name not in _breakers:
+        _breakers[name] = CircuitBreaker(name)
+    return _breakers[name]
+
+
+class HTTPFetcher:
+    """带连接池、重试、总时限与条件请求的JSON获取器（线程安全）"""
+
+    def __init__(
+        self,
+        retries: int = FETCH_RETRIES,
+        backoff: float = FETCH_BACKOFF_SECONDS,
+        connect_timeout: float = FETCH_CONNECT_TIMEOUT_SECONDS,
+        read_timeout: float = FETCH_READ_TIMEOUT_SECONDS,
+        deadline: float = FETCH_DEADLINE_SECONDS,
+        store: _FetchState = None,
+    ):
+        """
+        参数:
+            retries: 失败后的最大重试次数
+            backoff: 退避基数，第n次重试前随机等待 0 ~ backoff×2^n 秒
+            connect_timeout / read_timeout: 单次请求的连接与读取超时
+            deadline: 一次获取（含全部重试与等待）的总时限
+        """
+        self.retries = retries
+        self.backoff = backoff
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.deadline = deadline
+        self.store = store or _fetch_state
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._validators = {}  # 请求地址 -> {"etag", "last_modified", "data"}（内存中，含大响应）
+
+    def get_json(self, url, params=None, headers=None, breaker: CircuitBreaker = None):
+        """
+        获取JSON
+
+        参数:
+            url / params / headers: 请求参数
+            breaker: 熔断器；为None时不做熔断
+
+        返回:
+            解析后的JSON（数据源返回304时为上次的响应）
+
+        异常:
+            CircuitOpenError - 处于熔断期
+            FetchError - 用尽重试或超过总时限
+        """
+        if breaker is not None and not breaker.allow():
+            raise CircuitOpenError(
+                f"{breaker.name} 熔断中，{breaker.retry_in():.0f}秒后重试"
+            )
+
+        key = url + ("?" + urlencode(sorted(params.items())) if params else "")
+        cached = self._validators.get(key) or self.store.get("validators", key)
+        request_headers = dict(headers or {})
+        if cached:
+            if cached.get("etag"):
+                request_headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                request_headers["If-Modified-Since"] = cached["last_modified"]
+
+        give_up_at = time.monotonic() + self.deadline
+        error = None
+        for attempt in range(self.retries + 1):
+            remaining = give_up_at - time.monotonic()
+            if remaining <= 0:
+                break
+            retry_after = None
+            try:
+                r = self.session.get(
+                    url,
+                    params=params,
+                    headers=request_headers,
+                    timeout=(
+                        min(self.connect_timeout, remaining),
+                        min(self.read_timeout, remaining),
+                    ),
+                )
+                if r.status_code == 304 and cached:
+                    data = cached["data"]
+                elif r.status_code in RETRY_STATUS:
+                    error = FetchError(f"HTTP {r.status_code} from {url}")
+                    retry_after = _retry_after(r)
+                    data = None
+                else:
+                    r.raise_for_status()
+                    data = r.json()
+                    self._remember(key, r, data)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error, data = e, None
+            except (requests.HTTPError, ValueError) as e:
+                # 非临时性错误（4xx、响应不是JSON）：不重试
+                error, data = e, None
+                break
+
+            if data is not None:
+                if breaker is not None:
+                    breaker.record_success()
+                return data
+
+            # 全抖动退避：各进程/各数据源的重试时间错开
+            delay = random.uniform(0, self.backoff * 2**attempt)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            if attempt == self.retries or time.monotonic() + delay >= give_up_at:
+                break
+            time.sleep(delay)
+
+        if breaker is not None:
+            breaker.record_failure()
+        raise FetchError(f"获取 {url} 失败: {error}") from error
+
+    def _remember(self, key, response, data):
+        """记录条件请求的校验信息（响应没有ETag/Last-Modified时不记录）"""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        entry = {"etag": etag, "last_modified": last_modified, "data": data}
+        self._validators[key] = entry
+        if len(response.content) <= _PERSIST_MAX_BYTES:
+            self.store.set("validators", key, entry)
+
+
+def _retry_after(response):
+    """解析Retry-After（秒数形式）；没有或无法解析时返回None"""
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+# 全局实例：所有数据源共用连接池
+http_fetcher = HTTPFetcher()
@@ -3,17 +3,14 @@
 
 import os
 import sys
-import requests
 import datetime as dt
-import asyncio
-from statistics import mean
 
 # 导入项目内部模块
 from src.config import (
-    FGI_API,
+    FGI_WINDOW_DAYS,
+    FGI7_WINDOW,
+    PRIMARY_SERIES,
     THRESHOLDS,
-    SELL_MAP,
-    COOLDOWN_DAYS,
     BOOTSTRAP_SUPPRESS_FIRST_DAY,
     ENABLE_DAILY_REPORT,
     VERBOSE_MODE,
@@ -23,15 +20,26 @@ from src.state import (
     load_state,
     save_state,
     today_utc_date,
-    in_cooldown,
     mark_trigger,
     mark_processed,
     bootstrapped,
     set_bootstrapped,
     days_since,  # 添加缺失的导入
+    state_lock,
+    series_state,
+    record_event,
 )
-from src.notify import send_telegram
-from src.strategy import compute_fgi7, two_consecutive_ge, crossings
+from src.history import load_history, append_history, merge_history, missing_days
+from src.store import get_store
+from src.rules import rules_for
+from src import outbox
+from src.fetcher import FetchError
+from src.sources import fetch_from_sources, parse_alternative_me
+from src.governor import PRIORITY_REPORT
+from src.series import enabled_series, fetch_all_series
+from src.strategy import FGI7Tracker
+from src.templates import render as render_template
+from src.subscribers import subscriber_registry, alert_recipients, alert_groups, report_groups
 
 
 # 避免循环导入，动态导入 bot_handler 和 scheduled_reports_handler
@@ -47,34 +55,60 @@ def get_scheduled_reports_handler():
     return scheduled_reports_handler
 
 
-def fetch_fgi():
+# 兼容旧名称
+_parse_fgi_payload = parse_alternative_me
+
+
+def request_fgi(limit):
     """
-    从alternative.me获取并处理FGI数据
+    向FGI数据源请求最近limit天的数据（limit=0表示全部历史）
+
+    所有配置的数据源（config.FGI_SOURCES）并发请求，按FGI_SOURCE_STRATEGY合并
 
     返回:
-        list - [(date, value)] 按日期升序排列的FGI数据列表
+        list - [(date, value)] 按日期升序排列
     """
-    r = requests.get(FGI_API, timeout=20)
-    r.raise_for_status()
-    data = r.json()["data"]
+    return fetch_from_sources(limit)
+
+
+def fetch_fgi(window=FGI_WINDOW_DAYS):
+    """
+    获取FGI数据 - 优先读取本地历史，仅增量拉取缺失的日期
+
+    alternative.me每个UTC自然日只发布一个值：本地已有今日数据时
+    完全不访问网络；否则只请求本地最后日期之后缺少的天数。
+    数据源不可用（重试耗尽或处于熔断期）时回退到本地历史，
+    监控照常运行，只是没有新的一天可判定
 
-    # API返回常见为倒序；统一为按日期升序
-    items = []
-    for d in data:
-        ts = int(d["timestamp"])
-        day = dt.datetime.utcfromtimestamp(ts).date()
-        val = int(d["value"])
-        items.append((day, val))
+    参数:
+        window: 返回的最近天数，默认与原 limit=14 一致
 
-    items.sort(key=lambda x: x[0])
+    返回:
+        list - [(date, value)] 按日期升序排列的FGI数据列表
+    """
+    history = load_history()
+    gap = missing_days(history, today_utc_date())
 
-    # 去重: 同日多条保留最后一条（理论不会发生）
-    dedup = {}
-    for day, val in items:
-        dedup[day] = val
+    if gap != 0:
+        # 本地为空或历史过短时按完整窗口拉取，否则只补缺口
+        if gap is None or len(history) < window:
+            limit = max(window, gap or 0)
+        else:
+            limit = gap
+        try:
+            fresh = request_fgi(limit)
+        except FetchError as e:
+            if not history:
+                raise
+            print(f"FGI fetch failed, using local history up to {history[-1][0]}: {e}")
+            return history[-window:]
+        added = append_history(fresh, history)
+        if added:
+            history = merge_history(history, added)
+        if VERBOSE_MODE:
+            print(f"FGI fetch: requested {limit} day(s), appended {len(added)}")
 
-    out = sorted(dedup.items(), key=lambda x: x[0])  # [(date, val)]
-    return out
+    return history[-window:]
 
 
 def main(mode="monitor"):
@@ -87,6 +121,9 @@ def main(mode="monitor"):
             - "bot": Bot命令模式 - 启动Telegram Bot监听命令
             - "scheduled": 定时汇报模式 - 发送早中晚定时汇报
             - "test": 测试模式 - 强制运行，忽略日期检查
+            - "backtest": 回测模式 - 用相同规则回放本地完整历史
+            - "daemon": 常驻模式 - 单事件循环内运行监控、定时汇报与Bot轮询
+            - "webhook": Bot Webhook模式 - 本地HTTP服务接收Telegram推送的命令
 
     业务流程说明:
     1. 状态管理：加载持久化状态，支持断点续传
@@ -111,89 +148,84 @@ def main(mode="monitor"):
         return run_bot_mode()
     elif mode == "scheduled":
         return run_scheduled_mode()
+    elif mode == "backtest":
+        return run_backtest_mode()
+    elif mode == "daemon":
+        return run_daemon_mode()
+    elif mode == "webhook":
+        return run_webhook_mode()
     elif mode != "monitor" and mode != "test":
-        print(f"Unknown mode: {mode}. Available modes: monitor, bot, scheduled, test")
+        print(
+            f"Unknown mode: {mode}. Available modes: monitor, bot, scheduled, test, backtest, daemon, webhook"
+        )
         return 1
 
     # 监控模式 (默认) 和 测试模式
-    # 测试模式会强制运行，忽略日期检查
-    # 1. 加载状态
-    state = load_state()
+    # 先在锁外获取数据，"读状态-判定-写状态"在状态锁内完成，多个进程同时运行时串行执行
+    specs, fetched = fetch_monitor_data()
+    with state_lock():
+        rc = run_monitor_mode(mode, specs, fetched)
 
-    # 2. 获取FGI数据
-    try:
-        values = fetch_fgi()
-    except Exception as e:
-        print(f"Failed to fetch FGI data: {e}")
-        return 1
+    # 批量投递发件箱（不持锁；含以往运行中失败待重试的消息）
+    drain_outbox()
+    print("Done.")
+    return rc
 
-    if len(values) < 8:
-        print("Insufficient FGI history; need >= 8 days.")
-        return 0
 
-    # 3. 今日自然日（按FGI数据最后一天）
-    latest_day, latest_val = values[-1]
-    prev7, today7 = compute_fgi7(values)
+def fetch_monitor_data():
+    """
+    并发获取所有启用序列的数据（主序列经共享缓存，不使用过期缓存）
 
-    if prev7 is None:
-        print("Not enough data for FGI7.")
-        return 0
+    调用方不能持有state_lock：数据在线程池中获取，主序列补齐历史时
+    工作线程要取state_lock追加历史文件，持锁等待工作线程会死锁
 
-    # 4. 首次上线：记录状态，不触发历史信号
-    if BOOTSTRAP_SUPPRESS_FIRST_DAY and not bootstrapped(state):
-        set_bootstrapped(state)
-        mark_processed(state, latest_day)
-        save_state(state)
-        send_telegram(
-            f"[初始化] 已上线并开始跟踪 FGI\n最近日期: {latest_day} FGI={latest_val} FGI7={today7}"
-        )
-        print("Bootstrapped. No historical firing.")
-        return 0
-
-    # 5. 无新日数据则跳过（测试模式除外）
-    if mode != "test":
-        last_proc = state.get("last_processed_date")
-        if last_proc:
-            last_proc_date = dt.datetime.strptime(last_proc, "%Y-%m-%d").date()
-            if latest_day <= last_proc_date:
-                print(
-                    f"No new day. latest={latest_day}, last_processed={last_proc_date}"
-                )
-                return 0
-    else:
-        print(f"[测试模式] 忽略日期检查，强制执行处理逻辑")
+    返回:
+        tuple - (enabled_series()的结果, fetch_all_series()的结果)
+    """
+    specs = enabled_series()
+    return specs, fetch_all_series(specs)
 
-    # 6. 核心策略判定
-    fired_levels = []
 
-    # 6.1) 上穿判定（70->80->90顺序，允许同日多级）
-    ups = crossings(prev7, today7, THRESHOLDS)
-    fired_levels.extend(ups)
+def run_monitor_mode(mode, specs, fetched):
+    """
+    执行一次监控判定（调用方需持有state_lock），返回值同main()
+    消息只写入发件箱，投递由调用方在释放锁后执行（drain_outbox / outbox.drain_async）
 
-    # 6.2) 连续两日 >=90 的 90桶判定（若未因上穿已触发）
-    if 90 not in ups and two_consecutive_ge(values, 90):
-        fired_levels.append(90)
+    所有启用的序列（见config.SERIES）由调用方在锁外获取（fetch_monitor_data）后逐个判定，
+    各自使用独立的阈值、冷却与状态；默认仅启用加密FGI主序列
+    """
+    # 1. 加载状态
+    state = load_state()
 
-    # 6.3) 低于60不卖：非硬条件，仅提示；不会清除已触发层的冷却
-    below_60_note = today7 < 60
+    # 2. 逐序列判定，消息写入发件箱
+    rc = 0
+    for spec in specs:
+        values = fetched[spec["key"]]
+        if isinstance(values, Exception):
+            print(f"Failed to fetch {spec['label']} data: {values}")
+            rc = 1
+            continue
+        process_series(spec, values, series_state(state, spec["key"]), mode)
+
+    # 3. 持久化状态（无修改时不写盘）；投递由调用方在释放锁后进行
+    save_state(state)
+    return rc
 
-    # 7. 冷却过滤
-    today = latest_day
-    final_levels = []
-    for t in fired_levels:
-        if not in_cooldown(state, t, today):
-            final_levels.append(t)
 
-    # 8. 组装消息
+def build_alert_message(
+    spec, today, latest_val, prev7, today7, fired_levels, final_levels, notes=()
+):
+    """组装卖出提醒消息（notes为说明类规则的提示）"""
+    primary = spec["key"] == PRIMARY_SERIES
     lines = []
-    lines.append("[卖出提醒] FGI7触发")
+    lines.append("[卖出提醒] FGI7触发" if primary else f"[卖出提醒] {spec['label']} 7日均值触发")
     lines.append(f"日期: {today} (UTC)")
     lines.append(f"今日FGI7: {today7} (昨日: {prev7})，今日FGI: {latest_val}")
 
     if final_levels:
         actions = []
         for t in final_levels:
-            pct = SELL_MAP[t]
+            pct = spec["sell_map"][t]
             actions.append(f"上穿{t} → 卖出{pct}%")
         lines.append("触发: " + "；".join(actions))
     else:
@@ -202,64 +234,176 @@ def main(mode="monitor"):
         else:
             lines.append("触发: 无")
 
-    if today7 < 60:
-        lines.append("说明: FGI7<60（不卖，仅提示）")
+    for note in notes:
+        lines.append(f"说明: {note}")
+
+    lines.append(
+        f"规则: 同一阈值{spec['cooldown_days']}天内只执行一次；跨级同日依序触发"
+    )
+    lines.append(f"数据源: {spec['source']}")
+
+    return "\n".join(lines)
+
 
-    lines.append("规则: 同一阈值7天内只执行一次；跨级同日依序触发")
-    lines.append("数据源: alternative.me")
+def process_series(spec, values, state, mode="monitor"):
+    """
+    对单个序列执行一次判定
 
-    message = "\n".join(lines)
+    参数:
+        spec: enabled_series() 返回的序列配置
+        values: [(date, value)] 按日期升序
+        state: 该序列的状态字典（series_state），判定结果直接写入
+        mode: "monitor" 或 "test"（测试模式忽略日期检查）
+    """
+    key = spec["key"]
+    primary = key == PRIMARY_SERIES
+    # 非主序列的幂等键带上序列名，避免与主序列冲突
+    key_prefix = "" if primary else f"{key}:"
+
+    # 增量FGI7：状态中保存窗口和与规则用到的连续天数，常见情况只推入新的一天；规则判定直接读取其结果
+    rules = rules_for(spec)
+    tracker = FGI7Tracker(rules.streak_conditions, data=state.get("fgi7"))
+    signal = tracker.advance(values) if values else None
+    if signal is None or signal.prev7 is None:
+        print(f"Insufficient {spec['label']} history; need >= {FGI7_WINDOW + 1} days.")
+        return
+    state["fgi7"] = tracker.to_dict()
+
+    # 今日自然日（按数据最后一天）
+    latest_day, latest_val = values[-1]
+    prev7, today7 = signal.prev7, signal.today7
+
+    # 配置了SQLite存储时同步日线与FGI7（已有日期覆盖，可重复执行）
+    store = get_store()
+    if store is not None:
+        store.upsert_values(key, values)
+
+    # 首次上线：记录状态，不触发历史信号
+    if BOOTSTRAP_SUPPRESS_FIRST_DAY and not bootstrapped(state):
+        set_bootstrapped(state)
+        mark_processed(state, latest_day)
+        outbox.enqueue(
+            f"{key_prefix}{latest_day}:bootstrap",
+            f"[初始化] 已上线并开始跟踪 {spec['label']}\n最近日期: {latest_day} FGI={latest_val} FGI7={today7}",
+        )
+        print(f"Bootstrapped {spec['label']}. No historical firing.")
+        return
 
-    # 9. 发送通知和汇报
+    # 无新日数据则跳过（测试模式除外）
+    if mode != "test":
+        last_proc = state.get("last_processed_date")
+        if last_proc:
+            last_proc_date = dt.datetime.strptime(last_proc, "%Y-%m-%d").date()
+            if latest_day <= last_proc_date:
+                print(
+                    f"No new day. latest={latest_day}, last_processed={last_proc_date}"
+                )
+                return
+    else:
+        print(f"[测试模式] 忽略日期检查，强制执行处理逻辑")
+
+    # 核心策略判定：按规则（默认为上穿、最高档连续2天、低于最低卖出水平说明）判定并做冷却过滤
+    today = latest_day
+    columns, runs = rules.frame(values, signal)
+    result = rules.evaluate(columns, runs, state=state, today=today)
+    fired_levels, final_levels = result.fired, result.final
+
+    suppressed = [t for t in fired_levels if t not in final_levels]
+    if suppressed:
+        # 冷却期内的触发不改变状态，仅写入事件日志备查
+        record_event(key, "suppressed", date=str(today), levels=suppressed)
+
+    # 写入发件箱：关键路径只落盘，不等待Telegram
+    # 提醒已持久化即视为送达，标记触发；实际投递在最后批量进行，失败留待下次运行重试
+    subscribers = subscriber_registry.load()
     if final_levels:
-        # 有触发时发送卖出提醒
-        try:
-            send_telegram(message)
-            for t in final_levels:
-                mark_trigger(state, t, today)
-            if VERBOSE_MODE:
-                print(f"Sent trigger notification for levels: {final_levels}")
-        except Exception as e:
-            print(f"Failed to send notification: {e}")
-            # 不返回错误，继续处理状态更新
+        if primary:
+            # 主序列按订阅者关注的阈值分组，每组的消息只列出本组关注的档位
+            groups = alert_groups(subscribers, fired_levels)
+        else:
+            # 其它序列的阈值与订阅者设置无关，提醒所有人
+            groups = {tuple(fired_levels): alert_recipients(subscribers)}
+        # 没有收件人时仍生成一次完整提醒（未配置Telegram时打印到控制台）
+        for levels, recipients in (groups or {tuple(fired_levels): []}).items():
+            group_final = [t for t in final_levels if t in levels]
+            if not group_final:
+                continue  # 本组关注的档位都在冷却期
+            message = build_alert_message(
+                spec, today, latest_val, prev7, today7, list(levels), group_final, result.notes
+            )
+            outbox.enqueue(key_prefix + outbox.alert_key(today, group_final), message, recipients)
+        for t in final_levels:
+            mark_trigger(state, t, today)
+        if VERBOSE_MODE:
+            print(f"Queued trigger notification for levels: {final_levels}")
     else:
         print("No final actions to notify.")
 
-    # 9.1 每日汇报功能（即使无触发也汇报）
-    if ENABLE_DAILY_REPORT:
+    # 每日汇报功能（即使无触发也汇报，仅主序列）
+    if ENABLE_DAILY_REPORT and primary:
         try:
-            report_message = generate_daily_report(
-                today, latest_val, prev7, today7, fired_levels, final_levels, state
-            )
-            if report_message:
-                send_telegram(report_message)
+            # 每种语言与关注阈值的组合渲染一次，发给该组的所有订阅者
+            recipients = [s for s in subscribers if s.alerts]
+            # 没有收件人时仍按默认语言与全部阈值生成一次汇报（未配置Telegram时打印到控制台）
+            groups = report_groups(recipients) or {(None, tuple(spec["thresholds"])): None}
+            for (locale, thresholds), chat_ids in groups.items():
+                report_message = generate_daily_report(
+                    today, latest_val, prev7, today7, fired_levels, final_levels, state, locale,
+                    thresholds, spec,
+                )
+                if not report_message:
+                    continue  # 本组关注的阈值没有需要汇报的情况
+                outbox.enqueue(
+                    f"{today}:report", report_message, chat_ids, priority=PRIORITY_REPORT
+                )
                 if VERBOSE_MODE:
-                    print("Sent daily report")
+                    print(f"Queued daily report ({locale}, {thresholds}, {len(chat_ids or [])} recipients)")
         except Exception as e:
             print(f"Failed to send daily report: {e}")
 
-    # 9.2 详细模式日志输出
+    # 详细模式日志输出
     if VERBOSE_MODE:
-        print(f"Verbose info:")
+        print(f"Verbose info ({spec['label']}):")
         print(f"  - Data points: {len(values)}")
         print(f"  - FGI7 trend: {prev7:.2f} → {today7:.2f} ({today7-prev7:+.2f})")
         print(f"  - Fired levels: {fired_levels}")
         print(f"  - Final levels: {final_levels}")
-        print(f"  - Cooldown status: {get_cooldown_status(state)}")
+        if primary:
+            print(f"  - Cooldown status: {get_cooldown_status(state, spec)}")
 
-    # 10. 更新处理标记与持久化
+    # 更新处理标记
     mark_processed(state, today)
-    save_state(state)
-    print("Done.")
-    return 0
+
+
+def drain_outbox():
+    """投递发件箱中到期的消息；投递失败不影响本次运行结果"""
+    try:
+        result = outbox.drain()
+        if result["sent"] or result["failed"] or VERBOSE_MODE:
+            print(
+                f"Outbox: sent={result['sent']} failed={result['failed']} pending={result['pending']}"
+            )
+    except Exception as e:
+        print(f"Failed to drain outbox: {e}")
 
 
 def generate_daily_report(
-    today, latest_val, prev7, today7, fired_levels, final_levels, state
+    today, latest_val, prev7, today7, fired_levels, final_levels, state, locale=None,
+    thresholds=THRESHOLDS, spec=None,
 ):
-    """生成每日数据汇报消息"""
+    """
+    生成每日数据汇报消息
+
+    参数:
+        locale: 汇报语言，默认REPORT_LOCALE
+        thresholds: 收件人关注的阈值；接近阈值、冷却抑制与冷却状态只看这些阈值
+        spec: 序列参数（冷却状态按其规则计算），默认主序列
+    """
+
+    fired_levels = [t for t in fired_levels if t in thresholds]
+    final_levels = [t for t in final_levels if t in thresholds]
 
-    # 如果有最终触发，不重复发送汇报（已经有卖出提醒了）
+    # 如果有最终触发，不重复发送汇报（已经收到卖出提醒了）
     if final_levels:
         return None
 
@@ -267,7 +411,7 @@ def generate_daily_report(
     should_report = False
 
     # 条件1：接近阈值时汇报
-    for threshold in THRESHOLDS:
+    for threshold in thresholds:
         distance = threshold - today7
         if 0 < distance <= REPORT_THRESHOLD_DISTANCE:
             should_report = True
@@ -288,97 +432,88 @@ def generate_daily_report(
     if not should_report:
         return None
 
-    # 生成汇报消息
-    lines = []
-    lines.append("📊 FGI监控系统状态汇报")
-    lines.append(f"日期: {today} (UTC)")
-    lines.append(f"今日FGI: {latest_val}")
-    lines.append(f"FGI7: {today7:.2f} (昨日: {prev7:.2f})")
-
-    # 趋势分析
-    change = today7 - prev7
-    if change > 0:
-        trend = f"📈 上升 (+{change:.2f})"
-    elif change < 0:
-        trend = f"📉 下降 ({change:.2f})"
-    else:
-        trend = f"➡️ 持平"
-    lines.append(f"趋势: {trend}")
-
-    # 阈值状态
-    threshold_status = []
-    for threshold in THRESHOLDS:
-        distance = threshold - today7
-        if distance <= 0:
-            threshold_status.append(f"{threshold}✅")
-        elif distance <= 5:
-            threshold_status.append(f"{threshold}⚠️({distance:.1f})")
-        else:
-            threshold_status.append(f"{threshold}😴({distance:.1f})")
-
-    lines.append(f"阈值状态: {' '.join(threshold_status)}")
-
-    # 特殊情况说明
-    if fired_levels and not final_levels:
-        lines.append("🔒 有信号触发但处于冷却期")
-
-    # 冷却状态
-    cooldown_info = get_cooldown_info(state)
-    if cooldown_info:
-        lines.append(f"冷却状态: {cooldown_info}")
-
-    lines.append("🤖 系统运行正常")
+    # 生成汇报消息（模板见 src/report_templates.py 的 daily）
+    cooling = [
+        (t, remaining)
+        for t, remaining in get_cooldown_status(state, spec).items()
+        if remaining > 0 and int(t) in thresholds
+    ]
+    return render_template(
+        "daily",
+        {
+            "today": today,
+            "latest_val": latest_val,
+            "prev7": prev7,
+            "today7": today7,
+            "change": today7 - prev7,
+            "thresholds": [{"level": t, "distance": t - today7} for t in thresholds],
+            "suppressed": bool(fired_levels and not final_levels),
+            "cooling": cooling,
+        },
+        locale,
+    )
+
+
+def get_cooldown_status(state, spec=None):
+    """
+    获取冷却状态字典
 
-    return "\n".join(lines)
+    档位与冷却天数取自序列的规则（rules_for）；同一档位有多条规则时取最长的冷却，不冷却的档位剩余为0
 
+    返回:
+        dict - {"档位": 剩余冷却天数}，按档位升序
+    """
+    if spec is None:
+        spec = next(s for s in enabled_series() if s["key"] == PRIMARY_SERIES)
+    cooldowns = {}
+    for rule in rules_for(spec).rules:
+        if rule.level is not None:
+            cooldowns[rule.level] = max(cooldowns.get(rule.level, 0), rule.cooldown or 0)
 
-def get_cooldown_status(state):
-    """获取冷却状态字典"""
     status = {}
     last_triggers = state.get("last_trigger_at", {})
-    today = today_utc_date()  # 添加今天的日期
+    today = today_utc_date()
 
-    for threshold in ["70", "80", "90"]:
-        last_trigger = last_triggers.get(threshold)
+    for level in sorted(cooldowns):
+        last_trigger = last_triggers.get(str(level))
         if last_trigger:
-            days_passed = days_since(last_trigger, today)  # 传入两个参数
-            remaining = max(0, COOLDOWN_DAYS - days_passed)
-            status[threshold] = remaining
+            days_passed = days_since(last_trigger, today)
+            status[str(level)] = max(0, cooldowns[level] - days_passed)
         else:
-            status[threshold] = 0  # 从未触发，无冷却
+            status[str(level)] = 0  # 从未触发，无冷却
 
     return status
 
 
-def get_cooldown_info(state):
-    """获取冷却信息字符串"""
-    status = get_cooldown_status(state)
+def run_bot_mode():
+    """运行Bot命令模式 - 仅处理交互命令，监控与定时汇报仍由定时任务负责"""
+    from src.runtime import run_runtime
 
-    cooling_down = []
-    for threshold, remaining in status.items():
-        if remaining > 0:
-            cooling_down.append(f"{threshold}({remaining}天)")
+    print("🤖 启动FGI Bot命令模式...")
+    return run_runtime(enable_monitor=False, enable_reports=False)
 
-    if cooling_down:
-        return f"冷却中: {', '.join(cooling_down)}"
-    else:
-        return "全部可触发"
 
+def run_webhook_mode():
+    """运行Bot Webhook模式 - 与bot模式相同，但通过本地HTTP服务接收更新，无需长轮询"""
+    from src.runtime import run_runtime
 
-def run_bot_mode():
-    """运行Bot命令模式 - 已禁用"""
-    print("🤖 Bot命令模式已禁用")
-    print("原因：事件循环兼容性问题")
-    print("")
-    print("📊 可用的替代方案：")
-    print("  1. 使用定时汇报获取数据（早中晚三次）")
-    print("  2. 运行 python test_commands.py 测试所有命令")
-    print("  3. 手动调用汇报函数：")
-    print("     from src.report_generator import get_status_report")
-    print("     print(get_status_report())")
-    print("")
-    print("💡 核心监控和定时汇报功能不受影响")
-    return 1
+    print("🤖 启动FGI Bot Webhook模式...")
+    return run_runtime(enable_monitor=False, enable_reports=False, bot_update_mode="webhook")
+
+
+def run_daemon_mode():
+    """运行常驻模式 - 进程保持热状态，按内部调度执行监控与定时汇报"""
+    from src.runtime import run_runtime
+
+    print("🔁 启动FGI常驻模式...")
+    return run_runtime()
+
+
+def run_backtest_mode():
+    """运行回测模式 - 数据文件可通过 FGI_BACKTEST_FILE 指定"""
+    from src.backtest import main as backtest_main
+
+    return backtest_main([])
 
 
 def run_scheduled_mode():
@@ -392,36 +527,19 @@ def run_scheduled_mode():
     try:
         handler = get_scheduled_reports_handler()
 
-        # 若提供了 RUN_SCHEDULE，则直接映射成报表类型并强制发送，避免因冷启动或装依赖延迟导致错过整点而不发
+        # 若提供了 RUN_SCHEDULE，则按cron中的UTC小时判定到期的汇报，避免因冷启动或装依赖延迟导致错过整点而不发；
+        # 只发给在该小时订阅了对应汇报的订阅者（各订阅者的汇报时间可以不同）
+        hour = None
         if run_schedule:
-            # 兼容旧/新两种半点/整点表达，全部映射
-            schedule_to_type = {
-                # 新：UTC 半点（推荐）→ 北京 08:30/12:30/20:30
-                "30 0 * * *": "morning",
-                "30 4 * * *": "noon",
-                "30 12 * * *": "evening",
-                # 旧：UTC 整点（历史配置兼容）
-                "0 0 * * *": "morning",
-                "0 4 * * *": "noon",
-                "0 12 * * *": "evening",
-            }
-
-            report_type = schedule_to_type.get(run_schedule)
-            if not report_type:
-                print(f"⚠️ 未识别的RUN_SCHEDULE='{run_schedule}'，回退按小时判定逻辑。")
+            # 兼容新（UTC半点，如 "30 0 * * *" → 北京 08:30）旧（UTC整点，如 "0 0 * * *"）两种表达
+            fields = run_schedule.split()
+            if len(fields) == 5 and fields[1].isdigit():
+                hour = int(fields[1])
             else:
-                # 初始化并强制发送指定报表类型
-                if not handler.initialize():
-                    print("❌ 定时汇报初始化失败")
-                    return 1
-
-                ok = asyncio.run(handler.send_scheduled_report(report_type))
-                status = "✅ 成功" if ok else "❌ 失败"
-                print(f"📊 {report_type}汇报: {status}")
-                return 0 if ok else 1
+                print(f"⚠️ 未识别的RUN_SCHEDULE='{run_schedule}'，回退按小时判定逻辑。")
 
-        # 未提供 RUN_SCHEDULE（如手动触发），沿用原先的小时判定流程
-        results = handler.run_scheduled_reports_sync()
+        # 未提供 RUN_SCHEDULE（如手动触发）时按当前小时判定
+        results = handler.run_scheduled_reports_sync(hour)
         if "error" in results:
             print(f"❌ 定时汇报失败: {results['error']}")
             return 1
@@ -432,7 +550,7 @@ def run_scheduled_mode():
                 print(f"📊 {report_type}汇报: {status}")
         else:
             print("ℹ️ 当前时段无需发送汇报")
-        return 0
+        return 0 if all(results.values()) else 1
     except Exception as e:
         print(f"❌ 定时汇报异常: {e}")
         return 1
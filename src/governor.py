@@ -0,0 +1,219 @@
+# FGI恐慌贪婪指数监控项目 - Telegram发送节流模块
+# 所有外发消息在发送前向同一个调度器申请发送时机，按Telegram的限制节流：
+#   - 全局：每秒约30条（令牌桶，均匀间隔）
+#   - 单个私聊：每秒1条；群组/频道（负号ID）：每分钟20条
+#   - 收到429时按retry_after暂停该收件人；短时间内多个收件人都收到429时才暂停全局发送，
+#     单个收件人被限流不拖慢整次广播
+# 等待中的消息按优先级出队：卖出提醒先于汇报发送
+
+import time
+import heapq
+import asyncio
+import itertools
+from collections import deque
+
+from src.config import (
+    TELEGRAM_GLOBAL_RATE,
+    TELEGRAM_CHAT_INTERVAL_SECONDS,
+    TELEGRAM_GROUP_RATE_PER_MINUTE,
+    TELEGRAM_GLOBAL_PAUSE_CHATS,
+    TELEGRAM_GLOBAL_PAUSE_WINDOW_SECONDS,
+)
+
+# 优先级（数值越小越先发送）
+PRIORITY_ALERT = 0  # 卖出提醒、初始化通知
+PRIORITY_REPORT = 1  # 每日汇报、定时汇报
+
+
+class OutboundGovernor:
+    """
+    外发消息调度器
+
+    每个收件人一个按优先级排序的等待队列；收件人在冷却期外时，其队首进入就绪堆，
+    调度任务每次从就绪堆取优先级最高（同级先到先得）的一条，在全局令牌可用时放行。
+    入队、放行均为O(log n)，大批量广播时也不会逐条扫描等待队列
+
+    调度器绑定到第一次使用它的事件循环；该循环上还有等待者时在另一个循环中使用会抛出RuntimeError，
+    等待者都已结束后（如下一次 asyncio.run）自动改绑到新循环
+    """
+
+    def __init__(
+        self,
+        global_rate: float = TELEGRAM_GLOBAL_RATE,
+        chat_interval: float = TELEGRAM_CHAT_INTERVAL_SECONDS,
+        group_rate_per_minute: float = TELEGRAM_GROUP_RATE_PER_MINUTE,
+        global_pause_chats: int = TELEGRAM_GLOBAL_PAUSE_CHATS,
+        global_pause_window: float = TELEGRAM_GLOBAL_PAUSE_WINDOW_SECONDS,
+        clock=time.monotonic,
+    ):
+        """
+        参数:
+            global_rate: 全局每秒发送上限（桶容量为1，消息均匀间隔发出，任意1秒内不超过上限）
+            chat_interval: 同一私聊两条消息的最小间隔（秒）
+            group_rate_per_minute: 群组/频道每分钟发送上限
+            global_pause_chats/global_pause_window: global_pause_window秒内有global_pause_chats个
+                不同收件人收到429时视为全局限流，暂停全部发送
+            clock: 时钟函数（秒）
+        """
+        self.global_rate = float(global_rate)
+        self.chat_interval = chat_interval
+        self.group_interval = 60.0 / group_rate_per_minute
+        self.global_pause_chats = global_pause_chats
+        self.global_pause_window = global_pause_window
+        self.clock = clock
+        self._seq = itertools.count()
+        self._tokens = 1.0
+        self._refilled = clock()
+        self._paused_until = 0.0  # 多个收件人429后的全局暂停
+        self._penalties = deque()  # [(收到429的时间, 收件人)]，只保留窗口内的
+        self._next_free = {}  # 收件人 -> 下次可发送时间
+        self._loop = None
+        self._reset()
+
+    def _reset(self):
+        """初始化等待队列（绑定到新的事件循环时调用，此时旧循环上已没有等待者）"""
+        self._queues = {}  # 收件人 -> [(优先级, 序号, future)]
+        self._ready = []  # [(优先级, 序号, 收件人)]，可能含过期项，出堆时校验
+        self._ready_key = {}  # 收件人 -> 就绪堆中有效项的(优先级, 序号)
+        self._cooling = []  # [(可发送时间, 收件人)]
+        self._cooling_set = set()
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def _interval(self, chat_id) -> float:
+        return self.group_interval if str(chat_id).startswith("-") else self.chat_interval
+
+    async def acquire(self, chat_id, priority: int = PRIORITY_ALERT):
+        """等待直到可以向chat_id发送一条消息"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # 每次 asyncio.run 都是新的事件循环；旧循环上仍有等待者时不能改绑，否则它们永远不会被放行
+            if any(not item[2].done() for queue in self._queues.values() for item in queue):
+                raise RuntimeError("OutboundGovernor正在另一个事件循环中使用，不能跨事件循环共用")
+            self._loop = loop
+            self._reset()
+
+        future = loop.create_future()
+        item = (priority, next(self._seq), future)
+        queue = self._queues.setdefault(chat_id, [])
+        heapq.heappush(queue, item)
+        if queue[0] is item and chat_id not in self._cooling_set:
+            self._schedule(chat_id, self.clock())
+
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._dispatch())
+        self._wakeup.set()
+        await future
+
+    def penalize(self, chat_id, retry_after: float):
+        """
+        收到429：该收件人暂停retry_after秒
+
+        global_pause_window秒内有global_pause_chats个不同收件人收到429时，全局也暂停retry_after秒
+        """
+        now = self.clock()
+        until = now + retry_after
+        self._next_free[chat_id] = max(self._next_free.get(chat_id, 0.0), until)
+
+        penalties = self._penalties
+        penalties.append((now, chat_id))
+        while penalties[0][0] <= now - self.global_pause_window:
+            penalties.popleft()
+        if len({c for _, c in penalties}) >= self.global_pause_chats:
+            self._paused_until = max(self._paused_until, until)
+
+    def _schedule(self, chat_id, now):
+        """收件人有等待的消息：冷却期外则队首进入就绪堆，否则进入冷却堆"""
+        ready_at = self._next_free.get(chat_id, 0.0)
+        if ready_at <= now:
+            priority, seq, _ = self._queues[chat_id][0]
+            heapq.heappush(self._ready, (priority, seq, chat_id))
+            self._ready_key[chat_id] = (priority, seq)
+        else:
+            heapq.heappush(self._cooling, (ready_at, chat_id))
+            self._cooling_set.add(chat_id)
+
+    def _take_token(self, now) -> float:
+        """尝试取一个全局令牌；返回还需等待的秒数（0表示已取得）"""
+        if now < self._paused_until:
+            return self._paused_until - now
+        self._tokens = min(1.0, self._tokens + (now - self._refilled) * self.global_rate)
+        self._refilled = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.global_rate
+
+    async def _dispatch(self):
+        """调度任务：按优先级与限速依次放行等待中的发送"""
+        while self._queues:
+            now = self.clock()
+            # 冷却结束的收件人进入就绪堆
+            while self._cooling and self._cooling[0][0] <= now:
+                _, chat_id = heapq.heappop(self._cooling)
+                self._cooling_set.discard(chat_id)
+                if chat_id in self._queues:
+                    self._schedule(chat_id, now)
+
+            head = self._pop_ready()
+            if head is None:
+                timeout = self._cooling[0][0] - now if self._cooling else None
+                await self._wait(timeout)
+                continue
+
+            wait = self._take_token(now)
+            if wait > 0:
+                # 令牌不足：放回就绪堆，等待期间可能有更高优先级的消息到达
+                heapq.heappush(self._ready, head)
+                self._ready_key[head[2]] = head[:2]
+                await self._wait(wait)
+                continue
+
+            _, _, chat_id = head
+            queue = self._queues[chat_id]
+            _, _, future = heapq.heappop(queue)
+            future.set_result(None)
+            self._next_free[chat_id] = now + self._interval(chat_id)
+            if queue:
+                self._schedule(chat_id, now)
+            else:
+                del self._queues[chat_id]
+
+        # 空闲时清理已过冷却期的收件人，内存不随收件人总数增长
+        now = self.clock()
+        self._next_free = {c: t for c, t in self._next_free.items() if t > now}
+        while self._penalties and self._penalties[0][0] <= now - self.global_pause_window:
+            self._penalties.popleft()
+
+    def _pop_ready(self):
+        """取出就绪堆中优先级最高的有效项（跳过过期项与已取消的等待）"""
+        while self._ready:
+            entry = heapq.heappop(self._ready)
+            priority, seq, chat_id = entry
+            if self._ready_key.get(chat_id) != (priority, seq):
+                continue  # 队首已被更高优先级的消息替换，新队首有自己的就绪项
+            del self._ready_key[chat_id]
+
+            queue = self._queues[chat_id]
+            while queue and queue[0][2].done():
+                heapq.heappop(queue)  # 等待方已取消
+            if not queue:
+                del self._queues[chat_id]
+            elif queue[0][1] != seq or self._next_free.get(chat_id, 0.0) > self.clock():
+                # 队首已变化，或进入就绪堆后该收件人收到429被暂停：重新安排
+                self._schedule(chat_id, self.clock())
+            else:
+                return entry
+        return None
+
+    async def _wait(self, timeout):
+        """等待新消息到达或超时"""
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+# 全局实例：进程内所有Telegram发送共用
+outbound_governor = OutboundGovernor()
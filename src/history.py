@@ -0,0 +1,89 @@
+# FGI恐慌贪婪指数监控项目 - 历史数据存储模块
+# 负责FGI日线数据的本地持久化（追加写入的紧凑CSV），支撑fetch_fgi的增量拉取
+
+import os
+import datetime as dt
+
+from src.state import STATE_DIR, DATE_FMT, state_lock
+
+# 历史文件配置：每行 "YYYY-MM-DD,value"，只追加不改写
+HISTORY_FILE = os.path.join(STATE_DIR, "fgi_history.csv")
+
+
+def load_history(path=HISTORY_FILE):
+    """
+    读取本地FGI历史
+
+    文件为追加写入，同一日期可能出现多行（数据源修订时），
+    以最后写入的一行为准，与fetch_fgi原有的去重规则一致
+
+    返回:
+        list - [(date, value)] 按日期升序；文件不存在时返回空列表
+    """
+    if not os.path.exists(path):
+        return []
+
+    dedup = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                day_str, val_str = line.split(",", 1)
+                day = dt.datetime.strptime(day_str, DATE_FMT).date()
+                dedup[day] = int(val_str)
+            except ValueError:
+                # 跳过写入中断留下的残缺行，不影响其余数据
+                continue
+
+    return sorted(dedup.items(), key=lambda x: x[0])
+
+
+def append_history(rows, history=None, path=HISTORY_FILE):
+    """
+    将新数据追加到本地历史
+
+    仅写入本地尚不存在、或数值发生变化的日期，已有数据保持不变
+
+    参数:
+        rows: [(date, value)] 新获取的数据
+        history: 已加载的历史（可选，避免重复读文件）
+        path: 历史文件路径
+
+    返回:
+        list - 实际追加的 [(date, value)]
+    """
+    if history is None:
+        history = load_history(path)
+    known = dict(history)
+
+    new_rows = [
+        (day, val) for day, val in sorted(rows, key=lambda x: x[0]) if known.get(day) != val
+    ]
+    if not new_rows:
+        return []
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with state_lock(), open(path, "a", encoding="utf-8") as f:
+        f.write("".join(f"{day.strftime(DATE_FMT)},{val}\n" for day, val in new_rows))
+    return new_rows
+
+
+def merge_history(history, new_rows):
+    """合并已加载历史与新追加的数据，返回按日期升序的 [(date, value)]"""
+    merged = dict(history)
+    merged.update(new_rows)
+    return sorted(merged.items(), key=lambda x: x[0])
+
+
+def missing_days(history, today):
+    """
+    计算本地历史距离今天缺少的天数
+
+    返回:
+        int 或 None - 0表示今日数据已在本地；None表示本地尚无历史
+    """
+    if not history:
+        return None
+    return max(0, (today - history[-1][0]).days)
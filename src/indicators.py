@@ -0,0 +1,305 @@
+# FGI恐慌贪婪指数监控项目 - 技术指标模块
+# FGI7之外的指标（EMA、WMA、滑动中位数、标准差/Z分数、变化率、百分位）按配置组合，
+# 一次遍历序列同时计算：相同窗口长度的指标共用一个滑动窗口（窗口和、平方和、有序表），
+# 每个数据点只入窗一次，增加指标不会增加遍历次数
+
+import math
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from typing import Dict, List, Optional
+
+from src.config import INDICATORS
+from src.strategy import crossings
+
+
+class RollingBuffer:
+    """
+    共享滑动窗口
+
+    维护最近size个值及其和、平方和；有指标需要排序信息（中位数、百分位）时同时维护有序表
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.values = deque()
+        self.total = 0
+        self.total_sq = 0
+        self.ordered = None  # 有序表，按需启用
+
+    def enable_ordered(self):
+        if self.ordered is None:
+            self.ordered = []
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.size
+
+    def push(self, x):
+        """加入新值，返回被移出窗口的旧值（窗口未满时为None）"""
+        dropped = None
+        if self.full:
+            dropped = self.values.popleft()
+            self.total -= dropped
+            self.total_sq -= dropped * dropped
+            if self.ordered is not None:
+                del self.ordered[bisect_left(self.ordered, dropped)]
+        self.values.append(x)
+        self.total += x
+        self.total_sq += x * x
+        if self.ordered is not None:
+            insort(self.ordered, x)
+        return dropped
+
+    def mean(self) -> float:
+        return self.total / len(self.values)
+
+    def std(self) -> float:
+        """总体标准差"""
+        n = len(self.values)
+        var = self.total_sq / n - (self.total / n) ** 2
+        return math.sqrt(max(0.0, var))
+
+
+class Indicator:
+    """
+    指标基类
+
+    buffer_size: 使用的共享窗口长度；ordered: 是否需要有序表
+    update在共享窗口加入当日值之后调用，返回当日指标值（数据不足时为None）
+    """
+
+    kind = None
+    ordered = False
+
+    def __init__(self, window: int):
+        self.window = window
+        self.buffer_size = window
+
+    def reset(self):
+        pass
+
+    def update(self, buf: RollingBuffer, x, dropped) -> Optional[float]:
+        raise NotImplementedError
+
+
+class SMA(Indicator):
+    """简单移动平均"""
+
+    kind = "sma"
+
+    def update(self, buf, x, dropped):
+        return buf.mean() if buf.full else None
+
+
+class EMA(Indicator):
+    """指数移动平均（alpha = 2/(window+1)，以前window天的简单平均为初值）"""
+
+    kind = "ema"
+
+    def __init__(self, window: int):
+        super().__init__(window)
+        self.alpha = 2.0 / (window + 1)
+        self.reset()
+
+    def reset(self):
+        self.value = None
+
+    def update(self, buf, x, dropped):
+        if self.value is None:
+            if buf.full:
+                self.value = buf.mean()
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value
+
+
+class WMA(Indicator):
+    """
+    线性加权移动平均（最近一天权重为window，最早一天为1）
+
+    加权和增量更新: 新加权和 = 旧加权和 - 旧窗口和 + window×新值
+    """
+
+    kind = "wma"
+
+    def __init__(self, window: int):
+        super().__init__(window)
+        self.denominator = window * (window + 1) / 2
+        self.reset()
+
+    def reset(self):
+        self.weighted = 0
+
+    def update(self, buf, x, dropped):
+        n = len(buf.values)
+        if dropped is None:
+            self.weighted += n * x  # 窗口未满：权重1..n
+        else:
+            previous_total = buf.total - x + dropped
+            self.weighted += self.window * x - previous_total
+        return self.weighted / self.denominator if buf.full else None
+
+
+class RollingMedian(Indicator):
+    """滑动中位数"""
+
+    kind = "median"
+    ordered = True
+
+    def update(self, buf, x, dropped):
+        if not buf.full:
+            return None
+        s, n = buf.ordered, self.window
+        mid = n // 2
+        return float(s[mid]) if n % 2 else (s[mid - 1] + s[mid]) / 2
+
+
+class RollingStd(Indicator):
+    """滑动标准差（总体）"""
+
+    kind = "std"
+
+    def update(self, buf, x, dropped):
+        return buf.std() if buf.full else None
+
+
+class ZScore(Indicator):
+    """Z分数：当日值偏离窗口均值多少个标准差（窗口值全相同时为0）"""
+
+    kind = "zscore"
+
+    def update(self, buf, x, dropped):
+        if not buf.full:
+            return None
+        std = buf.std()
+        return (x - buf.mean()) / std if std > 0 else 0.0
+
+
+class ROC(Indicator):
+    """变化率：相对window天前的涨跌百分比（window天前为0时无定义）"""
+
+    kind = "roc"
+
+    def __init__(self, window: int):
+        super().__init__(window)
+        self.buffer_size = window + 1  # 需要window天前的值
+
+    def update(self, buf, x, dropped):
+        if not buf.full or buf.values[0] == 0:
+            return None
+        base = buf.values[0]
+        return (x - base) / base * 100
+
+
+class PercentileRank(Indicator):
+    """百分位：窗口内不高于当日值的比例（%）"""
+
+    kind = "pctrank"
+    ordered = True
+
+    def update(self, buf, x, dropped):
+        if not buf.full:
+            return None
+        return bisect_right(buf.ordered, x) / self.window * 100
+
+
+INDICATOR_TYPES = {
+    cls.kind: cls for cls in (SMA, EMA, WMA, RollingMedian, RollingStd, ZScore, ROC, PercentileRank)
+}
+
+
+class IndicatorSet:
+    """
+    一组指标（按配置创建），一次遍历同时计算
+
+    配置项: {"name": 名称, "type": INDICATOR_TYPES中的类型, "window": 窗口天数}
+    """
+
+    def __init__(self, specs=None, ndigits: Optional[int] = 2):
+        """
+        参数:
+            specs: 指标配置列表，默认取config.INDICATORS
+            ndigits: 结果保留的小数位（与FGI7一致取2位），None表示不取整
+        """
+        self.specs = list(INDICATORS if specs is None else specs)
+        self.ndigits = ndigits
+        self.indicators = {}
+        for spec in self.specs:
+            try:
+                cls = INDICATOR_TYPES[spec["type"]]
+            except KeyError:
+                raise ValueError(f"Unknown indicator type: {spec['type']}") from None
+            if spec["name"] in self.indicators:
+                raise ValueError(f"Duplicate indicator name: {spec['name']}")
+            self.indicators[spec["name"]] = cls(int(spec["window"]))
+
+    @property
+    def lookback(self) -> int:
+        """算出全部指标最后一个值所需的最少天数"""
+        return max((ind.buffer_size for ind in self.indicators.values()), default=0)
+
+    def compute(self, values) -> Dict[str, List[Optional[float]]]:
+        """
+        计算整条指标序列
+
+        参数:
+            values: [(date, value)] 按日期升序
+
+        返回:
+            dict - {指标名: 与values等长的序列}，数据不足的日期为None
+        """
+        buffers = {}
+        for ind in self.indicators.values():
+            ind.reset()
+            buf = buffers.setdefault(ind.buffer_size, RollingBuffer(ind.buffer_size))
+            if ind.ordered:
+                buf.enable_ordered()
+
+        out = {name: [] for name in self.indicators}
+        items = list(self.indicators.items())
+        ndigits = self.ndigits
+        for _, x in values:
+            dropped = {size: buf.push(x) for size, buf in buffers.items()}
+            for name, ind in items:
+                v = ind.update(buffers[ind.buffer_size], x, dropped[ind.buffer_size])
+                if v is not None and ndigits is not None:
+                    v = round(v, ndigits)
+                out[name].append(v)
+        return out
+
+    def summary(self, values) -> List[Dict]:
+        """
+        各指标的最新值与日变化（供汇报使用）
+
+        返回:
+            list - [{"name", "kind", "window", "value", "change"}]，按配置顺序；
+                   数据不足时value/change为None
+        """
+        series = self.compute(values)
+        rows = []
+        for name, ind in self.indicators.items():
+            s = series[name]
+            value = s[-1] if s else None
+            prev = s[-2] if len(s) > 1 else None
+            change = None
+            if value is not None and prev is not None:
+                change = round(value - prev, self.ndigits) if self.ndigits is not None else value - prev
+            rows.append(
+                {"name": name, "kind": ind.kind, "window": ind.window, "value": value, "change": change}
+            )
+        return rows
+
+
+def indicator_crossings(series: Dict[str, List[Optional[float]]], name: str, thresholds) -> List[int]:
+    """
+    在指定指标上做上穿判定（与FGI7的crossings规则相同：昨日 <= 阈值 且 今日 > 阈值）
+
+    参数:
+        series: IndicatorSet.compute 的结果
+        name: 指标名
+        thresholds: 阈值列表
+    """
+    s = series[name]
+    if len(s) < 2:
+        return []
+    return crossings(s[-2], s[-1], thresholds)
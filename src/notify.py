@@ -1,15 +1,23 @@
 # FGI恐慌贪婪指数监控项目 - 通知发送模块
-# 负责通过Telegram Bot API发送卖出提醒消息（支持多收件人）
+# 统一的Telegram投递层：监控提醒与定时汇报共用连接池和并发批量发送（支持多收件人）
 
 import os
-import requests
+import asyncio
+from typing import NamedTuple, Optional
+
+import httpx
+
+from src.config import TELEGRAM_SEND_CONCURRENCY, TELEGRAM_MAX_RETRIES
+from src.governor import PRIORITY_ALERT, outbound_governor
 
 # 从环境变量读取Telegram配置
 TG_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TG_CHAT = os.getenv("TELEGRAM_CHAT_ID")
+# API地址可覆盖，便于指向本地桩服务器测试
+TG_API_BASE = os.getenv("TELEGRAM_API_BASE", "https://api.telegram.org").rstrip("/")
 
 
-def _parse_chat_ids(raw: str):
+def parse_chat_ids(raw: str):
     """将环境变量中的 Chat ID 字符串解析为列表
 
     支持分隔符：逗号(,)、分号(;)、空白(空格/制表/换行)。
@@ -28,43 +36,224 @@ def _parse_chat_ids(raw: str):
     return ids
 
 
-def send_telegram(text):
-    """发送消息到Telegram（支持多收件人）
+# 兼容旧名称
+_parse_chat_ids = parse_chat_ids
 
-    参数:
-        text: 要发送的消息内容
 
-    返回:
-        list[dict] 或 None - 每个收件人的API响应字典；配置缺失时返回None
+def require_no_running_loop(async_variant: str):
     """
-    # 检查必要的环境变量是否配置
-    if not TG_TOKEN or not TG_CHAT:
-        print("Telegram not configured; printing message:\n", text)
-        return None
-
-    # 解析收件人列表
-    chat_ids = _parse_chat_ids(TG_CHAT)
-    if not chat_ids:
-        print("No valid TELEGRAM_CHAT_ID provided; printing message:\n", text)
-        return None
-
-    url = f"https://api.telegram.org/bot{TG_TOKEN}/sendMessage"
-    results = []
-    last_error = None
+    同步入口的前置检查：当前线程已有运行中的事件循环（Bot、常驻模式）时，
+    既不能再asyncio.run，也不能阻塞等待该循环，此时提示改用对应的异步接口
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    raise RuntimeError(f"Called from a running event loop; use `await {async_variant}` instead")
 
-    for cid in chat_ids:
-        payload = {"chat_id": cid, "text": text}
-        try:
-            r = requests.post(url, json=payload, timeout=15)
+
+def run_sync(coro, async_variant: str):
+    """在新事件循环中执行协程并返回结果（同步入口共用，见require_no_running_loop）"""
+    try:
+        require_no_running_loop(async_variant)
+    except RuntimeError:
+        coro.close()
+        raise
+    return asyncio.run(coro)
+
+
+class OutboundMessage(NamedTuple):
+    """一条待发送的消息（单个收件人）"""
+
+    chat_id: str
+    text: str
+    parse_mode: Optional[str] = None
+    priority: int = PRIORITY_ALERT  # 见 src/governor.py，提醒先于汇报发送
+
+
+class _Session:
+    """一个事件循环上的连接池与并发信号量（引用计数，最后一个使用者退出时关闭）"""
+
+    def __init__(self, concurrency: int):
+        limits = httpx.Limits(
+            max_connections=concurrency,
+            max_keepalive_connections=concurrency,
+        )
+        self.client = httpx.AsyncClient(timeout=15, limits=limits)
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.users = 0
+
+
+class TelegramDelivery:
+    """
+    Telegram统一投递层
+
+    监控提醒（send_telegram）与定时汇报共用同一个实例：
+    - 每个事件循环一个keep-alive连接池（httpx.AsyncClient），同一循环上的批量共用
+    - 所有消息×收件人在一次批量中并发发送，并发数受TELEGRAM_SEND_CONCURRENCY限制
+    - 每条消息发送前经调度器按全局/单收件人限速放行，提醒先于汇报
+    - 遇到429时调度器按retry_after暂停，之后重试
+    连接池按事件循环引用计数：长驻进程可用 `async with delivery:` 在整个生命周期保持连接池；
+    每次批量发送也各持有一次引用，并发的批量不会关闭彼此正在使用的连接池
+    """
+
+    def __init__(self, token=None, chat_ids=None, api_base=None, concurrency=None, governor=None):
+        self.token = token if token is not None else TG_TOKEN
+        self.chat_ids = chat_ids if chat_ids is not None else parse_chat_ids(TG_CHAT)
+        self.api_base = (api_base or TG_API_BASE).rstrip("/")
+        self.concurrency = concurrency or TELEGRAM_SEND_CONCURRENCY
+        self.governor = governor or outbound_governor
+        self._sessions = {}  # 事件循环 -> _Session
+
+    def is_configured(self) -> bool:
+        """Token与收件人是否均已配置"""
+        return bool(self.token and self.chat_ids)
+
+    async def __aenter__(self):
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None:
+            session = self._sessions[loop] = _Session(self.concurrency)
+        session.users += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        loop = asyncio.get_running_loop()
+        session = self._sessions[loop]
+        session.users -= 1
+        if session.users == 0:
+            del self._sessions[loop]
+            await session.client.aclose()
+
+    async def _post(self, session, payload, priority=PRIORITY_ALERT):
+        """发送单条消息；发送前等待调度器放行，遇到429按retry_after暂停后重试"""
+        url = f"{self.api_base}/bot{self.token}/sendMessage"
+        for attempt in range(TELEGRAM_MAX_RETRIES + 1):
+            await self.governor.acquire(payload["chat_id"], priority)
+            async with session.semaphore:
+                r = await session.client.post(url, json=payload)
+            if r.status_code == 429 and attempt < TELEGRAM_MAX_RETRIES:
+                try:
+                    retry_after = r.json().get("parameters", {}).get("retry_after", 1)
+                except ValueError:
+                    retry_after = 1
+                print(
+                    f"Rate limited for chat_id={payload['chat_id']}; retry after {retry_after}s"
+                )
+                self.governor.penalize(payload["chat_id"], retry_after)
+                continue
             r.raise_for_status()
-            results.append(r.json())
-        except requests.exceptions.RequestException as e:
+            return r.json()
+
+    async def send_many(self, messages):
+        """
+        并发发送一批消息
+
+        参数:
+            messages: [OutboundMessage]
+
+        返回:
+            list - 与messages一一对应，成功为API响应字典，失败为异常对象
+        """
+        payloads = []
+        for m in messages:
+            payload = {"chat_id": m.chat_id, "text": m.text}
+            if m.parse_mode:
+                payload["parse_mode"] = m.parse_mode
+            payloads.append(payload)
+
+        async with self:
+            session = self._sessions[asyncio.get_running_loop()]
+            return await asyncio.gather(
+                *[self._post(session, p, m.priority) for p, m in zip(payloads, messages)],
+                return_exceptions=True,
+            )
+
+    async def broadcast(self, texts, parse_mode=None, chat_ids=None):
+        """
+        将多条文本发送给所有收件人（一次并发批量）
+
+        返回:
+            list - 与texts对应，每项为按收件人顺序排列的结果列表（响应字典或异常）
+        """
+        chat_ids = self.chat_ids if chat_ids is None else chat_ids
+        messages = [
+            OutboundMessage(cid, text, parse_mode) for text in texts for cid in chat_ids
+        ]
+        flat = await self.send_many(messages)
+        n = len(chat_ids)
+        return [flat[i * n : (i + 1) * n] for i in range(len(texts))]
+
+    def broadcast_sync(self, texts, parse_mode=None):
+        """同步入口：在新事件循环中执行一次批量广播（事件循环内请用broadcast）"""
+        return run_sync(self.broadcast(texts, parse_mode), "TelegramDelivery.broadcast(...)")
+
+
+# 全局实例：监控提醒与定时汇报共用
+telegram_delivery = TelegramDelivery()
+
+
+def _collect(chat_ids, results, text):
+    """整理单条消息的投递结果：全部失败时抛出最后一个错误，否则返回成功响应列表"""
+    ok = []
+    last_error = None
+    for cid, res in zip(chat_ids, results):
+        if isinstance(res, Exception):
             # 不中断其它收件人，记录最后一次错误便于排查
-            last_error = e
-            print(f"Failed to send to chat_id={cid}: {e}")
+            last_error = res
+            print(f"Failed to send to chat_id={cid}: {res}")
             print(f"Message content: {text}")
+        else:
+            ok.append(res)
 
-    # 如果全部失败，抛出最后一个错误；否则返回成功/失败的混合结果
-    if not results and last_error is not None:
+    if not ok and last_error is not None:
         raise last_error
-    return results
+    return ok
+
+
+def send_telegram_batch(texts):
+    """一次并发发送多条消息给所有收件人
+
+    参数:
+        texts: 消息内容列表
+
+    返回:
+        list - 与texts对应；每项为send_telegram同形的返回值，
+               或该消息全部收件人均失败时的异常对象
+
+    异常:
+        RuntimeError - 在运行中的事件循环内调用（请改用 telegram_delivery.broadcast）
+    """
+    require_no_running_loop("telegram_delivery.broadcast(...)")
+    if not telegram_delivery.token or not TG_CHAT:
+        for text in texts:
+            print("Telegram not configured; printing message:\n", text)
+        return [None] * len(texts)
+
+    if not telegram_delivery.chat_ids:
+        for text in texts:
+            print("No valid TELEGRAM_CHAT_ID provided; printing message:\n", text)
+        return [None] * len(texts)
+
+    out = []
+    for text, results in zip(texts, telegram_delivery.broadcast_sync(texts)):
+        try:
+            out.append(_collect(telegram_delivery.chat_ids, results, text))
+        except Exception as e:
+            out.append(e)
+    return out
+
+
+def send_telegram(text):
+    """发送消息到Telegram（支持多收件人，并发发送）
+
+    参数:
+        text: 要发送的消息内容
+
+    返回:
+        list[dict] 或 None - 每个收件人的API响应字典；配置缺失时返回None
+    """
+    result = send_telegram_batch([text])[0]
+    if isinstance(result, Exception):
+        raise result
+    return result
@@ -0,0 +1,238 @@
+# FGI恐慌贪婪指数监控项目 - 发件箱模块
+# 提醒消息先持久化到 state/outbox.json，再批量投递；失败按指数退避重试，幂等键防止重复发送
+
+import os
+import json
+import asyncio
+import datetime as dt
+
+from src.config import (
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_BACKOFF_BASE_SECONDS,
+    OUTBOX_BACKOFF_MAX_SECONDS,
+    OUTBOX_RETENTION_DAYS,
+    OUTBOX_LEASE_SECONDS,
+    TELEGRAM_GLOBAL_RATE,
+)
+from src.state import STATE_DIR, state_lock, atomic_write_json
+from src.notify import OutboundMessage, telegram_delivery, run_sync
+from src.governor import PRIORITY_ALERT
+from src.subscribers import subscriber_registry, alert_recipients
+from src.store import get_store
+
+OUTBOX_FILE = os.path.join(STATE_DIR, "outbox.json")
+TS_FMT = "%Y-%m-%dT%H:%M:%S"
+
+# 消息状态
+PENDING = "pending"
+SENT = "sent"
+DEAD = "dead"  # 超过最大重试次数，不再投递
+
+
+def _now():
+    return dt.datetime.utcnow().replace(microsecond=0)
+
+
+def load_outbox(path=OUTBOX_FILE):
+    """加载发件箱，返回 {幂等键: 消息记录}"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("messages", {})
+
+
+def save_outbox(messages, path=OUTBOX_FILE):
+    """保存发件箱（原子写入）"""
+    atomic_write_json(path, {"messages": messages})
+
+
+def alert_key(date_obj, levels):
+    """卖出提醒的幂等键前缀：日期 + 触发阈值"""
+    return f"{date_obj.strftime('%Y-%m-%d')}:{'+'.join(str(t) for t in levels)}"
+
+
+def enqueue(key, text, chat_ids=None, parse_mode=None, priority=PRIORITY_ALERT, path=OUTBOX_FILE):
+    """
+    将消息写入发件箱（每个收件人一条，幂等键 = key + 收件人）
+
+    同一幂等键已存在时（无论是否已发送）直接跳过，保证同一提醒不会重复入队
+
+    参数:
+        key: 幂等键前缀，如 alert_key(today, [70, 80]) 或 "2024-01-15:report"
+        text: 消息内容
+        chat_ids: 收件人列表，默认为接收提醒的全部订阅者
+        parse_mode: 可选的Telegram解析模式
+        priority: 发送优先级（PRIORITY_ALERT / PRIORITY_REPORT）
+
+    返回:
+        list - 新入队的幂等键；未配置Telegram时打印消息并返回空列表
+    """
+    if not telegram_delivery.token:
+        print("Telegram not configured; printing message:\n", text)
+        return []
+    if chat_ids is None:
+        chat_ids = alert_recipients(subscriber_registry.load())
+    if not chat_ids:
+        print(f"No recipients for {key}; skipped")
+        return []
+
+    with state_lock():
+        messages = load_outbox(path)
+        now = _now().strftime(TS_FMT)
+        added = []
+        for cid in chat_ids:
+            msg_key = f"{key}:{cid}"
+            if msg_key in messages:
+                continue
+            messages[msg_key] = {
+                "chat_id": cid,
+                "text": text,
+                "parse_mode": parse_mode,
+                "priority": priority,
+                "status": PENDING,
+                "attempts": 0,
+                "created_at": now,
+                "next_attempt_at": now,
+                "sent_at": None,
+                "last_error": None,
+            }
+            added.append(msg_key)
+
+        if added:
+            save_outbox(messages, path)
+    return added
+
+
+def _backoff(attempts):
+    """第attempts次失败后的等待秒数（指数退避，有上限）"""
+    return min(OUTBOX_BACKOFF_MAX_SECONDS, OUTBOX_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1))
+
+
+def _prune(messages, now):
+    """清理超过保留期的已发送/已放弃记录，保持文件紧凑"""
+    cutoff = now - dt.timedelta(days=OUTBOX_RETENTION_DAYS)
+    return {
+        k: m
+        for k, m in messages.items()
+        if m["status"] == PENDING
+        or dt.datetime.strptime(m["created_at"], TS_FMT) >= cutoff
+    }
+
+
+def _claim_due(path=OUTBOX_FILE):
+    """
+    选出到期的待发送消息并加租约
+
+    租约期间其它投递者不会再选中这些消息，避免多进程/多任务重复发送；
+    投递进程中途崩溃时租约到期后自动重新投递
+
+    返回:
+        dict - {幂等键: 消息记录}
+    """
+    with state_lock():
+        messages = load_outbox(path)
+        now = _now()
+        due = {
+            k: dict(m)
+            for k, m in messages.items()
+            if m["status"] == PENDING
+            and dt.datetime.strptime(m["next_attempt_at"], TS_FMT) <= now
+        }
+        if due:
+            # 发送按全局限速进行，大批量时租约需覆盖整批的发送时长
+            lease = OUTBOX_LEASE_SECONDS + len(due) / TELEGRAM_GLOBAL_RATE
+            lease_until = (now + dt.timedelta(seconds=lease)).strftime(TS_FMT)
+            for k in due:
+                messages[k]["next_attempt_at"] = lease_until
+            save_outbox(messages, path)
+        return due
+
+
+def _apply_results(due, results, path=OUTBOX_FILE):
+    """
+    写回投递结果
+
+    重新读取发件箱后只更新本次投递的记录，期间新入队的消息不受影响
+
+    返回:
+        dict - {"sent": n, "failed": n, "pending": n}
+    """
+    with state_lock():
+        messages = load_outbox(path)
+        done_at = _now()
+        sent = failed = 0
+        for k, res in zip(due, results):
+            m = messages.get(k)
+            if m is None:
+                continue
+            m["attempts"] += 1
+            if isinstance(res, Exception):
+                failed += 1
+                m["last_error"] = str(res)
+                if m["attempts"] >= OUTBOX_MAX_ATTEMPTS:
+                    m["status"] = DEAD
+                    print(f"Giving up on {k} after {m['attempts']} attempts: {res}")
+                else:
+                    retry_at = done_at + dt.timedelta(seconds=_backoff(m["attempts"]))
+                    m["next_attempt_at"] = retry_at.strftime(TS_FMT)
+                    print(f"Failed to send {k}: {res}; retry at {m['next_attempt_at']}")
+            else:
+                sent += 1
+                m["status"] = SENT
+                m["sent_at"] = done_at.strftime(TS_FMT)
+                m["last_error"] = None
+
+        store = get_store()
+        if store is not None:
+            store.log_deliveries(
+                [
+                    (k, messages[k]["chat_id"], messages[k]["status"], messages[k]["attempts"],
+                     messages[k]["last_error"])
+                    for k in due
+                    if k in messages
+                ]
+            )
+
+        pruned = _prune(messages, done_at)
+        if due or len(pruned) != len(messages):
+            save_outbox(pruned, path)
+
+        pending = sum(1 for m in pruned.values() if m["status"] == PENDING)
+        return {"sent": sent, "failed": failed, "pending": pending}
+
+
+async def drain_async(path=OUTBOX_FILE, delivery=None):
+    """
+    投递发件箱中所有到期的待发送消息（一次并发批量）
+
+    成功的标记为已发送，失败的累计重试次数并按指数退避安排下次投递，
+    超过最大次数标记为dead。文件读写在线程池中进行、只在读写时持锁，
+    网络发送期间不持锁，也不阻塞事件循环
+
+    返回:
+        dict - {"sent": n, "failed": n, "pending": n}
+    """
+    delivery = delivery or telegram_delivery
+    due = await asyncio.to_thread(_claim_due, path)
+
+    results = []
+    if due:
+        results = await delivery.send_many(
+            [
+                OutboundMessage(
+                    m["chat_id"], m["text"], m["parse_mode"], m.get("priority", PRIORITY_ALERT)
+                )
+                for m in due.values()
+            ]
+        )
+
+    return await asyncio.to_thread(_apply_results, list(due), results, path)
+
+
+def drain(path=OUTBOX_FILE):
+    """
+    同步入口：投递发件箱中到期的消息（调用方不能持有state_lock）
+
+    在运行中的事件循环内调用时抛出RuntimeError，请改用 await drain_async()
+    """
+    return run_sync(drain_async(path), "outbox.drain_async()")
@@ -0,0 +1,153 @@
+# FGI恐慌贪婪指数监控项目 - 令牌桶限流模块
+# Bot命令按用户限流：每个用户一个令牌桶，检查只做一次补充和扣减，与历史请求数无关
+# 进程内实现按最近使用顺序保存用户，空闲或超出容量的用户直接淘汰，内存有上限；
+# 需要多个进程（如daemon与单独的bot进程）共享额度时，使用基于本地SQLite文件的实现
+
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from src.config import (
+    BOT_RATE_LIMIT,
+    BOT_RATE_LIMIT_BURST,
+    BOT_RATE_LIMIT_MAX_USERS,
+    BOT_RATE_LIMIT_STORE,
+)
+
+
+def _idle_seconds(rate_per_minute, burst):
+    """空闲多久后可丢弃用户的桶：此时桶必然已补满，丢弃与保留等价"""
+    return 60.0 * burst / rate_per_minute
+
+
+class TokenBucketLimiter:
+    """进程内令牌桶限流器（O(1)检查，内存有上限）"""
+
+    def __init__(
+        self,
+        rate_per_minute: float = BOT_RATE_LIMIT,
+        burst: int = BOT_RATE_LIMIT_BURST,
+        max_users: int = BOT_RATE_LIMIT_MAX_USERS,
+        clock=time.monotonic,
+    ):
+        """
+        参数:
+            rate_per_minute: 每分钟补充的令牌数
+            burst: 桶容量（允许的突发次数）
+            max_users: 最多保留的用户数，超出时淘汰最久未使用的用户
+            clock: 时钟函数（秒）
+        """
+        self.rate = rate_per_minute / 60.0
+        self.burst = float(burst)
+        self.max_users = max_users
+        self.idle = _idle_seconds(rate_per_minute, burst)
+        self.clock = clock
+        self._buckets = OrderedDict()  # 用户 -> (令牌数, 上次更新时间)，按最近使用排序
+        self._lock = threading.Lock()
+
+    def allow(self, key) -> bool:
+        """消耗一个令牌；令牌不足时返回False"""
+        now = self.clock()
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            self._evict(now)
+        return allowed
+
+    def _evict(self, now):
+        """淘汰空闲（桶已补满）的用户，以及超出容量的最久未使用用户"""
+        buckets = self._buckets
+        while buckets:
+            key, (_, last) = next(iter(buckets.items()))
+            if len(buckets) <= self.max_users and now - last < self.idle:
+                break
+            del buckets[key]
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class SQLiteTokenBucketLimiter:
+    """
+    多进程共享的令牌桶限流器
+
+    桶保存在本地SQLite文件中，每次检查在一个写事务内完成读取、补充和扣减，
+    多个进程对同一用户的并发检查不会超额
+    """
+
+    _PRUNE_EVERY = 256  # 每多少次检查清理一次空闲的桶
+
+    def __init__(
+        self,
+        path: str,
+        rate_per_minute: float = BOT_RATE_LIMIT,
+        burst: int = BOT_RATE_LIMIT_BURST,
+        clock=time.time,
+    ):
+        """
+        参数:
+            path: SQLite文件路径
+            rate_per_minute / burst: 同 TokenBucketLimiter
+            clock: 时钟函数（秒），跨进程共享需使用墙上时间
+        """
+        self.path = path
+        self.rate = rate_per_minute / 60.0
+        self.burst = float(burst)
+        self.idle = _idle_seconds(rate_per_minute, burst)
+        self.clock = clock
+        self._checks = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+
+    def allow(self, key) -> bool:
+        """消耗一个令牌；令牌不足时返回False"""
+        key = str(key)
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = self.clock()
+                row = conn.execute(
+                    "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+                ).fetchone()
+                tokens, last = row if row else (self.burst, now)
+                tokens = min(self.burst, tokens + max(0.0, now - last) * self.rate)
+                allowed = tokens >= 1
+                if allowed:
+                    tokens -= 1
+                conn.execute(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                    (key, tokens, now),
+                )
+                self._checks += 1
+                if self._checks % self._PRUNE_EVERY == 0:
+                    conn.execute("DELETE FROM buckets WHERE updated < ?", (now - self.idle,))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return allowed
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM buckets").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+
+def make_limiter(store: str = BOT_RATE_LIMIT_STORE):
+    """按配置创建限流器：指定了共享存储文件时跨进程共享，否则仅在进程内生效"""
+    if store:
+        return SQLiteTokenBucketLimiter(store)
+    return TokenBucketLimiter()
@@ -7,6 +7,9 @@ FGI监控系统 - 统一汇报生成器
 
 import os
 import sys
+import json
+import hashlib
+import threading
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 
@@ -18,17 +21,39 @@ from src.config import (
     SELL_MAP,
     COOLDOWN_DAYS,
     REPORT_THRESHOLD_DISTANCE,
+    REPORT_LOCALE,
+    INDICATORS,
 )
-from src.state import load_state, days_since, today_utc_date
-from src.strategy import compute_fgi7, crossings, two_consecutive_ge
+from src.templates import get_templates
+from src.state import (
+    STATE_DIR,
+    DATE_FMT,
+    load_state,
+    days_since,
+    today_utc_date,
+    atomic_write_json,
+)
+from src.strategy import (
+    compute_fgi7,
+    crossings,
+    two_consecutive_ge,
+    fgi7_series,
+    rolling_mean,
+)
+from src.indicators import IndicatorSet
 
 
-# 避免循环导入，动态导入 fetch_fgi
-def fetch_fgi():
-    """动态导入并调用fetch_fgi函数"""
-    from src.fgi_notifier import fetch_fgi as _fetch_fgi
+from src.data_cache import fgi_cache
+from src.subscribers import report_groups
 
-    return _fetch_fgi()
+# 报告快照：所有汇报的预生成结果，输入未变化时跨进程复用
+SNAPSHOT_FILE = os.path.join(STATE_DIR, "report_snapshot.json")
+SNAPSHOT_FORMAT = 3  # 汇报格式变化时递增，使旧快照失效
+SCHEDULED_REPORT_TYPES = ("morning", "noon", "evening")
+REPORT_TYPES = ("status", "detailed", "trend") + SCHEDULED_REPORT_TYPES
+
+# Bot命令在线程池中并发生成汇报，共享的生成器实例需串行访问，避免读到刷新了一半的数据
+_render_lock = threading.RLock()
 
 
 class FGIReportGenerator:
@@ -37,21 +62,38 @@ class FGIReportGenerator:
     def __init__(self):
         """初始化汇报生成器"""
         self.data = None
+        self.fgi7 = ()  # 整条FGI7序列，由滑动平均引擎一次算出
         self.prev7 = None
         self.today7 = None
         self.latest_fgi = None
         self.latest_date = None
         self.state = None
-
-    def refresh_data(self):
-        """刷新FGI数据"""
+        self.indicators = IndicatorSet()  # 趋势分析中的技术指标（一次遍历算出）
+        self._data_version = None  # 已加载数据对应的缓存版本
+        self._snapshot = None  # 当前报告快照
+        self._snapshot_inputs = None  # 当前快照对应的快速比较键
+
+    def refresh_data(self, allow_stale: bool = True):
+        """
+        刷新FGI数据
+
+        数据来自进程内共享缓存：有效期内不访问网络；
+        allow_stale为True时缓存过期也先用旧数据，后台刷新
+        """
         try:
-            # 获取最新数据
-            self.data = fetch_fgi()
-            self.prev7, self.today7 = compute_fgi7(self.data)
-            self.latest_fgi = self.data[-1][1] if self.data else None
-            self.latest_date = self.data[-1][0] if self.data else None
-            self.state = load_state()
+            # 获取最新数据（可能访问网络，不持锁）
+            data = fgi_cache.get(allow_stale=allow_stale)
+            version = fgi_cache.version
+            state = load_state()
+
+            with _render_lock:
+                self.data = data
+                self._data_version = version
+                self.fgi7 = fgi7_series(self.data)
+                self.prev7, self.today7 = compute_fgi7(self.data)
+                self.latest_fgi = self.data[-1][1] if self.data else None
+                self.latest_date = self.data[-1][0] if self.data else None
+                self.state = state
 
             return True
         except Exception as e:
@@ -60,321 +102,222 @@ class FGIReportGenerator:
 
     def generate_status_report(self) -> str:
         """生成状态概览汇报"""
-        if not self._ensure_data():
-            return "❌ 数据获取失败，无法生成状态汇报"
-
-        lines = []
-        lines.append("📊 FGI状态概览")
-        lines.append(f"📅 日期: {self.latest_date}")
-        lines.append(f"📈 当前FGI: {self.latest_fgi}")
-        lines.append(f"📊 FGI7: {self.today7:.2f}")
-
-        # 趋势判断
-        change = self.today7 - self.prev7
-        if change > 0:
-            trend = f"📈 上升 (+{change:.2f})"
-        elif change < 0:
-            trend = f"📉 下降 ({change:.2f})"
-        else:
-            trend = f"➡️ 持平"
-        lines.append(f"📈 趋势: {trend}")
-
-        # 市场情绪
-        mood = self._get_market_mood(self.today7)
-        lines.append(f"💭 市场情绪: {mood}")
-
-        # 下个阈值距离
-        next_threshold_info = self._get_next_threshold_info()
-        if next_threshold_info:
-            lines.append(f"🎯 下个阈值: {next_threshold_info}")
-
-        return "\n".join(lines)
+        return self._report("status") or "❌ 数据获取失败，无法生成状态汇报"
 
     def generate_detailed_report(self) -> str:
         """生成详细FGI数据分析汇报"""
-        if not self._ensure_data():
-            return "❌ 数据获取失败，无法生成详细汇报"
-
-        lines = []
-        lines.append("📊 FGI详细数据分析")
-        lines.append(f"📅 日期: {self.latest_date} (UTC)")
-        lines.append("")
-
-        # 当前数据
-        lines.append("📈 当前数据:")
-        lines.append(f"  • 今日FGI: {self.latest_fgi}")
-        lines.append(f"  • FGI7: {self.today7:.2f} (昨日: {self.prev7:.2f})")
-
-        change = self.today7 - self.prev7
-        change_str = f"{change:+.2f}"
-        lines.append(f"  • 变化: {change_str}")
-
-        # 阈值分析
-        lines.append("")
-        lines.append("🎯 阈值分析:")
-        for threshold in THRESHOLDS:
-            distance = threshold - self.today7
-            if distance <= 0:
-                status = f"✅ 已超过 (+{abs(distance):.2f})"
-            elif distance <= 5:
-                status = f"⚠️ 接近 (-{distance:.2f})"
-            else:
-                status = f"😴 较远 (-{distance:.2f})"
-
-            sell_pct = SELL_MAP.get(threshold, 0)
-            lines.append(f"  • 阈值{threshold} (卖出{sell_pct}%): {status}")
-
-        # 冷却状态
-        cooldown_info = self._get_cooldown_status()
-        if cooldown_info:
-            lines.append("")
-            lines.append("🧊 冷却状态:")
-            for info in cooldown_info:
-                lines.append(f"  • {info}")
-
-        # 最近趋势
-        recent_trend = self._get_recent_trend()
-        if recent_trend:
-            lines.append("")
-            lines.append("📈 最近趋势:")
-            lines.append(recent_trend)
-
-        return "\n".join(lines)
+        return self._report("detailed") or "❌ 数据获取失败，无法生成详细汇报"
 
     def generate_trend_report(self) -> str:
         """生成趋势分析汇报"""
-        if not self._ensure_data():
-            return "❌ 数据获取失败，无法生成趋势分析"
-
-        lines = []
-        lines.append("📈 FGI趋势分析")
-        lines.append(f"📅 分析日期: {self.latest_date}")
-        lines.append("")
-
-        # 短期趋势（7天）
-        short_trend = self._analyze_short_trend()
-        lines.append("📊 短期趋势 (7天):")
-        lines.append(short_trend)
-
-        # 中期趋势（14天）
-        medium_trend = self._analyze_medium_trend()
-        lines.append("")
-        lines.append("📊 中期趋势 (14天):")
-        lines.append(medium_trend)
-
-        # 关键水平分析
-        key_levels = self._analyze_key_levels()
-        lines.append("")
-        lines.append("🔑 关键水平:")
-        lines.append(key_levels)
-
-        return "\n".join(lines)
+        return self._report("trend") or "❌ 数据获取失败，无法生成趋势分析"
 
     def generate_scheduled_report(self, report_type: str) -> Optional[str]:
         """生成定时汇报"""
-        if not self._ensure_data():
+        if report_type not in SCHEDULED_REPORT_TYPES:
             return None
+        return self._report(report_type)
 
-        current_hour = datetime.utcnow().hour
+    def render_batch(self, report_type: str, subscribers) -> List[Tuple[str, List[str]]]:
+        """
+        为一批订阅者生成汇报
 
-        if report_type == "morning":
-            return self._generate_morning_report()
-        elif report_type == "noon":
-            return self._generate_noon_report()
-        elif report_type == "evening":
-            return self._generate_evening_report()
-        else:
-            return None
+        语言和关注阈值相同的订阅者收到的内容完全一致，按此分组后每组只渲染一次，
+        渲染结果相同的组再合并，订阅者再多也只生成少量不同的消息
 
-    def _generate_morning_report(self) -> str:
-        """生成早报"""
-        lines = []
-        lines.append("🌅 FGI晨报")
-        lines.append(f"📅 {self.latest_date} (UTC)")
-        lines.append("")
-
-        # 隔夜变化
-        lines.append("🌙 隔夜市场:")
-        lines.append(f"  • 当前FGI: {self.latest_fgi}")
-        lines.append(f"  • FGI7: {self.today7:.2f}")
-
-        # 今日关注点
-        attention_points = self._get_daily_attention_points()
-        if attention_points:
-            lines.append("")
-            lines.append("👀 今日关注:")
-            for point in attention_points:
-                lines.append(f"  • {point}")
-
-        lines.append("")
-        lines.append("☀️ 祝您交易愉快！")
-        return "\n".join(lines)
-
-    def _generate_noon_report(self) -> str:
-        """生成午报"""
-        lines = []
-        # 去除固定分钟标注，避免与调度半点不一致
-        lines.append("🌞 FGI午报")
-        lines.append(f"📅 {self.latest_date} (UTC)")
-        lines.append("")
-
-        # 中期状态
-        lines.append("📊 中期状态:")
-        lines.append(
-            f"  • FGI7: {self.today7:.2f} ({self.prev7:.2f} → {self.today7:.2f})"
-        )
+        参数:
+            report_type: 汇报类型
+            subscribers: [Subscriber]（需有 chat_id、locale、thresholds）
 
-        mood = self._get_market_mood(self.today7)
-        lines.append(f"  • 市场情绪: {mood}")
-
-        # 阈值状态
-        threshold_alert = self._get_threshold_alerts()
-        if threshold_alert:
-            lines.append("")
-            lines.append("⚠️ 阈值提醒:")
-            lines.append(f"  • {threshold_alert}")
-
-        return "\n".join(lines)
-
-    def _generate_evening_report(self) -> str:
-        """生成晚报"""
-        lines = []
-        # 去除固定分钟标注，避免与调度半点不一致
-        lines.append("🌅 FGI晚报")
-        lines.append(f"📅 {self.latest_date} (UTC)")
-        lines.append("")
-
-        # 全日总结
-        lines.append("📊 今日总结:")
-        lines.append(f"  • FGI: {self.latest_fgi}")
-        lines.append(f"  • FGI7: {self.prev7:.2f} → {self.today7:.2f}")
-
-        change = self.today7 - self.prev7
-        if abs(change) >= 2:
-            change_desc = "显著" if abs(change) >= 5 else "明显"
-            direction = "上升" if change > 0 else "下降"
-            lines.append(f"  • 变化: {change_desc}{direction} ({change:+.2f})")
-
-        # 明日展望
-        outlook = self._get_tomorrow_outlook()
-        if outlook:
-            lines.append("")
-            lines.append("🔮 明日展望:")
-            lines.append(f"  • {outlook}")
-
-        lines.append("")
-        lines.append("🌙 晚安，明日见！")
-        return "\n".join(lines)
+        返回:
+            list - [(汇报文本, [chat_id])]；数据获取失败时返回空列表
+        """
+        if not self._ensure_data():
+            return []
+        snap = self.snapshot()
+
+        batch = {}
+        for (locale, thresholds), chat_ids in report_groups(subscribers).items():
+            text = snap.variant(thresholds).get(report_type, locale)
+            if text:
+                batch.setdefault(text, []).extend(chat_ids)
+        return list(batch.items())
+
+    def _report(self, report_type: str) -> Optional[str]:
+        """从当前快照中取出指定类型的汇报；数据获取失败时返回None"""
+        if not self._ensure_data():
+            return None
+        return self.snapshot().get(report_type)
+
+    def snapshot(self) -> "ReportSnapshot":
+        """
+        获取当前数据对应的报告快照
+
+        依次查找内存、磁盘上的快照，数据、冷却状态、日期和配置都未变化时直接复用；
+        否则重新计算派生指标、生成全部汇报并写入磁盘
+        """
+        # 快速路径：同一份缓存数据、冷却记录与日期未变化时无需重新计算缓存键
+        inputs = (
+            self._data_version,
+            tuple(sorted(self.state.get("last_trigger_at", {}).items())),
+            today_utc_date(),
+        )
+        if self._snapshot is not None and self._snapshot_inputs == inputs:
+            return self._snapshot
+
+        key = self._snapshot_key()
+        if self._snapshot is not None and self._snapshot.key == key:
+            self._snapshot_inputs = inputs
+            return self._snapshot
+
+        snap = load_snapshot()
+        if snap is None or snap.key != key:
+            snap = self._build_snapshot(key)
+            try:
+                save_snapshot(snap)
+            except OSError as e:
+                print(f"报告快照写入失败: {e}")
+
+        self._snapshot = snap
+        self._snapshot_inputs = inputs
+        return snap
+
+    def _snapshot_key(self) -> str:
+        """快照的缓存键：汇报用到的全部输入（最近数据、冷却记录、UTC日期、策略配置）"""
+        inputs = [
+            SNAPSHOT_FORMAT,
+            len(self.data),
+            [
+                [d.strftime(DATE_FMT), v]
+                for d, v in self.data[-max(15, self.indicators.lookback + 1) :]
+            ],
+            self.state.get("last_trigger_at", {}),
+            today_utc_date().strftime(DATE_FMT),
+            THRESHOLDS,
+            sorted(SELL_MAP.items()),
+            COOLDOWN_DAYS,
+            REPORT_THRESHOLD_DISTANCE,
+            INDICATORS,
+        ]
+        raw = json.dumps(inputs, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _build_snapshot(self, key: str) -> "ReportSnapshot":
+        """计算一次派生指标，并据此生成默认语言的所有汇报"""
+        snap = ReportSnapshot(key, self._derive_metrics(), {})
+        snap.render_all(REPORT_LOCALE)
+        return snap
+
+    def _derive_metrics(self) -> Dict:
+        """
+        计算所有汇报共用的派生指标
+
+        返回:
+            dict - 可JSON序列化、与语言无关的指标（描述性内容以代码表示，由模板词表翻译）
+        """
+        today7 = self.today7
+        change = today7 - self.prev7
+
+        m = {
+            "latest_date": str(self.latest_date),
+            "latest_fgi": self.latest_fgi,
+            "prev7": self.prev7,
+            "today7": today7,
+            "change": change,
+            "mood": self._get_market_mood(today7),
+            "cooldown_days": COOLDOWN_DAYS,
+            "cooldowns": self._get_cooldown_days(),
+            "recent_trend": self._get_recent_trend(),
+            "short_trend": self._short_trend_stats(),
+            "medium_trend": self._medium_trend_stats(),
+            "indicators": self.indicators.summary(self.data),
+        }
+        m.update(threshold_metrics(m, THRESHOLDS))
+        return m
 
     def _ensure_data(self) -> bool:
-        """确保数据已加载"""
-        if self.data is None:
+        """确保数据已加载，且与共享缓存中的最新版本一致"""
+        if self.data is None or self._data_version != fgi_cache.version:
             return self.refresh_data()
         return True
 
     def _get_market_mood(self, fgi7_value: float) -> str:
-        """获取市场情绪描述"""
+        """获取市场情绪代码（文字见模板词表MOOD）"""
         if fgi7_value >= 75:
-            return "🔥 极度贪婪"
+            return "extreme_greed"
         elif fgi7_value >= 55:
-            return "📈 贪婪"
+            return "greed"
         elif fgi7_value >= 45:
-            return "⚖️ 中性"
+            return "neutral"
         elif fgi7_value >= 25:
-            return "📉 恐惧"
+            return "fear"
         else:
-            return "🥶 极度恐惧"
-
-    def _get_next_threshold_info(self) -> Optional[str]:
-        """获取下个阈值信息"""
-        for threshold in THRESHOLDS:
-            if self.today7 < threshold:
-                distance = threshold - self.today7
-                sell_pct = SELL_MAP.get(threshold, 0)
-                return f"距离{threshold}阈值还有{distance:.1f}点 (卖出{sell_pct}%)"
-        return None
+            return "extreme_fear"
 
-    def _get_cooldown_status(self) -> List[str]:
-        """获取冷却状态信息"""
-        status_list = []
+    def _get_cooldown_days(self) -> Dict[str, Optional[int]]:
+        """各阈值距上次触发的天数，从未触发为None"""
         last_triggers = self.state.get("last_trigger_at", {})
         today = today_utc_date()
 
+        cooldowns = {}
         for threshold in ["70", "80", "90"]:
             last_trigger = last_triggers.get(threshold)
-            if last_trigger:
-                days_passed = days_since(last_trigger, today)
-                remaining = max(0, COOLDOWN_DAYS - days_passed)
-                if remaining > 0:
-                    status_list.append(f"阈值{threshold}: 冷却中 (还需{remaining}天)")
-                else:
-                    status_list.append(f"阈值{threshold}: ✅ 可触发")
-            else:
-                status_list.append(f"阈值{threshold}: ✅ 可触发 (从未触发)")
-
-        return status_list
+            cooldowns[threshold] = days_since(last_trigger, today) if last_trigger else None
+        return cooldowns
 
     def _get_recent_trend(self) -> str:
-        """获取最近趋势信息"""
+        """获取最近3天趋势代码（文字见模板词表RECENT）"""
         if len(self.data) < 3:
-            return "数据不足"
+            return "insufficient"
 
         # 分析最近3天的趋势
         recent_values = [fgi for _, fgi in self.data[-3:]]
 
         if recent_values[2] > recent_values[1] > recent_values[0]:
-            return "📈 连续上升趋势"
+            return "rising"
         elif recent_values[2] < recent_values[1] < recent_values[0]:
-            return "📉 连续下降趋势"
+            return "falling"
         elif recent_values[2] > recent_values[0]:
-            return "📈 整体上升"
+            return "up"
         elif recent_values[2] < recent_values[0]:
-            return "📉 整体下降"
+            return "down"
         else:
-            return "➡️ 相对稳定"
+            return "flat"
 
-    def _analyze_short_trend(self) -> str:
-        """分析短期趋势"""
+    def _short_trend_stats(self) -> Optional[Dict]:
+        """短期趋势（7天）统计；数据不足时返回None"""
         if len(self.data) < 7:
-            return "  数据不足"
+            return None
 
         # 计算7天内的变化
         week_ago_fgi = self.data[-7][1]
         change = self.latest_fgi - week_ago_fgi
 
-        lines = []
-        lines.append(f"  • 7天前FGI: {week_ago_fgi}")
-        lines.append(f"  • 当前FGI: {self.latest_fgi}")
-        lines.append(f"  • 变化: {change:+.1f}")
-
         if abs(change) >= 10:
-            intensity = "强烈"
+            intensity = "strong"
         elif abs(change) >= 5:
-            intensity = "明显"
+            intensity = "notable"
         else:
-            intensity = "温和"
-
-        direction = "上升" if change > 0 else "下降" if change < 0 else "持平"
-        lines.append(f"  • 趋势: {intensity}{direction}")
-
-        return "\n".join(lines)
-
-    def _analyze_medium_trend(self) -> str:
-        """分析中期趋势"""
+            intensity = "mild"
+
+        direction = "up" if change > 0 else "down" if change < 0 else "flat"
+        return {
+            "week_ago_fgi": week_ago_fgi,
+            "change": change,
+            "intensity": intensity,
+            "direction": direction,
+        }
+
+    def _medium_trend_stats(self) -> Optional[Dict]:
+        """中期趋势（14天）统计；数据不足时返回None"""
         if len(self.data) < 14:
-            return "  数据不足"
+            return None
 
         # 计算14天内的最高、最低和平均值
         two_weeks_data = [fgi for _, fgi in self.data[-14:]]
         max_fgi = max(two_weeks_data)
         min_fgi = min(two_weeks_data)
-        avg_fgi = sum(two_weeks_data) / len(two_weeks_data)
-
-        lines = []
-        lines.append(f"  • 14天最高: {max_fgi}")
-        lines.append(f"  • 14天最低: {min_fgi}")
-        lines.append(f"  • 14天均值: {avg_fgi:.1f}")
-        lines.append(f"  • 当前位置: {self.latest_fgi}")
+        avg_fgi = rolling_mean(two_weeks_data, 14, ndigits=None)[-1]
 
         # 判断当前位置
         range_size = max_fgi - min_fgi
@@ -383,94 +326,137 @@ class FGIReportGenerator:
         )
 
         if current_position > 0.8:
-            position_desc = "高位区间"
+            position_desc = "high"
         elif current_position > 0.6:
-            position_desc = "中高位区间"
+            position_desc = "mid_high"
         elif current_position > 0.4:
-            position_desc = "中位区间"
+            position_desc = "mid"
         elif current_position > 0.2:
-            position_desc = "中低位区间"
+            position_desc = "mid_low"
         else:
-            position_desc = "低位区间"
-
-        lines.append(f"  • 区间位置: {position_desc}")
-
-        return "\n".join(lines)
-
-    def _analyze_key_levels(self) -> str:
-        """分析关键水平"""
-        lines = []
-
-        # 分析相对于阈值的位置
-        for threshold in THRESHOLDS:
-            distance = threshold - self.today7
-            sell_pct = SELL_MAP.get(threshold, 0)
-
-            if distance <= 0:
-                lines.append(f"  • {threshold}阈值: ✅ 已突破 (卖出{sell_pct}%)")
-            elif distance <= 5:
-                lines.append(f"  • {threshold}阈值: ⚠️ 临近 ({distance:.1f}点)")
-            else:
-                lines.append(f"  • {threshold}阈值: 😴 较远 ({distance:.1f}点)")
-
-        return "\n".join(lines)
-
-    def _get_daily_attention_points(self) -> List[str]:
-        """获取今日关注点"""
-        points = []
-
-        # 检查是否接近阈值
-        for threshold in THRESHOLDS:
-            distance = threshold - self.today7
-            if 0 < distance <= REPORT_THRESHOLD_DISTANCE:
-                points.append(f"接近{threshold}阈值 (还有{distance:.1f}点)")
-
-        # 检查冷却状态
-        last_triggers = self.state.get("last_trigger_at", {})
-        today = today_utc_date()
-
-        for threshold_str in ["70", "80", "90"]:
-            last_trigger = last_triggers.get(threshold_str)
-            if last_trigger:
-                days_passed = days_since(last_trigger, today)
-                if days_passed == COOLDOWN_DAYS:
-                    points.append(f"{threshold_str}阈值冷却期结束，重新激活")
-
-        # 如果没有特别关注点，添加通用关注
-        if not points:
-            mood = self._get_market_mood(self.today7)
-            points.append(f"市场情绪{mood}，保持关注")
-
-        return points
-
-    def _get_threshold_alerts(self) -> Optional[str]:
-        """获取阈值警报"""
-        for threshold in THRESHOLDS:
-            distance = threshold - self.today7
-            if 0 < distance <= 5:  # 距离阈值5点以内
-                return f"距离{threshold}阈值仅{distance:.1f}点"
+            position_desc = "low"
+
+        return {"max": max_fgi, "min": min_fgi, "avg": avg_fgi, "position": position_desc}
+
+
+def threshold_metrics(m: Dict, thresholds) -> Dict:
+    """
+    与关注阈值相关的指标（阈值距离、下一阈值、接近提醒、今日关注点）
+
+    参数:
+        m: 派生指标（需含 today7 与 cooldowns）
+        thresholds: 关注的阈值，订阅者可只关注其中一部分
+
+    返回:
+        dict - thresholds / next_threshold / threshold_alert / attention
+    """
+    today7 = m["today7"]
+    levels = [
+        {"level": t, "distance": t - today7, "sell_pct": SELL_MAP.get(t, 0)}
+        for t in thresholds
+    ]
+    out = {
+        "thresholds": levels,
+        # 第一个尚未突破的阈值
+        "next_threshold": next((t for t in levels if t["distance"] > 0), None),
+        # 距离阈值5点以内时提醒
+        "threshold_alert": next((t for t in levels if 0 < t["distance"] <= 5), None),
+    }
+    out["attention"] = daily_attention_points({**m, **out})
+    return out
+
+
+def daily_attention_points(m: Dict) -> List[List]:
+    """
+    获取今日关注点
+
+    返回:
+        list - [["near", 阈值, 距离] | ["cooldown_end", 阈值] | ["mood"]]，由模板渲染
+    """
+    points = []
+
+    # 检查是否接近阈值
+    for t in m["thresholds"]:
+        if 0 < t["distance"] <= REPORT_THRESHOLD_DISTANCE:
+            points.append(["near", t["level"], t["distance"]])
+
+    # 检查冷却状态
+    for threshold, days_passed in m["cooldowns"].items():
+        if days_passed == COOLDOWN_DAYS:
+            points.append(["cooldown_end", threshold])
+
+    # 如果没有特别关注点，添加通用关注
+    if not points:
+        points.append(["mood"])
+
+    return points
+
+
+class ReportSnapshot:
+    """
+    报告快照
+
+    一次数据更新对应一份：派生指标只计算一次，所有汇报与命令回复据此预先生成，
+    之后按类型直接取用；同时写入磁盘，其它进程在输入未变化时可直接复用
+    """
+
+    def __init__(self, key: str, metrics: Dict, reports: Dict[str, Dict[str, str]]):
+        self.key = key
+        self.metrics = metrics
+        self.reports = reports  # {语言: {汇报类型: 文本}}
+        self._variants = {}  # 关注阈值 -> 快照，供自定义阈值的订阅者使用（仅在内存中）
+
+    def render_all(self, locale: str) -> Dict[str, str]:
+        """用指定语言的模板生成全部汇报"""
+        templates = get_templates(locale)
+        rendered = {t: templates.render(t, self.metrics) for t in REPORT_TYPES}
+        self.reports[locale] = rendered
+        return rendered
+
+    def get(self, report_type: str, locale: Optional[str] = None) -> Optional[str]:
+        """取出指定类型的汇报文本；其它语言首次请求时由同一份指标渲染"""
+        locale = locale or REPORT_LOCALE
+        reports = self.reports.get(locale)
+        if reports is None:
+            reports = self.render_all(locale)
+        return reports.get(report_type)
+
+    def variant(self, thresholds) -> "ReportSnapshot":
+        """
+        关注阈值不同的订阅者使用的快照
+
+        只重算与阈值相关的指标，其余指标共享；同一组阈值只生成一次
+        """
+        thresholds = tuple(thresholds)
+        if thresholds == tuple(THRESHOLDS):
+            return self
+        snap = self._variants.get(thresholds)
+        if snap is None:
+            metrics = {**self.metrics, **threshold_metrics(self.metrics, thresholds)}
+            snap = ReportSnapshot(self.key, metrics, {})
+            self._variants[thresholds] = snap
+        return snap
+
+    def to_dict(self) -> Dict:
+        return {"key": self.key, "metrics": self.metrics, "reports": self.reports}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ReportSnapshot":
+        return cls(data["key"], data["metrics"], data["reports"])
+
+
+def load_snapshot(path: str = SNAPSHOT_FILE) -> Optional[ReportSnapshot]:
+    """读取磁盘上的报告快照；不存在或损坏时返回None"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return ReportSnapshot.from_dict(json.load(f))
+    except (OSError, ValueError, KeyError):
         return None
 
-    def _get_tomorrow_outlook(self) -> Optional[str]:
-        """获取明日展望"""
-        # 基于当前趋势给出简单展望
-        change = self.today7 - self.prev7
-
-        if abs(change) < 1:
-            return "趋势相对稳定，关注突破方向"
-        elif change > 0:
-            next_threshold = None
-            for threshold in THRESHOLDS:
-                if self.today7 < threshold:
-                    next_threshold = threshold
-                    break
-            if next_threshold:
-                distance = next_threshold - self.today7
-                if distance <= 10:
-                    return f"上升趋势中，关注{next_threshold}阈值突破"
-            return "上升趋势中，保持关注"
-        else:
-            return "下降趋势中，关注支撑水平"
+
+def save_snapshot(snapshot: ReportSnapshot, path: str = SNAPSHOT_FILE):
+    """保存报告快照（原子写入）"""
+    atomic_write_json(path, snapshot.to_dict())
 
 
 # 全局实例
@@ -480,22 +466,32 @@ report_generator = FGIReportGenerator()
 # 便捷函数
 def get_status_report() -> str:
     """获取状态概览汇报"""
-    return report_generator.generate_status_report()
+    with _render_lock:
+        return report_generator.generate_status_report()
 
 
 def get_detailed_report() -> str:
     """获取详细汇报"""
-    return report_generator.generate_detailed_report()
+    with _render_lock:
+        return report_generator.generate_detailed_report()
 
 
 def get_trend_report() -> str:
     """获取趋势分析汇报"""
-    return report_generator.generate_trend_report()
+    with _render_lock:
+        return report_generator.generate_trend_report()
 
 
 def get_scheduled_report(report_type: str) -> Optional[str]:
     """获取定时汇报"""
-    return report_generator.generate_scheduled_report(report_type)
+    with _render_lock:
+        return report_generator.generate_scheduled_report(report_type)
+
+
+def render_batch(report_type: str, subscribers) -> List[Tuple[str, List[str]]]:
+    """为一批订阅者生成汇报，返回 [(汇报文本, [chat_id])]"""
+    with _render_lock:
+        return report_generator.render_batch(report_type, subscribers)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,464 @@
+# FGI恐慌贪婪指数监控项目 - 汇报模板
+# 各语言的汇报模板、局部模板和词表；语法见 src/templates.py
+# 新增语言只需补充需要翻译的部分，缺失的模板沿用默认语言（REPORT_LOCALE）
+
+ZH = {
+    "constants": {
+        "MOOD": {
+            "extreme_greed": "🔥 极度贪婪",
+            "greed": "📈 贪婪",
+            "neutral": "⚖️ 中性",
+            "fear": "📉 恐惧",
+            "extreme_fear": "🥶 极度恐惧",
+        },
+        "RECENT": {
+            "insufficient": "数据不足",
+            "rising": "📈 连续上升趋势",
+            "falling": "📉 连续下降趋势",
+            "up": "📈 整体上升",
+            "down": "📉 整体下降",
+            "flat": "➡️ 相对稳定",
+        },
+        "INTENSITY": {"strong": "强烈", "notable": "明显", "mild": "温和"},
+        "DIRECTION": {"up": "上升", "down": "下降", "flat": "持平"},
+        "POSITION": {
+            "high": "高位区间",
+            "mid_high": "中高位区间",
+            "mid": "中位区间",
+            "mid_low": "中低位区间",
+            "low": "低位区间",
+        },
+        "INDICATOR": {
+            "sma": "均线",
+            "ema": "指数均线",
+            "wma": "加权均线",
+            "median": "中位数",
+            "std": "标准差",
+            "zscore": "Z分数",
+            "roc": "变化率%",
+            "pctrank": "百分位%",
+        },
+    },
+    "partials": {
+        # FGI7变化趋势（状态概览、每日汇报共用）
+        "trend": """\
+%if change > 0
+📈 上升 (+{change:.2f})
+%elif change < 0
+📉 下降 ({change:.2f})
+%else
+➡️ 持平
+%end""",
+        # 阈值表（详细分析）
+        "threshold_table": """\
+%for t in thresholds
+%if t["distance"] <= 0
+  • 阈值{t["level"]} (卖出{t["sell_pct"]}%): ✅ 已超过 (+{abs(t["distance"]):.2f})
+%elif t["distance"] <= 5
+  • 阈值{t["level"]} (卖出{t["sell_pct"]}%): ⚠️ 接近 (-{t["distance"]:.2f})
+%else
+  • 阈值{t["level"]} (卖出{t["sell_pct"]}%): 😴 较远 (-{t["distance"]:.2f})
+%end
+%end""",
+        # 阈值简表（每日汇报，单行）
+        "threshold_badges": """\
+%for t in thresholds
+%if t["distance"] <= 0
+{t["level"]}✅
+%elif t["distance"] <= 5
+{t["level"]}⚠️({t["distance"]:.1f})
+%else
+{t["level"]}😴({t["distance"]:.1f})
+%end
+%end""",
+        # 冷却状态（详细分析）
+        "cooldown_block": """\
+%for threshold, days_passed in cooldowns.items()
+%if days_passed is None
+  • 阈值{threshold}: ✅ 可触发 (从未触发)
+%elif cooldown_days - days_passed > 0
+  • 阈值{threshold}: 冷却中 (还需{cooldown_days - days_passed}天)
+%else
+  • 阈值{threshold}: ✅ 可触发
+%end
+%end""",
+        # 冷却中的阈值列表（每日汇报）
+        "cooling_list": """\
+%for threshold, remaining in cooling
+{threshold}({remaining}天)
+%end""",
+        # 短期/中期趋势与关键水平（趋势分析）
+        "trend_block": """\
+📊 短期趋势 (7天):
+%if short_trend is None
+  数据不足
+%else
+  • 7天前FGI: {short_trend["week_ago_fgi"]}
+  • 当前FGI: {latest_fgi}
+  • 变化: {short_trend["change"]:+.1f}
+  • 趋势: {INTENSITY[short_trend["intensity"]]}{DIRECTION[short_trend["direction"]]}
+%end
+
+📊 中期趋势 (14天):
+%if medium_trend is None
+  数据不足
+%else
+  • 14天最高: {medium_trend["max"]}
+  • 14天最低: {medium_trend["min"]}
+  • 14天均值: {medium_trend["avg"]:.1f}
+  • 当前位置: {latest_fgi}
+  • 区间位置: {POSITION[medium_trend["position"]]}
+%end
+
+📐 技术指标:
+%for i in indicators
+%if i["value"] is None
+  • {INDICATOR[i["kind"]]}({i["window"]}日): 数据不足
+%elif i["change"] is None
+  • {INDICATOR[i["kind"]]}({i["window"]}日): {i["value"]:.2f}
+%else
+  • {INDICATOR[i["kind"]]}({i["window"]}日): {i["value"]:.2f} ({i["change"]:+.2f})
+%end
+%end
+
+🔑 关键水平:
+%for t in thresholds
+%if t["distance"] <= 0
+  • {t["level"]}阈值: ✅ 已突破 (卖出{t["sell_pct"]}%)
+%elif t["distance"] <= 5
+  • {t["level"]}阈值: ⚠️ 临近 ({t["distance"]:.1f}点)
+%else
+  • {t["level"]}阈值: 😴 较远 ({t["distance"]:.1f}点)
+%end
+%end""",
+    },
+    "templates": {
+        "status": """\
+📊 FGI状态概览
+📅 日期: {latest_date}
+📈 当前FGI: {latest_fgi}
+📊 FGI7: {today7:.2f}
+📈 趋势: {trend()}
+💭 市场情绪: {MOOD[mood]}
+%if next_threshold
+🎯 下个阈值: 距离{next_threshold["level"]}阈值还有{next_threshold["distance"]:.1f}点 (卖出{next_threshold["sell_pct"]}%)
+%end""",
+        "detailed": """\
+📊 FGI详细数据分析
+📅 日期: {latest_date} (UTC)
+
+📈 当前数据:
+  • 今日FGI: {latest_fgi}
+  • FGI7: {today7:.2f} (昨日: {prev7:.2f})
+  • 变化: {change:+.2f}
+
+🎯 阈值分析:
+%include threshold_table
+
+🧊 冷却状态:
+%include cooldown_block
+
+📈 最近趋势:
+{RECENT[recent_trend]}""",
+        "trend": """\
+📈 FGI趋势分析
+📅 分析日期: {latest_date}
+
+%include trend_block""",
+        "morning": """\
+🌅 FGI晨报
+📅 {latest_date} (UTC)
+
+🌙 隔夜市场:
+  • 当前FGI: {latest_fgi}
+  • FGI7: {today7:.2f}
+
+👀 今日关注:
+%for point in attention
+%if point[0] == "near"
+  • 接近{point[1]}阈值 (还有{point[2]:.1f}点)
+%elif point[0] == "cooldown_end"
+  • {point[1]}阈值冷却期结束，重新激活
+%else
+  • 市场情绪{MOOD[mood]}，保持关注
+%end
+%end
+
+☀️ 祝您交易愉快！""",
+        "noon": """\
+🌞 FGI午报
+📅 {latest_date} (UTC)
+
+📊 中期状态:
+  • FGI7: {today7:.2f} ({prev7:.2f} → {today7:.2f})
+  • 市场情绪: {MOOD[mood]}
+%if threshold_alert
+
+⚠️ 阈值提醒:
+  • 距离{threshold_alert["level"]}阈值仅{threshold_alert["distance"]:.1f}点
+%end""",
+        "evening": """\
+🌅 FGI晚报
+📅 {latest_date} (UTC)
+
+📊 今日总结:
+  • FGI: {latest_fgi}
+  • FGI7: {prev7:.2f} → {today7:.2f}
+%if abs(change) >= 2
+  • 变化: {"显著" if abs(change) >= 5 else "明显"}{"上升" if change > 0 else "下降"} ({change:+.2f})
+%end
+
+🔮 明日展望:
+%if abs(change) < 1
+  • 趋势相对稳定，关注突破方向
+%elif change > 0 and next_threshold and next_threshold["distance"] <= 10
+  • 上升趋势中，关注{next_threshold["level"]}阈值突破
+%elif change > 0
+  • 上升趋势中，保持关注
+%else
+  • 下降趋势中，关注支撑水平
+%end
+
+🌙 晚安，明日见！""",
+        # 监控流程的每日数据汇报
+        "daily": """\
+📊 FGI监控系统状态汇报
+日期: {today} (UTC)
+今日FGI: {latest_val}
+FGI7: {today7:.2f} (昨日: {prev7:.2f})
+趋势: {trend()}
+阈值状态: {threshold_badges(" ")}
+%if suppressed
+🔒 有信号触发但处于冷却期
+%end
+%if cooling
+冷却状态: 冷却中: {cooling_list(", ")}
+%else
+冷却状态: 全部可触发
+%end
+🤖 系统运行正常""",
+    },
+}
+
+EN = {
+    "constants": {
+        "MOOD": {
+            "extreme_greed": "🔥 Extreme greed",
+            "greed": "📈 Greed",
+            "neutral": "⚖️ Neutral",
+            "fear": "📉 Fear",
+            "extreme_fear": "🥶 Extreme fear",
+        },
+        "RECENT": {
+            "insufficient": "Not enough data",
+            "rising": "📈 Rising for 3 days",
+            "falling": "📉 Falling for 3 days",
+            "up": "📈 Up overall",
+            "down": "📉 Down overall",
+            "flat": "➡️ Stable",
+        },
+        "INTENSITY": {"strong": "strongly ", "notable": "clearly ", "mild": "slightly "},
+        "DIRECTION": {"up": "up", "down": "down", "flat": "flat"},
+        "POSITION": {
+            "high": "top of range",
+            "mid_high": "upper half of range",
+            "mid": "middle of range",
+            "mid_low": "lower half of range",
+            "low": "bottom of range",
+        },
+        "INDICATOR": {
+            "sma": "SMA",
+            "ema": "EMA",
+            "wma": "WMA",
+            "median": "Median",
+            "std": "Std dev",
+            "zscore": "Z-score",
+            "roc": "ROC %",
+            "pctrank": "Percentile %",
+        },
+    },
+    "partials": {
+        "trend": """\
+%if change > 0
+📈 Up (+{change:.2f})
+%elif change < 0
+📉 Down ({change:.2f})
+%else
+➡️ Flat
+%end""",
+        "threshold_table": """\
+%for t in thresholds
+%if t["distance"] <= 0
+  • Level {t["level"]} (sell {t["sell_pct"]}%): ✅ crossed (+{abs(t["distance"]):.2f})
+%elif t["distance"] <= 5
+  • Level {t["level"]} (sell {t["sell_pct"]}%): ⚠️ close (-{t["distance"]:.2f})
+%else
+  • Level {t["level"]} (sell {t["sell_pct"]}%): 😴 far (-{t["distance"]:.2f})
+%end
+%end""",
+        "cooldown_block": """\
+%for threshold, days_passed in cooldowns.items()
+%if days_passed is None
+  • Level {threshold}: ✅ ready (never triggered)
+%elif cooldown_days - days_passed > 0
+  • Level {threshold}: cooling down ({cooldown_days - days_passed} days left)
+%else
+  • Level {threshold}: ✅ ready
+%end
+%end""",
+        "cooling_list": """\
+%for threshold, remaining in cooling
+{threshold}({remaining}d)
+%end""",
+        "trend_block": """\
+📊 Short term (7 days):
+%if short_trend is None
+  Not enough data
+%else
+  • FGI 7 days ago: {short_trend["week_ago_fgi"]}
+  • FGI now: {latest_fgi}
+  • Change: {short_trend["change"]:+.1f}
+  • Trend: {INTENSITY[short_trend["intensity"]]}{DIRECTION[short_trend["direction"]]}
+%end
+
+📊 Medium term (14 days):
+%if medium_trend is None
+  Not enough data
+%else
+  • 14-day high: {medium_trend["max"]}
+  • 14-day low: {medium_trend["min"]}
+  • 14-day mean: {medium_trend["avg"]:.1f}
+  • FGI now: {latest_fgi}
+  • Position: {POSITION[medium_trend["position"]]}
+%end
+
+📐 Indicators:
+%for i in indicators
+%if i["value"] is None
+  • {INDICATOR[i["kind"]]} ({i["window"]}d): not enough data
+%elif i["change"] is None
+  • {INDICATOR[i["kind"]]} ({i["window"]}d): {i["value"]:.2f}
+%else
+  • {INDICATOR[i["kind"]]} ({i["window"]}d): {i["value"]:.2f} ({i["change"]:+.2f})
+%end
+%end
+
+🔑 Key levels:
+%for t in thresholds
+%if t["distance"] <= 0
+  • Level {t["level"]}: ✅ crossed (sell {t["sell_pct"]}%)
+%elif t["distance"] <= 5
+  • Level {t["level"]}: ⚠️ near ({t["distance"]:.1f} pts)
+%else
+  • Level {t["level"]}: 😴 far ({t["distance"]:.1f} pts)
+%end
+%end""",
+    },
+    "templates": {
+        "status": """\
+📊 FGI status
+📅 Date: {latest_date}
+📈 FGI: {latest_fgi}
+📊 FGI7: {today7:.2f}
+📈 Trend: {trend()}
+💭 Mood: {MOOD[mood]}
+%if next_threshold
+🎯 Next level: {next_threshold["distance"]:.1f} pts to {next_threshold["level"]} (sell {next_threshold["sell_pct"]}%)
+%end""",
+        "detailed": """\
+📊 FGI detailed analysis
+📅 Date: {latest_date} (UTC)
+
+📈 Current data:
+  • FGI today: {latest_fgi}
+  • FGI7: {today7:.2f} (yesterday: {prev7:.2f})
+  • Change: {change:+.2f}
+
+🎯 Levels:
+%include threshold_table
+
+🧊 Cooldowns:
+%include cooldown_block
+
+📈 Recent trend:
+{RECENT[recent_trend]}""",
+        "trend": """\
+📈 FGI trend analysis
+📅 Date: {latest_date}
+
+%include trend_block""",
+        "morning": """\
+🌅 FGI morning report
+📅 {latest_date} (UTC)
+
+🌙 Overnight:
+  • FGI: {latest_fgi}
+  • FGI7: {today7:.2f}
+
+👀 Watch today:
+%for point in attention
+%if point[0] == "near"
+  • Approaching {point[1]} ({point[2]:.1f} pts left)
+%elif point[0] == "cooldown_end"
+  • Cooldown for {point[1]} ends, level re-armed
+%else
+  • Mood {MOOD[mood]}, keep watching
+%end
+%end
+
+☀️ Happy trading!""",
+        "noon": """\
+🌞 FGI midday report
+📅 {latest_date} (UTC)
+
+📊 Medium term:
+  • FGI7: {today7:.2f} ({prev7:.2f} → {today7:.2f})
+  • Mood: {MOOD[mood]}
+%if threshold_alert
+
+⚠️ Level alert:
+  • Only {threshold_alert["distance"]:.1f} pts to {threshold_alert["level"]}
+%end""",
+        "evening": """\
+🌅 FGI evening report
+📅 {latest_date} (UTC)
+
+📊 Today:
+  • FGI: {latest_fgi}
+  • FGI7: {prev7:.2f} → {today7:.2f}
+%if abs(change) >= 2
+  • Change: {"sharply" if abs(change) >= 5 else "clearly"} {"up" if change > 0 else "down"} ({change:+.2f})
+%end
+
+🔮 Tomorrow:
+%if abs(change) < 1
+  • Trend is stable, watch for a breakout
+%elif change > 0 and next_threshold and next_threshold["distance"] <= 10
+  • Rising, watch for a break above {next_threshold["level"]}
+%elif change > 0
+  • Rising, keep watching
+%else
+  • Falling, watch support levels
+%end
+
+🌙 Good night!""",
+        "daily": """\
+📊 FGI monitor status
+Date: {today} (UTC)
+FGI today: {latest_val}
+FGI7: {today7:.2f} (yesterday: {prev7:.2f})
+Trend: {trend()}
+Levels: {threshold_badges(" ")}
+%if suppressed
+🔒 Signal fired but the level is cooling down
+%end
+%if cooling
+Cooldowns: cooling down: {cooling_list(", ")}
+%else
+Cooldowns: all levels ready
+%end
+🤖 System running normally""",
+    },
+}
+
+LOCALES = {"zh": ZH, "en": EN}
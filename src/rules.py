@@ -0,0 +1,336 @@
+# FGI恐慌贪婪指数监控项目 - 规则引擎
+# 触发规则以声明式配置描述（RULES_FILE，YAML），加载时编译为按列判定的函数：
+#   - crossing: 指标上穿/下穿某值（昨日 <= 值 < 今日）
+#   - streak:   指标连续N天满足比较条件
+#   - band:     指标今日处于某区间
+#   - cooldown: 同一档位N天内只提醒一次
+# 每条规则对整列指标一次算出逐日的判定结果（mask），回测/参数扫描对整段历史判定，
+# 监控只需最后一天：由增量FGI7指标（strategy.FGI7Tracker）给出最后两天的fgi7与连续天数，组成两天的短列判定。
+# RULES_FILE不存在时按各序列的阈值、冷却与最低卖出水平生成默认规则，行为与原来一致
+
+import os
+from typing import Dict, List, NamedTuple, Optional
+
+import yaml
+
+from src.config import RULES_FILE, INDICATORS, FGI7_WINDOW
+from src.indicators import IndicatorSet
+from src.state import in_cooldown
+from src.strategy import COMPARISONS, FGI7Signal, condition_key, fgi7_series
+
+# 内置指标：fgi为原始值，fgi7为FGI7
+RAW = "fgi"
+FGI7 = "fgi7"
+
+
+class RuleError(ValueError):
+    """规则配置错误"""
+
+
+class RuleResult(NamedTuple):
+    """某日的判定结果"""
+
+    fired: List[int]  # 满足条件的档位（按规则顺序，同档只出现一次）
+    final: List[int]  # 去掉冷却期内档位后需要提醒的档位
+    notes: List[str]  # 说明类规则的提示文字
+
+
+class Rule(NamedTuple):
+    """编译后的规则"""
+
+    name: str
+    level: Optional[int]  # 触发的档位；说明类规则为None
+    note: Optional[str]
+    cooldown: Optional[int]  # 冷却天数，None表示不冷却
+    kind: str  # 第一个条件的类型: cross / streak / band
+    mask: object  # mask(columns, runs) -> [bool]，与各列等长的逐日判定结果
+    indicators: frozenset
+    streaks: tuple  # 用到的连续条件 ((指标, 比较方式, 值), ...)
+
+
+def _streak_mask(col, op, level, days, run=0):
+    """逐日连续满足天数 >= days；run为列开始之前已连续满足的天数"""
+    compare = COMPARISONS[op]
+    out = []
+    for v in col:
+        run = run + 1 if v is not None and compare(v, level) else 0
+        out.append(run >= days)
+    return out
+
+
+def trailing_run(col, op, level) -> int:
+    """列末尾连续满足比较条件的天数"""
+    compare = COMPARISONS[op]
+    n = 0
+    for v in reversed(col):
+        if v is None or not compare(v, level):
+            break
+        n += 1
+    return n
+
+
+def _compile_crossing(cfg):
+    name = cfg["indicator"]
+    if "above" in cfg:
+        level = cfg["above"]
+
+        def mask(columns, runs):
+            col = columns[name]
+            return [False] + [
+                p is not None and c is not None and p <= level < c for p, c in zip(col, col[1:])
+            ]
+
+    elif "below" in cfg:
+        level = cfg["below"]
+
+        def mask(columns, runs):
+            col = columns[name]
+            return [False] + [
+                p is not None and c is not None and p >= level > c for p, c in zip(col, col[1:])
+            ]
+
+    else:
+        raise RuleError(f"crossing需要above或below: {cfg}")
+    return name, mask, ()
+
+
+def _compile_streak(cfg):
+    name = cfg["indicator"]
+    days = int(cfg.get("days", 2))
+    ops = [(k, v) for k, v in cfg.items() if k in COMPARISONS]
+    if len(ops) != 1 or days < 1:
+        raise RuleError(f"streak需要一个比较条件（gte/gt/lte/lt）与days>=1: {cfg}")
+    op, level = ops[0]
+    condition = (name, op, level)
+
+    def mask(columns, runs):
+        return _streak_mask(columns[name], op, level, days, runs.get(condition, 0))
+
+    return name, mask, (condition,)
+
+
+def _compile_band(cfg):
+    name = cfg["indicator"]
+    lo = cfg.get("above", cfg.get("min"))
+    hi = cfg.get("below", cfg.get("max"))
+    if lo is None and hi is None:
+        raise RuleError(f"band需要above/min或below/max: {cfg}")
+    # above/below为开区间；min含下界，max不含上界
+    lo_op = COMPARISONS["gt"] if "above" in cfg else COMPARISONS["gte"]
+
+    def mask(columns, runs):
+        return [
+            v is not None and (lo is None or lo_op(v, lo)) and (hi is None or v < hi)
+            for v in columns[name]
+        ]
+
+    return name, mask, ()
+
+
+_PRIMITIVES = {"crossing": _compile_crossing, "streak": _compile_streak, "band": _compile_band}
+_KINDS = {"crossing": "cross", "streak": "streak", "band": "band"}
+
+
+def compile_rule(cfg: Dict, sell_map: Dict[int, int]) -> Rule:
+    """把一条规则配置编译为Rule（条件之间为"且"）"""
+    name = cfg.get("name") or "rule"
+    level = cfg.get("level")
+    note = cfg.get("note")
+    if (level is None) == (note is None):
+        raise RuleError(f"{name}: 需要且只能指定level或note其中之一")
+    if level is not None and level not in sell_map:
+        raise RuleError(f"{name}: 档位{level}不在该序列的SELL_MAP中")
+
+    masks = []
+    names = set()
+    streaks = []
+    kind = None
+    for key, compile_fn in _PRIMITIVES.items():
+        if key in cfg:
+            indicator, mask, conditions = compile_fn(cfg[key])
+            names.add(indicator)
+            masks.append(mask)
+            streaks.extend(conditions)
+            kind = kind or _KINDS[key]
+    if not masks:
+        raise RuleError(f"{name}: 至少需要crossing/streak/band中的一个条件")
+
+    if len(masks) == 1:
+        mask = masks[0]
+    else:
+        mask = lambda c, r: [all(x) for x in zip(*(m(c, r) for m in masks))]  # noqa: E731
+    return Rule(
+        name, level, note, cfg.get("cooldown"), kind, mask, frozenset(names), tuple(streaks)
+    )
+
+
+def default_rules(spec: Dict) -> List[Dict]:
+    """
+    默认规则（与原硬编码逻辑一致）
+
+    - 阈值按顺序上穿触发（允许同日多级）
+    - 最高档当日未上穿时，FGI7连续2天 >= 最高档也触发
+    - FGI7低于最低卖出水平时附加说明
+    """
+    thresholds = spec["thresholds"]
+    rules = [
+        {
+            "name": f"cross_{t}",
+            "level": t,
+            "crossing": {"indicator": "fgi7", "above": t},
+            "cooldown": spec["cooldown_days"],
+        }
+        for t in thresholds
+    ]
+    top = max(thresholds)
+    rules.append(
+        {
+            "name": f"streak_{top}",
+            "level": top,
+            "streak": {"indicator": "fgi7", "gte": top, "days": 2},
+            "cooldown": spec["cooldown_days"],
+        }
+    )
+    rules.append(
+        {
+            "name": "below_min_sell",
+            "note": f"FGI7<{spec['min_sell_level']}（不卖，仅提示）",
+            "band": {"indicator": "fgi7", "below": spec["min_sell_level"]},
+        }
+    )
+    return rules
+
+
+class RuleSet:
+    """一个序列的全部已编译规则"""
+
+    def __init__(self, configs: List[Dict], sell_map: Dict[int, int], indicators=None):
+        self.rules = [compile_rule(cfg, sell_map) for cfg in configs]
+        available = {spec["name"]: spec for spec in (INDICATORS if indicators is None else indicators)}
+        needed = set().union(*(r.indicators for r in self.rules)) - {RAW, FGI7}
+        unknown = needed - available.keys()
+        if unknown:
+            raise RuleError(f"未定义的指标: {sorted(unknown)}")
+        self.indicator_set = IndicatorSet([available[n] for n in sorted(needed)]) if needed else None
+        self.streaks = sorted({c for r in self.rules for c in r.streaks})
+        # fgi7上的连续条件交给FGI7Tracker增量维护
+        self.streak_conditions = [(op, level) for name, op, level in self.streaks if name == FGI7]
+
+    def columns(self, values, fgi7=None, window: int = FGI7_WINDOW) -> Dict[str, List]:
+        """
+        整段历史的指标列（与values等长，数据不足的日期为None）
+
+        参数:
+            fgi7: 预先算好的滑动平均序列（rolling_mean的结果，参数扫描时按窗口复用）
+        """
+        columns = self.indicator_set.compute(values) if self.indicator_set else {}
+        columns[RAW] = [v for _, v in values]
+        if fgi7 is None:
+            fgi7 = fgi7_series(values, window)
+        columns[FGI7] = [None] * (len(values) - len(fgi7)) + list(fgi7)
+        return columns
+
+    def frame(self, values, signal: FGI7Signal):
+        """
+        监控用的最后两天短列（只用于判定最后一天）
+
+        fgi7取自FGI7Tracker的判定结果（signal为advance(values)的返回值），不再整列计算，values可以只有当天；
+        连续条件的起始天数由截至今日的连续天数反推：两天都满足时为其减2，否则不影响最后一天的结果
+
+        返回:
+            tuple - (columns, runs)，供evaluate使用
+        """
+        full = self.indicator_set.compute(values) if self.indicator_set else {}
+        full[RAW] = [v for _, v in values]
+        # 数据只有当天时前面补None，各列按最后一天对齐
+        columns = {name: ([None, None] + col)[-2:] for name, col in full.items()}
+        columns[FGI7] = [signal.prev7, signal.today7]
+
+        runs = {}
+        for name, op, level in self.streaks:
+            if name == FGI7:
+                streak = signal.streaks.get(condition_key(op, level), 0)
+            else:
+                streak = trailing_run(full[name], op, level)
+            runs[(name, op, level)] = max(streak - 2, 0)
+        return columns, runs
+
+    def _fired(self, masks, i) -> List[Rule]:
+        """第i天满足条件的规则（按规则顺序，同一档位只保留第一条）"""
+        fired, levels = [], set()
+        for rule, mask in zip(self.rules, masks):
+            if not mask[i] or rule.level in levels:
+                continue  # 同档已由前面的规则触发
+            if rule.level is not None:
+                levels.add(rule.level)
+            fired.append(rule)
+        return fired
+
+    def scan(self, columns, runs=None) -> List[List[Rule]]:
+        """
+        整列判定：每条规则对整列算一次mask，再逐日汇总
+
+        返回:
+            list - 与各列等长，每项为当天满足条件的规则（同一档位只保留第一条）
+        """
+        masks = [rule.mask(columns, runs or {}) for rule in self.rules]
+        return [self._fired(masks, i) for i in range(len(columns[RAW]))]
+
+    def evaluate(self, columns, runs=None, state=None, today=None) -> RuleResult:
+        """
+        判定最后一天
+
+        参数:
+            columns/runs: 指标列（columns()整列，或frame()的两天短列）
+            state/today: 序列状态与判定日期；提供时按规则的cooldown过滤出final
+        """
+        masks = [rule.mask(columns, runs or {}) for rule in self.rules]
+        fired = self._fired(masks, -1)
+        levels = [r.level for r in fired if r.level is not None]
+        notes = [r.note for r in fired if r.level is None]
+        cooldowns = {r.level: r.cooldown for r in fired if r.level is not None}
+        final = [
+            level
+            for level in levels
+            if state is None
+            or cooldowns[level] is None
+            or not in_cooldown(state, level, today, cooldowns[level])
+        ]
+        return RuleResult(levels, final, notes)
+
+
+def _load_file(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    if not isinstance(data, dict):
+        raise RuleError(f"{path}: 顶层应为映射（rules / series）")
+    return data
+
+
+_cache = {}
+
+
+def rules_for(spec: Dict, path: str = RULES_FILE) -> RuleSet:
+    """
+    获取序列的规则（编译结果按序列与规则文件mtime缓存，文件修改后自动重新编译）
+
+    规则来源优先级: 规则文件中 series.<序列key> > 规则文件中 rules > 默认规则
+    """
+    mtime = os.stat(path).st_mtime_ns if path and os.path.exists(path) else None
+    # 默认规则由序列参数生成，参数变化（如参数扫描）时也需重新编译
+    params = (
+        tuple(spec["thresholds"]),
+        tuple(sorted(spec["sell_map"].items())),
+        spec["cooldown_days"],
+        spec["min_sell_level"],
+    )
+    key = (spec["key"], params, path, mtime)
+    if key not in _cache:
+        configs = None
+        if mtime is not None:
+            data = _load_file(path)
+            configs = (data.get("series") or {}).get(spec["key"]) or data.get("rules")
+        for stale in [k for k in _cache if k[0] == spec["key"]]:
+            del _cache[stale]
+        _cache[key] = RuleSet(configs or default_rules(spec), spec["sell_map"])
+    return _cache[key]
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FGI监控系统 - 常驻运行时
+在一个asyncio事件循环上同时运行监控检测、早中晚定时汇报和Bot轮询，
+进程、依赖、连接池和数据缓存全程保持热状态，替代每小时冷启动的定时任务
+"""
+
+import signal
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from src.config import (
+    DAEMON_MONITOR_INTERVAL_SECONDS,
+    SCHEDULED_REPORTS_ENABLED,
+    REPORT_MINUTE_UTC,
+    BOT_UPDATE_MODE,
+)
+from src.notify import telegram_delivery
+from src.state import state_lock
+from src.subscribers import subscriber_registry, due_reports, report_hours
+from src import outbox
+
+
+def _run_monitor_locked(mode: str = "monitor") -> int:
+    """获取数据后在状态锁内执行一次监控判定（运行于线程池；数据获取不持锁）"""
+    from src.fgi_notifier import fetch_monitor_data, run_monitor_mode
+
+    specs, fetched = fetch_monitor_data()
+    with state_lock():
+        return run_monitor_mode(mode, specs, fetched)
+
+
+def next_report(now: datetime, hours: List[int]) -> Optional[datetime]:
+    """计算下一个定时汇报时间点（hours为订阅者的汇报小时），没有汇报时返回None"""
+    candidates = []
+    for hour in hours:
+        at = now.replace(hour=hour, minute=REPORT_MINUTE_UTC, second=0, microsecond=0)
+        if at <= now:
+            at += timedelta(days=1)
+        candidates.append(at)
+    return min(candidates, default=None)
+
+
+class FGIRuntime:
+    """单事件循环运行时：监控检测 + 定时汇报 + Bot（轮询或Webhook）"""
+
+    def __init__(
+        self,
+        monitor_interval: int = DAEMON_MONITOR_INTERVAL_SECONDS,
+        enable_monitor: bool = True,
+        enable_reports: bool = SCHEDULED_REPORTS_ENABLED,
+        enable_bot: bool = True,
+        bot_update_mode: str = BOT_UPDATE_MODE,
+    ):
+        """初始化运行时"""
+        self.monitor_interval = monitor_interval
+        self.enable_monitor = enable_monitor
+        self.enable_reports = enable_reports
+        self.enable_bot = enable_bot
+        self.bot_update_mode = bot_update_mode
+        self.stop_event: Optional[asyncio.Event] = None
+        self.bot_handler = None
+        self.logger = logging.getLogger(__name__)
+
+    async def monitor_tick(self):
+        """
+        执行一次监控检测
+
+        判定（含数据获取与状态读写）在线程池中执行，不阻塞事件循环；
+        数据在有效期内直接命中进程内缓存，单次检测几乎无开销
+        """
+        try:
+            await asyncio.to_thread(_run_monitor_locked)
+            result = await outbox.drain_async()
+            if result["sent"] or result["failed"]:
+                self.logger.info(
+                    f"Outbox: sent={result['sent']} failed={result['failed']} pending={result['pending']}"
+                )
+            if self.bot_handler:
+                # 数据更新后立即预生成命令回复，命令到达时直接命中
+                await self.bot_handler.prerender()
+        except Exception as e:
+            self.logger.error(f"监控检测失败: {e}")
+
+    async def _monitor_loop(self):
+        """按固定间隔执行监控检测"""
+        while not self.stop_event.is_set():
+            await self.monitor_tick()
+            await self._sleep(self.monitor_interval)
+
+    async def _reports_loop(self):
+        """在订阅者的汇报时间点发送定时汇报"""
+        from src.scheduled_reports import scheduled_reports_handler
+
+        if not scheduled_reports_handler.initialize():
+            self.logger.warning("定时汇报未启用或初始化失败，跳过")
+            return
+
+        while not self.stop_event.is_set():
+            # 每轮重新读取注册表，订阅者的增删改无需重启即可生效
+            subscribers = subscriber_registry.load()
+            at = next_report(datetime.utcnow(), report_hours(subscribers))
+            if at is None:
+                self.logger.info("没有订阅定时汇报的订阅者，1小时后重新检查")
+                if await self._sleep(3600):
+                    return
+                continue
+
+            self.logger.info(f"下次定时汇报: {at:%Y-%m-%d %H:%M} UTC")
+            if await self._sleep((at - datetime.utcnow()).total_seconds()):
+                return
+
+            due = due_reports(subscriber_registry.load(), at.hour)
+            for report_type, recipients in due.items():
+                try:
+                    ok = await scheduled_reports_handler.send_scheduled_report(
+                        report_type, recipients
+                    )
+                    self.logger.info(
+                        f"{report_type}汇报({len(recipients)}个订阅者): {'成功' if ok else '失败'}"
+                    )
+                except Exception as e:
+                    self.logger.error(f"{report_type}汇报异常: {e}")
+
+    async def _sleep(self, seconds: float) -> bool:
+        """可被停止信号打断的等待；返回True表示收到停止信号"""
+        try:
+            await asyncio.wait_for(self.stop_event.wait(), timeout=max(0, seconds))
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def stop(self):
+        """请求停止运行时"""
+        if self.stop_event is not None:
+            self.stop_event.set()
+
+    async def run(self) -> int:
+        """
+        运行直至收到SIGINT/SIGTERM
+
+        返回:
+            int - 退出码；没有任何可运行的任务（如仅Bot模式但Bot启动失败）时返回1
+        """
+        self.stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows或非主线程不支持，依赖KeyboardInterrupt
+
+        # 整个运行期间保持同一个Telegram连接池
+        async with telegram_delivery:
+            if self.enable_bot:
+                from src.bot_handler import bot_handler
+
+                if await bot_handler.start(self.bot_update_mode):
+                    self.bot_handler = bot_handler
+                else:
+                    self.logger.warning("Bot未启用或初始化失败，仅运行监控与定时汇报")
+
+            tasks = []
+            if self.enable_monitor:
+                tasks.append(asyncio.create_task(self._monitor_loop()))
+            if self.enable_reports:
+                tasks.append(asyncio.create_task(self._reports_loop()))
+
+            if not tasks and not self.bot_handler:
+                self.logger.error("没有可运行的任务，退出")
+                return 1
+
+            self.logger.info("常驻运行时已启动")
+            try:
+                await self.stop_event.wait()
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                if self.bot_handler:
+                    await self.bot_handler.stop()
+                self.logger.info("常驻运行时已停止")
+            return 0
+
+
+def run_runtime(**kwargs) -> int:
+    """同步入口：运行常驻运行时直至停止"""
+    logging.basicConfig(
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        level=logging.INFO,
+    )
+    try:
+        return asyncio.run(FGIRuntime(**kwargs).run())
+    except KeyboardInterrupt:
+        return 0
@@ -14,7 +14,6 @@ from typing import Dict, Optional, List
 
 # 导入telegram相关库
 try:
-    from telegram import Bot
     from telegram.constants import ParseMode
 except ImportError:
     print(
@@ -33,7 +32,14 @@ from src.config import (
 )
 from src.report_generator import (
     report_generator,
-    get_scheduled_report,
+    render_batch,
+)
+from src.notify import OutboundMessage, telegram_delivery
+from src.governor import PRIORITY_REPORT
+from src.subscribers import (
+    subscriber_registry,
+    due_reports,
+    report_hours as subscribed_report_hours,
 )
 
 
@@ -44,7 +50,8 @@ class ScheduledReportsHandler:
         """初始化定时汇报处理器"""
         self.bot_token = None
         self.chat_ids = []  # 支持多收件人
-        self.bot = None
+        self.subscribers = []  # 订阅者注册表
+        self.delivery = None  # 统一投递层（与监控提醒共用）
 
         # 配置日志
         logging.basicConfig(
@@ -61,67 +68,74 @@ class ScheduledReportsHandler:
 
         # 获取环境变量
         self.bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
-        chat_env = os.getenv("TELEGRAM_CHAT_ID")
 
         if not self.bot_token:
             self.logger.error("缺少 TELEGRAM_BOT_TOKEN 环境变量")
             return False
 
-        if not chat_env:
-            self.logger.error("缺少 TELEGRAM_CHAT_ID 环境变量")
-            return False
-
-        # 解析多收件人：逗号/分号/空白分隔
-        for sep in [",", ";", "\n", "\r", "\t"]:
-            chat_env = chat_env.replace(sep, " ")
-        self.chat_ids = [x.strip() for x in chat_env.split(" ") if x.strip()]
+        # 收件人来自订阅者注册表；注册表不存在时为 TELEGRAM_CHAT_ID 中的收件人
+        self.subscribers = subscriber_registry.load()
+        self.chat_ids = [s.chat_id for s in self.subscribers]
         if not self.chat_ids:
-            self.logger.error("TELEGRAM_CHAT_ID 解析为空，请检查格式")
+            self.logger.error("没有订阅者：请设置 TELEGRAM_CHAT_ID 或添加订阅者")
             return False
 
-        try:
-            # 创建Bot实例
-            self.bot = Bot(token=self.bot_token)
-            self.logger.info("定时汇报初始化成功")
-            return True
-        except Exception as e:
-            self.logger.error(f"定时汇报初始化失败: {e}")
-            return False
+        self.delivery = telegram_delivery
+        self.logger.info(f"定时汇报初始化成功，订阅者 {len(self.chat_ids)} 个")
+        return True
+
+    async def send_scheduled_report(self, report_type: str, subscribers=None) -> bool:
+        """
+        发送定时汇报
 
-    async def send_scheduled_report(self, report_type: str) -> bool:
-        """发送定时汇报（支持多收件人）"""
-        if not self.bot:
+        参数:
+            report_type: 汇报类型
+            subscribers: 收件的订阅者，默认为注册表中订阅了该汇报的全部订阅者
+
+        语言和关注阈值相同的订阅者共用一份渲染结果，所有消息并发提交，
+        由发送调度器按Telegram限速放行（优先级低于卖出提醒）
+        """
+        if not self.delivery:
             self.logger.error("Bot未初始化")
             return False
 
+        if subscribers is None:
+            subscribers = [
+                s for s in subscriber_registry.load() if s.report_hour(report_type) is not None
+            ]
+        if not subscribers:
+            self.logger.info(f"{report_type}汇报没有订阅者，跳过")
+            return True
+
         try:
-            # 刷新数据
-            if not report_generator.refresh_data():
+            # 刷新数据（定时汇报需等待最新数据，不使用过期缓存）；阻塞操作放到线程池
+            if not await asyncio.to_thread(report_generator.refresh_data, False):
                 self.logger.error("数据刷新失败")
                 return False
 
-            # 生成汇报内容
-            report_content = get_scheduled_report(report_type)
-            if not report_content:
+            # 按语言/阈值分组生成汇报内容
+            batch = await asyncio.to_thread(render_batch, report_type, subscribers)
+            if not batch:
                 self.logger.warning(f"无法生成{report_type}汇报")
                 return False
 
-            # 逐个收件人发送，记录成功/失败
+            messages = [
+                OutboundMessage(cid, f"```\n{text}\n```", ParseMode.MARKDOWN_V2, PRIORITY_REPORT)
+                for text, chat_ids in batch
+                for cid in chat_ids
+            ]
+            results = await self.delivery.send_many(messages)
             success_count = 0
-            for cid in self.chat_ids:
-                try:
-                    await self.bot.send_message(
-                        chat_id=cid,
-                        text=f"```\n{report_content}\n```",
-                        parse_mode=ParseMode.MARKDOWN_V2,
-                    )
+            for msg, res in zip(messages, results):
+                if isinstance(res, Exception):
+                    self.logger.error(f"发送到 chat_id={msg.chat_id} 失败: {res}")
+                else:
                     success_count += 1
-                except Exception as e:
-                    self.logger.error(f"发送到 chat_id={cid} 失败: {e}")
 
             if success_count > 0:
                 self.logger.info(
-                    f"{report_type}汇报发送完成：成功 {success_count}/{len(self.chat_ids)}"
+                    f"{report_type}汇报发送完成：成功 {success_count}/{len(messages)}"
+                    f"（{len(batch)} 种内容）"
                 )
                 return True
             else:
@@ -145,38 +159,36 @@ class ScheduledReportsHandler:
 
         return False
 
-    async def process_scheduled_reports(self) -> Dict[str, bool]:
-        """处理所有到期的定时汇报"""
+    async def process_scheduled_reports(self, hour: Optional[int] = None) -> Dict[str, bool]:
+        """
+        处理所有到期的定时汇报
+
+        参数:
+            hour: 按哪个UTC小时判定到期，默认当前小时（定时任务按cron指定的小时，避免启动延迟错过整点）
+        """
         if not self.initialize():
             return {"error": "初始化失败"}
 
         results = {}
-        current_utc_hour = datetime.utcnow().hour
+        current_utc_hour = datetime.utcnow().hour if hour is None else hour
 
-        # 检查并发送各个时段的汇报
-        report_schedule = {
-            "morning": MORNING_REPORT_UTC,
-            "noon": NOON_REPORT_UTC,
-            "evening": EVENING_REPORT_UTC,
-        }
+        # 按订阅者各自的汇报时间，发送当前时段到期的汇报
+        due = due_reports(self.subscribers, current_utc_hour)
+        if not due:
+            self.logger.debug(f"当前时段无到期汇报 (UTC {current_utc_hour})")
 
-        for report_type, scheduled_hour in report_schedule.items():
-            if current_utc_hour == scheduled_hour:
-                self.logger.info(
-                    f"开始发送{report_type}汇报 (UTC {current_utc_hour}:00)"
-                )
-                results[report_type] = await self.send_scheduled_report(report_type)
-            else:
-                self.logger.debug(
-                    f"{report_type}汇报非当前时段 (当前: UTC {current_utc_hour}, 预定: UTC {scheduled_hour})"
-                )
+        for report_type, subscribers in due.items():
+            self.logger.info(
+                f"开始发送{report_type}汇报 (UTC {current_utc_hour}:00, {len(subscribers)} 个订阅者)"
+            )
+            results[report_type] = await self.send_scheduled_report(report_type, subscribers)
 
         return results
 
-    def run_scheduled_reports_sync(self) -> Dict[str, bool]:
+    def run_scheduled_reports_sync(self, hour: Optional[int] = None) -> Dict[str, bool]:
         """同步运行定时汇报（用于测试和外部调用）"""
         try:
-            return asyncio.run(self.process_scheduled_reports())
+            return asyncio.run(self.process_scheduled_reports(hour))
         except Exception as e:
             self.logger.error(f"定时汇报运行失败: {e}")
             return {"error": str(e)}
@@ -217,7 +229,7 @@ def is_scheduled_reports_enabled() -> bool:
     return (
         SCHEDULED_REPORTS_ENABLED
         and os.getenv("TELEGRAM_BOT_TOKEN") is not None
-        and os.getenv("TELEGRAM_CHAT_ID") is not None
+        and bool(subscriber_registry.load())
     )
 
 
@@ -229,7 +241,10 @@ def get_next_report_time() -> Optional[str]:
     current_utc = datetime.utcnow()
     current_hour = current_utc.hour
 
-    report_hours = sorted([MORNING_REPORT_UTC, NOON_REPORT_UTC, EVENING_REPORT_UTC])
+    # 所有订阅者的汇报时间
+    report_hours = subscribed_report_hours(subscriber_registry.load())
+    if not report_hours:
+        return None
 
     # 找到下个汇报时间
     for hour in report_hours:
@@ -255,7 +270,7 @@ if __name__ == "__main__":
         print("❌ 定时汇报功能未启用或缺少配置")
         print("需要设置环境变量:")
         print("- TELEGRAM_BOT_TOKEN")
-        print("- TELEGRAM_CHAT_ID")
+        print("- TELEGRAM_CHAT_ID（或通过 python -m src.subscribers add 添加订阅者）")
         sys.exit(1)
 
     print("✅ 定时汇报配置检查通过")
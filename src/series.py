@@ -0,0 +1,97 @@
+# FGI恐慌贪婪指数监控项目 - 多序列模块
+# 负责解析SERIES配置、按数据源获取各情绪指数序列，并发拉取所有启用的序列
+
+import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
+
+from src.config import (
+    SERIES,
+    PRIMARY_SERIES,
+    THRESHOLDS,
+    SELL_MAP,
+    COOLDOWN_DAYS,
+    MIN_SELL_LEVEL,
+)
+from src.data_cache import fgi_cache
+from src.fetcher import http_fetcher, get_breaker
+from src.history import load_history
+
+
+def enabled_series():
+    """
+    返回所有启用的序列配置（主序列在前）
+
+    每项为完整的参数字典：未配置的阈值、卖出比例、冷却天数、最低卖出水平沿用全局配置
+    """
+    specs = []
+    for key, cfg in SERIES.items():
+        if not cfg.get("enabled", True):
+            continue
+        spec = {
+            "key": key,
+            "label": key,
+            "thresholds": THRESHOLDS,
+            "sell_map": SELL_MAP,
+            "cooldown_days": COOLDOWN_DAYS,
+            "min_sell_level": MIN_SELL_LEVEL,
+        }
+        spec.update(cfg)
+        specs.append(spec)
+    specs.sort(key=lambda s: s["key"] != PRIMARY_SERIES)
+    return specs
+
+
+def fetch_cnn(spec):
+    """
+    获取CNN恐慌贪婪指数历史
+
+    返回:
+        list - [(date, value)] 按日期升序，数值四舍五入为整数与FGI口径一致
+    """
+    # CNN接口会拒绝无浏览器UA的请求
+    payload = http_fetcher.get_json(
+        spec["url"], headers={"User-Agent": "Mozilla/5.0"}, breaker=get_breaker(spec["key"])
+    )
+    points = payload["fear_and_greed_historical"]["data"]
+
+    dedup = {}
+    for p in points:
+        day = dt.datetime.utcfromtimestamp(p["x"] / 1000).date()
+        dedup[day] = int(round(p["y"]))
+    return sorted(dedup.items(), key=lambda x: x[0])
+
+
+def fetch_series(spec):
+    """按数据源获取单个序列，返回 [(date, value)] 按日期升序"""
+    source = spec["source"]
+    if source == "alternative.me":
+        # 主数据源走共享缓存 + 本地历史增量拉取，监控需要最新数据
+        return fgi_cache.get(allow_stale=False)
+    elif source == "cnn":
+        return fetch_cnn(spec)
+    elif source == "file":
+        return load_history(spec["path"])
+    raise ValueError(f"Unknown series source: {source}")
+
+
+def fetch_all_series(specs):
+    """
+    并发获取多个序列
+
+    所有数据源同时请求，总耗时约等于最慢的单个请求
+
+    返回:
+        dict - {序列key: [(date, value)] 或 获取失败时的异常对象}
+    """
+    if not specs:
+        return {}
+
+    def _fetch(spec):
+        try:
+            return fetch_series(spec)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=len(specs)) as pool:
+        results = pool.map(_fetch, specs)
+        return {spec["key"]: res for spec, res in zip(specs, results)}
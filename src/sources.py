@@ -0,0 +1,216 @@
+# FGI恐慌贪婪指数监控项目 - 数据源模块
+# FGI数据可来自多个数据源：alternative.me官方接口、返回相同格式的镜像、本地文件。
+# 所有数据源并发请求，按 FGI_SOURCE_STRATEGY 合并：
+#   - "first"：第一个返回有效数据的网络数据源胜出，不等待其余数据源（降低尾延迟）；
+#              本地文件几乎立即返回且可能落后，只在所有网络数据源都失败时作为后备（取最新的一份）
+#   - "quorum"：等待至少 FGI_SOURCE_QUORUM 个数据源成功，逐日取中位数，
+#              只保留至少quorum个数据源都有的日期（单个数据源出错不会污染数据）
+# 合并结果与原 request_fgi 相同：[(date, value)] 按日期升序
+
+import json
+import datetime as dt
+from statistics import median_low
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from src.config import FGI_SOURCES, FGI_SOURCE_STRATEGY, FGI_SOURCE_QUORUM
+from src.fetcher import FetchError, http_fetcher, get_breaker
+from src.history import load_history
+
+
+def parse_alternative_me(data):
+    """将alternative.me返回的data数组解析为按日期升序的 [(date, value)]"""
+    # API返回常见为倒序；统一为按日期升序
+    items = []
+    for d in data:
+        ts = int(d["timestamp"])
+        day = dt.datetime.utcfromtimestamp(ts).date()
+        val = int(d["value"])
+        items.append((day, val))
+
+    items.sort(key=lambda x: x[0])
+
+    # 去重: 同日多条保留最后一条（理论不会发生）
+    dedup = {}
+    for day, val in items:
+        dedup[day] = val
+
+    return sorted(dedup.items(), key=lambda x: x[0])  # [(date, val)]
+
+
+def load_values_file(path):
+    """
+    读取本地FGI数据文件
+
+    支持本地历史CSV（每行 "YYYY-MM-DD,value"）与alternative.me原始JSON响应
+
+    返回:
+        list - [(date, value)] 按日期升序
+    """
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            return parse_alternative_me(json.load(f)["data"])
+    return load_history(path)
+
+
+class FGISource:
+    """数据源接口：fetch(limit) 返回最近limit天的 [(date, value)]（limit=0表示全部）"""
+
+    fallback = False  # "first"策略下是否只作后备（其它数据源都失败时才使用）
+
+    def __init__(self, name):
+        self.name = name
+
+    def fetch(self, limit):
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.name!r})"
+
+
+class AlternativeMeSource(FGISource):
+    """alternative.me接口或返回相同格式的镜像（各自独立熔断）"""
+
+    def __init__(self, name, url):
+        super().__init__(name)
+        self.url = url
+
+    def fetch(self, limit):
+        payload = http_fetcher.get_json(
+            self.url,
+            params={"limit": limit, "format": "json"},
+            breaker=get_breaker(self.name),
+        )
+        return parse_alternative_me(payload["data"])
+
+
+class FileSource(FGISource):
+    """本地文件（如人工维护或其它任务同步下来的数据），格式见 load_values_file"""
+
+    fallback = True
+
+    def __init__(self, name, path):
+        super().__init__(name)
+        self.path = path
+
+    def fetch(self, limit):
+        values = load_values_file(self.path)
+        if not values:
+            raise FetchError(f"{self.path} 无数据")
+        return values[-limit:] if limit else values
+
+
+SOURCE_TYPES = {
+    "alternative.me": lambda cfg: AlternativeMeSource(cfg["name"], cfg["url"]),
+    "file": lambda cfg: FileSource(cfg["name"], cfg["path"]),
+}
+
+
+def build_sources(configs=None):
+    """按配置创建数据源（跳过 enabled=False 的项）"""
+    sources = []
+    for cfg in FGI_SOURCES if configs is None else configs:
+        if not cfg.get("enabled", True):
+            continue
+        try:
+            factory = SOURCE_TYPES[cfg["type"]]
+        except KeyError:
+            raise ValueError(f"Unknown FGI source type: {cfg['type']}") from None
+        sources.append(factory(cfg))
+    return sources
+
+
+def _valid(values):
+    """有效数据：非空且数值在0~100之间"""
+    return bool(values) and all(0 <= v <= 100 for _, v in values)
+
+
+def merge_quorum(results, quorum):
+    """
+    按日期合并多个数据源的结果
+
+    参数:
+        results: [[(date, value)]] 各数据源的结果
+        quorum: 某日至少需要几个数据源提供数据才保留
+
+    返回:
+        list - [(date, value)] 按日期升序，数值取各数据源的中位数（偶数个时取较小者，保持整数）
+    """
+    by_day = {}
+    for values in results:
+        for day, val in values:
+            by_day.setdefault(day, []).append(val)
+    return sorted(
+        (day, median_low(vals)) for day, vals in by_day.items() if len(vals) >= quorum
+    )
+
+
+def fetch_from_sources(limit, sources=None, strategy=FGI_SOURCE_STRATEGY, quorum=FGI_SOURCE_QUORUM):
+    """
+    并发请求所有数据源并合并结果
+
+    参数:
+        limit: 最近天数（0表示全部历史）
+        sources: 数据源列表，默认按 FGI_SOURCES 创建
+        strategy: "first" 或 "quorum"（"first"下本地文件只在网络数据源都失败时使用）
+        quorum: quorum策略下需要成功的数据源个数
+
+    返回:
+        list - [(date, value)] 按日期升序
+
+    异常:
+        FetchError - 没有数据源返回有效数据，或成功的数据源不足quorum个
+    """
+    sources = build_sources() if sources is None else sources
+    if not sources:
+        raise FetchError("没有启用的FGI数据源")
+    if strategy not in ("first", "quorum"):
+        raise ValueError(f"Unknown FGI source strategy: {strategy}")
+    needed = 1 if strategy == "first" else min(quorum, len(sources))
+
+    if strategy == "first":
+        good, errors = _collect([src for src in sources if not src.fallback], limit, 1)
+        if not good:
+            files, more = _collect([src for src in sources if src.fallback], limit, len(sources))
+            errors += more
+            good = sorted(files, key=lambda values: values[-1][0], reverse=True)[:1]
+    else:
+        good, errors = _collect(sources, limit, needed)
+
+    if len(good) < needed:
+        raise FetchError(f"可用数据源不足（{len(good)}/{needed}）: {'; '.join(errors)}")
+    if strategy == "first":
+        return good[0]
+    return merge_quorum(good, needed)
+
+
+def _collect(sources, limit, needed):
+    """
+    并发请求数据源，收到needed份有效数据即返回
+
+    返回:
+        tuple - (有效结果列表, 错误说明列表)
+    """
+    errors = []
+    good = []
+    if not sources:
+        return good, errors
+    pool = ThreadPoolExecutor(max_workers=len(sources))
+    try:
+        futures = {pool.submit(src.fetch, limit): src for src in sources}
+        for future in as_completed(futures):
+            src = futures[future]
+            try:
+                values = future.result()
+            except Exception as e:
+                errors.append(f"{src.name}: {e}")
+                continue
+            if not _valid(values):
+                errors.append(f"{src.name}: 无效数据")
+                continue
+            good.append(values)
+            if len(good) >= needed:
+                break
+    finally:
+        # 已满足条件时不等待较慢的数据源（它们在后台结束，受各自的超时约束）
+        pool.shutdown(wait=False, cancel_futures=True)
+    return good, errors
@@ -1,13 +1,29 @@
 # FGI恐慌贪婪指数监控项目 - 状态管理模块
-# 负责处理JSON状态文件的读写、冷却期检查、日期处理等功能
+# 负责处理JSON状态文件的读写（原子写入、文件锁）、冷却期检查、日期处理等功能
+#
+# 状态以事件日志为准：每次保存只把变化（触发、已处理日期、初始化、冷却抑制等）
+# 作为事件追加到 state/journal.jsonl，state.json 是定期压缩的快照（记录已包含到第几条事件）。
+# 加载 = 读快照 + 重放快照之后的事件；日志只追加不改写，保留完整的审计记录
 
 import json
 import os
+import tempfile
+import threading
 import datetime as dt
+from contextlib import contextmanager
+
+from src.config import COOLDOWN_DAYS, PRIMARY_SERIES, STATE_SNAPSHOT_EVERY, STATE_DB
+
+try:
+    import fcntl
+except ImportError:  # Windows无fcntl，仅保留进程内互斥
+    fcntl = None
 
 # 状态文件配置
 STATE_DIR = "state"
 STATE_FILE = os.path.join(STATE_DIR, "state.json")
+LOCK_FILE = os.path.join(STATE_DIR, ".state.lock")
+JOURNAL_NAME = "journal.jsonl"  # 与状态文件同目录
 DATE_FMT = "%Y-%m-%d"
 
 # 默认状态结构
@@ -17,6 +33,315 @@ DEFAULT_STATE = {
     "bootstrapped": False,  # 是否已完成首次初始化
 }
 
+# 非主序列的默认状态
+DEFAULT_SERIES_STATE = {"last_processed_date": None, "last_trigger_at": {}, "bootstrapped": False}
+
+# 进程内锁与进程间文件锁的持有情况（支持同一线程嵌套获取）
+_thread_lock = threading.RLock()
+_lock_state = {"depth": 0, "fh": None}
+
+
+@contextmanager
+def state_lock():
+    """
+    状态目录的进程间互斥锁（可重入）
+
+    监控、定时汇报、Bot等多个进程同时读写 state/ 下的文件时，
+    写入与"读-改-写"流程都在此锁内进行；同一线程内可嵌套获取
+    """
+    with _thread_lock:
+        _lock_state["depth"] += 1
+        try:
+            if _lock_state["depth"] == 1 and fcntl is not None:
+                os.makedirs(STATE_DIR, exist_ok=True)
+                _lock_state["fh"] = open(LOCK_FILE, "a")
+                fcntl.flock(_lock_state["fh"], fcntl.LOCK_EX)
+            yield
+        finally:
+            _lock_state["depth"] -= 1
+            if _lock_state["depth"] == 0 and _lock_state["fh"] is not None:
+                fcntl.flock(_lock_state["fh"], fcntl.LOCK_UN)
+                _lock_state["fh"].close()
+                _lock_state["fh"] = None
+
+
+def atomic_write_text(path, text):
+    """
+    原子写入文本文件：写临时文件 + fsync + rename
+
+    rename在同一文件系统内是原子的，崩溃时文件要么是旧内容要么是新内容，不会被截断
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        # mkstemp默认权限为0600，保持与普通写入一致的权限
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o644
+        os.chmod(tmp_path, mode)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    # 持久化目录项，确保rename本身在断电后也生效（Windows不支持，忽略）
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def atomic_write_json(path, obj):
+    """以原子方式写入JSON文件"""
+    atomic_write_text(path, json.dumps(obj, ensure_ascii=False, indent=2))
+
+
+def _copy(obj):
+    return json.loads(json.dumps(obj))
+
+
+def _series_views(state):
+    """[(序列key, 该序列的状态字典)]，主序列为根级字段"""
+    views = [(PRIMARY_SERIES, {k: v for k, v in state.items() if k != "series"})]
+    views.extend(state.get("series", {}).items())
+    return views
+
+
+def diff_events(old, new):
+    """
+    比较两个状态，返回把old变为new的事件列表
+
+    事件类型:
+        trigger   - 阈值触发 {level, date}
+        processed - 已处理到的日期 {date}
+        bootstrap - 初始化标记 {value}
+        set/unset - 其它字段的变化 {field, value}
+    """
+    old_views = dict(_series_views(old))
+    events = []
+    for key, sub in _series_views(new):
+        prev = old_views.get(key, DEFAULT_SERIES_STATE)
+        for field, value in sub.items():
+            before = prev.get(field)
+            if value == before and field in prev:
+                continue
+            if field == "last_trigger_at":
+                before = before or {}
+                for level, date in value.items():
+                    if level not in before or before[level] != date:
+                        events.append({"series": key, "type": "trigger", "level": level, "date": date})
+                continue
+            if field == "last_processed_date":
+                events.append({"series": key, "type": "processed", "date": value})
+            elif field == "bootstrapped":
+                events.append({"series": key, "type": "bootstrap", "value": value})
+            else:
+                events.append({"series": key, "type": "set", "field": field, "value": value})
+        for field in prev.keys() - sub.keys():
+            if key in old_views:
+                events.append({"series": key, "type": "unset", "field": field})
+    return events
+
+
+def apply_event(state, event):
+    """把一条事件应用到状态上（重放日志时使用）"""
+    sub = series_state(state, event["series"])
+    kind = event["type"]
+    if kind == "trigger":
+        sub.setdefault("last_trigger_at", {})[event["level"]] = event["date"]
+    elif kind == "processed":
+        sub["last_processed_date"] = event["date"]
+    elif kind == "bootstrap":
+        sub["bootstrapped"] = event["value"]
+    elif kind == "set":
+        sub[event["field"]] = event["value"]
+    elif kind == "unset":
+        sub.pop(event["field"], None)
+    # 其它类型（如suppressed）仅作审计记录，不改变状态
+
+
+class StateStore:
+    """
+    进程内状态对象
+
+    每个进程只从磁盘加载一次；之后仅通过快照与日志文件的mtime/大小判断是否被其它进程改写，
+    未改写时直接返回内存中的状态。保存时把与上次保存相比的变化作为事件追加到日志，
+    未变化则不写盘；日志中快照之后的事件累积到 STATE_SNAPSHOT_EVERY 条时重写快照
+    """
+
+    def __init__(self, path=STATE_FILE, snapshot_every=STATE_SNAPSHOT_EVERY):
+        self.path = path
+        self.journal_path = os.path.join(os.path.dirname(path) or ".", JOURNAL_NAME)
+        self.snapshot_every = snapshot_every
+        self._state = None
+        self._stamp = None  # 快照与日志的(mtime_ns, size)，用于检测外部改写
+        self._saved = None  # 上次写入/读取的序列化内容
+        self._seq = 0  # 日志中最后一条事件的序号
+        self._snapshot_seq = 0  # 快照已包含到的事件序号
+        self._pending = []  # 待写入日志的审计事件（见record）
+
+    @staticmethod
+    def _stat(path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _file_stamp(self):
+        return (self._stat(self.path), self._stat(self.journal_path))
+
+    def load(self):
+        """返回当前状态字典（快照 + 重放之后的事件；都不存在时初始化为默认结构）"""
+        stamp = self._file_stamp()
+        if self._state is not None and stamp == self._stamp:
+            return self._state
+
+        with state_lock():
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    state = json.load(f)
+            else:
+                # 没有快照（首次运行，或只保留了日志）：从默认状态重放全部日志
+                state = _copy(DEFAULT_STATE)
+            seq = state.pop("journal_seq", 0)
+            offset = state.pop("journal_offset", 0)
+            self._snapshot_seq = seq
+
+            for event in self._read_journal(offset):
+                if event["seq"] > seq:
+                    apply_event(state, event)
+                    seq = event["seq"]
+            self._seq = seq
+
+            self._state = state
+            self._saved = json.dumps(state, ensure_ascii=False, indent=2)
+            if not os.path.exists(self.path):
+                self._write_snapshot()
+            self._stamp = self._file_stamp()
+        return self._state
+
+    def _read_journal(self, offset=0):
+        """从指定字节位置读取日志事件（跳过写入中断留下的残缺行）"""
+        try:
+            f = open(self.journal_path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(offset)
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    def is_dirty(self, state=None):
+        """状态是否有未写盘的修改"""
+        state = self._state if state is None else state
+        return json.dumps(state, ensure_ascii=False, indent=2) != self._saved
+
+    def record(self, series, kind, **fields):
+        """记录一条不改变状态的审计事件（如冷却抑制），随下次save写入日志"""
+        self._pending.append({"series": series, "type": kind, **fields})
+
+    def save(self, state=None):
+        """
+        写回状态：变化作为事件追加到日志（仅在有修改或待写审计事件时写盘）
+
+        返回:
+            bool - 是否实际写入了磁盘
+        """
+        if self._saved is None:
+            self.load()  # 变化以磁盘上的状态为基准
+        state = self._state if state is None else state
+        if state is None:
+            return False
+        dirty = self.is_dirty(state)
+        if not dirty and not self._pending:
+            return False
+        with state_lock():
+            events = diff_events(json.loads(self._saved), state) if dirty else []
+            if self._file_stamp() != self._stamp:
+                # 其它进程在本进程加载后追加过事件：以其结果为基准叠加本进程的变化，续接其序号
+                merged = json.loads(self._saved)
+                for event in self._read_journal():
+                    if event["seq"] > self._seq:
+                        apply_event(merged, event)
+                        self._seq = event["seq"]
+                for event in events:
+                    apply_event(merged, event)
+                # 原地更新，调用方持有的状态字典随之刷新
+                state.clear()
+                state.update(merged)
+            self._append(events + self._pending)
+            self._pending = []
+            self._state = state
+            self._saved = json.dumps(state, ensure_ascii=False, indent=2)
+            if self._seq - self._snapshot_seq >= self.snapshot_every:
+                self._write_snapshot()
+            self._stamp = self._file_stamp()
+        return True
+
+    def _append(self, events):
+        """追加事件到日志（编号、时间戳，写入后fsync）"""
+        if not events:
+            return
+        ts = dt.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+        lines = []
+        for event in events:
+            self._seq += 1
+            lines.append(json.dumps({"seq": self._seq, "ts": ts, **event}, ensure_ascii=False))
+
+        os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+        with open(self.journal_path, "ab") as f:
+            # 上次写入中断留下的残缺行不能与新事件连在一起
+            if f.tell() > 0:
+                with open(self.journal_path, "rb") as r:
+                    r.seek(-1, os.SEEK_END)
+                    if r.read(1) != b"\n":
+                        f.write(b"\n")
+            f.write(("\n".join(lines) + "\n").encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _write_snapshot(self):
+        """把当前状态压缩为快照（记录日志序号与字节位置，加载时从该位置重放）"""
+        offset = self._stat(self.journal_path)
+        snapshot = dict(self._state)
+        snapshot["journal_seq"] = self._seq
+        snapshot["journal_offset"] = offset[1] if offset else 0
+        atomic_write_json(self.path, snapshot)
+        self._snapshot_seq = self._seq
+
+    def compact(self):
+        """立即写入快照"""
+        with state_lock():
+            self.load()
+            self._write_snapshot()
+            self._stamp = self._file_stamp()
+
+
+# 全局实例：每个进程共用一个状态对象
+state_store = StateStore()
+
+
+def _backend():
+    """状态后端：配置了STATE_DB时为SQLite存储，否则为事件日志"""
+    if STATE_DB:
+        from src.store import get_store  # 延迟导入，避免循环依赖
+
+        return get_store()
+    return state_store
+
 
 def load_state():
     """
@@ -24,6 +349,7 @@ def load_state():
 
     如果状态文件不存在，将自动创建包含默认结构的新文件
     这确保了项目首次运行时能正常初始化
+    状态在进程内只加载一次，文件被其它进程改写时自动重新读取
 
     返回:
         dict: 包含以下键的状态字典
@@ -31,18 +357,31 @@ def load_state():
             - last_trigger_at: 各阈值(70/80/90)的最后触发时间，用于冷却计算
             - bootstrapped: 是否完成首次初始化，控制历史信号抑制
     """
-    if not os.path.exists(STATE_FILE):
-        os.makedirs(STATE_DIR, exist_ok=True)
-        save_state(DEFAULT_STATE.copy())
-    with open(STATE_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return _backend().load()
 
 
 def save_state(state):
-    """保存状态到JSON文件"""
-    os.makedirs(STATE_DIR, exist_ok=True)
-    with open(STATE_FILE, "w", encoding="utf-8") as f:
-        json.dump(state, f, ensure_ascii=False, indent=2)
+    """保存状态：变化追加到事件日志或写入SQLite（加锁，内容未变化时跳过）"""
+    _backend().save(state)
+
+
+def record_event(series, kind, **fields):
+    """记录审计事件（如 record_event(key, "suppressed", date=..., levels=[...])），随下次保存写入"""
+    _backend().record(series, kind, **fields)
+
+
+def read_journal(series=None, kind=None):
+    """
+    读取事件日志（审计查询）
+
+    返回:
+        list - 事件字典，可按序列与类型过滤
+    """
+    return [
+        e
+        for e in state_store._read_journal()
+        if (series is None or e["series"] == series) and (kind is None or e["type"] == kind)
+    ]
 
 
 def days_since(date_str, today):
@@ -58,7 +397,19 @@ def today_utc_date():
     return dt.datetime.utcnow().date()
 
 
-def in_cooldown(state, level, today):
+def series_state(state, key):
+    """
+    获取指定序列的状态字典
+
+    主序列沿用state.json根级字段（兼容原schema），其它序列保存在 state["series"][key]，
+    结构相同，可直接用于in_cooldown/mark_trigger等函数
+    """
+    if key == PRIMARY_SERIES:
+        return state
+    return state.setdefault("series", {}).setdefault(key, _copy(DEFAULT_SERIES_STATE))
+
+
+def in_cooldown(state, level, today, cooldown_days=COOLDOWN_DAYS):
     """
     检查指定阈值是否在冷却期内
 
@@ -69,6 +420,7 @@ def in_cooldown(state, level, today):
         state: 当前状态字典
         level: 要检查的阈值 (70, 80, 或 90)
         today: 当前日期 (date对象)
+        cooldown_days: 冷却天数，默认COOLDOWN_DAYS（各序列可单独配置）
 
     返回:
         bool: True表示在冷却期内，False表示可以触发
@@ -77,7 +429,7 @@ def in_cooldown(state, level, today):
     if not last:
         return False  # 从未触发过，不在冷却期
     since = days_since(last, today)
-    return since is not None and since < 7  # 7天内为冷却期
+    return since is not None and since < cooldown_days  # 冷却天数内为冷却期
 
 
 def mark_trigger(state, level, today):
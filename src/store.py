@@ -0,0 +1,451 @@
+# FGI恐慌贪婪指数监控项目 - SQLite存储模块
+# 配置 STATE_DB 后，运行状态与以下数据保存在同一个本地SQLite文件中（WAL模式，多进程可同时读）：
+#   - 各序列的FGI日线与FGI7
+#   - 触发记录（含冷却期内被抑制的触发）与各阈值的冷却状态
+#   - 投递日志（发件箱每次投递的结果）
+# load_state/save_state 经 state.py 转到这里，调用方式不变；日期、阈值上建有索引，
+# "近一年所有80档触发"、"近30天FGI7统计"等查询直接走索引，无需重新拉取与计算
+
+import os
+import sys
+import json
+import sqlite3
+import argparse
+import threading
+import datetime as dt
+
+from src.config import STATE_DB, PRIMARY_SERIES, FGI7_WINDOW
+from src.state import (
+    STATE_FILE,
+    DATE_FMT,
+    DEFAULT_STATE,
+    DEFAULT_SERIES_STATE,
+    apply_event,
+    diff_events,
+    state_store,
+)
+from src.strategy import fgi7_series
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fgi_values (
+    series TEXT NOT NULL,
+    date TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (series, date)
+);
+CREATE INDEX IF NOT EXISTS idx_fgi_values_date ON fgi_values (date);
+
+CREATE TABLE IF NOT EXISTS fgi7 (
+    series TEXT NOT NULL,
+    date TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (series, date)
+);
+CREATE INDEX IF NOT EXISTS idx_fgi7_date ON fgi7 (date);
+
+CREATE TABLE IF NOT EXISTS triggers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    series TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    suppressed INTEGER NOT NULL DEFAULT 0,
+    recorded_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_triggers_level_date ON triggers (level, date);
+CREATE INDEX IF NOT EXISTS idx_triggers_date ON triggers (date);
+
+CREATE TABLE IF NOT EXISTS cooldown (
+    series TEXT NOT NULL,
+    level TEXT NOT NULL,
+    last_trigger_at TEXT,
+    PRIMARY KEY (series, level)
+);
+
+CREATE TABLE IF NOT EXISTS series_state (
+    series TEXT PRIMARY KEY,
+    last_processed_date TEXT,
+    bootstrapped INTEGER NOT NULL DEFAULT 0,
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+
+CREATE TABLE IF NOT EXISTS deliveries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL,
+    chat_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    error TEXT,
+    at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_deliveries_at ON deliveries (at);
+CREATE INDEX IF NOT EXISTS idx_deliveries_chat ON deliveries (chat_id, at);
+"""
+
+
+def _now():
+    return dt.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _day(date_obj):
+    return date_obj if isinstance(date_obj, str) else date_obj.strftime(DATE_FMT)
+
+
+class FGIStore:
+    """
+    SQLite存储
+
+    作为状态后端时与 StateStore 接口一致（load/save/record/is_dirty）：
+    load 返回与JSON状态相同结构的字典，save 把与上次保存相比的变化写入各表，
+    新触发同时记入触发记录；其它连接提交过修改时（PRAGMA data_version变化）load重新读取
+    """
+
+    def __init__(self, path=STATE_DB):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._state = None
+        self._version = None
+        self._saved = None  # 上次读取/写入的状态（序列化），用于计算变化
+        self._pending = []  # 待写入的审计事件（见record）
+
+    def _transaction(self, fn, *args):
+        """在一个写事务内执行fn(conn, *args)"""
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(conn, *args)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return result
+
+    def _data_version(self):
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    # ---- 状态后端 ----
+
+    def load(self):
+        """返回当前状态字典；数据库为空时从事件日志/state.json导入"""
+        with self._lock:
+            version = self._data_version()
+            if self._state is not None and version == self._version:
+                return self._state
+
+            state = self._read_state(self._conn)
+            if state is None:
+                state = self._initial_state()
+
+            self._state = state
+            self._saved = json.dumps(state, ensure_ascii=False, sort_keys=True)
+            self._version = self._data_version()
+        return self._state
+
+    def _read_state(self, conn):
+        """从数据库读出状态字典；尚无任何序列状态时返回None"""
+        rows = conn.execute(
+            "SELECT series, last_processed_date, bootstrapped, extra FROM series_state"
+        ).fetchall()
+        if not rows:
+            return None
+        state = json.loads(json.dumps(DEFAULT_STATE))
+        for series, processed, boot, extra in rows:
+            sub = self._series(state, series)
+            sub["last_processed_date"] = processed
+            sub["bootstrapped"] = bool(boot)
+            sub.update(json.loads(extra))
+        for series, level, date in conn.execute(
+            "SELECT series, level, last_trigger_at FROM cooldown"
+        ):
+            self._series(state, series).setdefault("last_trigger_at", {})[level] = date
+        return state
+
+    @staticmethod
+    def _series(state, series):
+        if series == PRIMARY_SERIES:
+            return state
+        return state.setdefault("series", {}).setdefault(
+            series, json.loads(json.dumps(DEFAULT_SERIES_STATE))
+        )
+
+    def _initial_state(self):
+        """首次使用：沿用已有的JSON状态（无则为默认状态）并写入数据库"""
+        if os.path.exists(STATE_FILE) or os.path.exists(state_store.journal_path):
+            state = json.loads(json.dumps(state_store.load()))
+        else:
+            state = json.loads(json.dumps(DEFAULT_STATE))
+        self._write_state(state, {})
+        return state
+
+    def is_dirty(self, state=None):
+        state = self._state if state is None else state
+        return json.dumps(state, ensure_ascii=False, sort_keys=True) != self._saved
+
+    def record(self, series, kind, **fields):
+        """记录审计事件，随下次save写入（suppressed写入触发记录并标记为被抑制）"""
+        self._pending.append({"series": series, "type": kind, **fields})
+
+    def save(self, state=None):
+        """
+        写回状态（仅在有修改或待写审计事件时写库）
+
+        返回:
+            bool - 是否实际写入
+        """
+        if self._saved is None:
+            self.load()  # 变化以磁盘上的状态为基准
+        state = self._state if state is None else state
+        if state is None:
+            return False
+        if not self.is_dirty(state) and not self._pending:
+            return False
+        self._write_state(state, json.loads(self._saved))
+        return True
+
+    def _write_state(self, state, old):
+        """
+        把本进程相对old的修改写入数据库
+
+        写事务（BEGIN IMMEDIATE）内先重新读取库中的最新状态，只把本进程的修改（事件）叠加上去，
+        其它进程在本进程加载之后提交的触发与冷却不会被覆盖
+        """
+        events = diff_events(old, state)
+        pending = self._pending
+
+        def write(conn):
+            current = self._read_state(conn) or json.loads(json.dumps(DEFAULT_STATE))
+            for e in events:
+                apply_event(current, e)
+
+            now = _now()
+            for e in events + pending:
+                series, kind = e["series"], e["type"]
+                if kind == "trigger":
+                    conn.execute(
+                        "INSERT OR REPLACE INTO cooldown (series, level, last_trigger_at) "
+                        "VALUES (?, ?, ?)",
+                        (series, e["level"], e["date"]),
+                    )
+                    if e["date"] is not None:
+                        conn.execute(
+                            "INSERT INTO triggers (series, level, date, suppressed, recorded_at) "
+                            "VALUES (?, ?, ?, 0, ?)",
+                            (series, int(e["level"]), e["date"], now),
+                        )
+                elif kind == "suppressed":
+                    conn.executemany(
+                        "INSERT INTO triggers (series, level, date, suppressed, recorded_at) "
+                        "VALUES (?, ?, ?, 1, ?)",
+                        [(series, int(level), e["date"], now) for level in e["levels"]],
+                    )
+
+            # 有修改的序列整行写入合并后的标量字段（行数=序列数，很小）
+            for series in dict.fromkeys(e["series"] for e in events):
+                sub = self._series(current, series)
+                extra = {
+                    k: v
+                    for k, v in sub.items()
+                    if k not in ("last_processed_date", "bootstrapped", "last_trigger_at", "series")
+                }
+                conn.execute(
+                    "INSERT OR REPLACE INTO series_state "
+                    "(series, last_processed_date, bootstrapped, extra) VALUES (?, ?, ?, ?)",
+                    (
+                        series,
+                        sub.get("last_processed_date"),
+                        int(bool(sub.get("bootstrapped"))),
+                        json.dumps(extra, ensure_ascii=False),
+                    ),
+                )
+            return current
+
+        merged = self._transaction(write)
+        self._pending = []
+        self._state = merged
+        self._saved = json.dumps(merged, ensure_ascii=False, sort_keys=True)
+        self._version = self._data_version()
+
+    # ---- 序列与FGI7 ----
+
+    def upsert_values(self, series, values, window=FGI7_WINDOW):
+        """
+        写入日线数据及对应的FGI7（已存在的日期覆盖）
+
+        参数:
+            values: [(date, value)] 按日期升序；前window-1天只写日线（FGI7窗口不完整）
+        """
+        if not values:
+            return
+        days = [_day(d) for d, _ in values]
+        fgi7 = fgi7_series(values, window)
+
+        def write(conn):
+            conn.executemany(
+                "INSERT OR REPLACE INTO fgi_values (series, date, value) VALUES (?, ?, ?)",
+                [(series, day, v) for day, (_, v) in zip(days, values)],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO fgi7 (series, date, value) VALUES (?, ?, ?)",
+                [(series, day, v) for day, v in zip(days[window - 1 :], fgi7)],
+            )
+
+        self._transaction(write)
+
+    def values(self, series=PRIMARY_SERIES, since=None):
+        """读取日线 [(date, value)] 按日期升序"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT date, value FROM fgi_values WHERE series = ? AND date >= ? ORDER BY date",
+                (series, _day(since) if since else ""),
+            ).fetchall()
+        return [(dt.datetime.strptime(d, DATE_FMT).date(), v) for d, v in rows]
+
+    def fgi7_stats(self, days=30, series=PRIMARY_SERIES, today=None):
+        """
+        最近days天的FGI7统计
+
+        返回:
+            dict - {"count", "min", "max", "avg", "last"}；无数据时count为0，其余为None
+        """
+        today = today or dt.datetime.utcnow().date()
+        since = _day(today - dt.timedelta(days=days - 1))
+        with self._lock:
+            count, lo, hi, avg = self._conn.execute(
+                "SELECT COUNT(*), MIN(value), MAX(value), AVG(value) FROM fgi7 "
+                "WHERE series = ? AND date >= ?",
+                (series, since),
+            ).fetchone()
+            last = self._conn.execute(
+                "SELECT value FROM fgi7 WHERE series = ? AND date >= ? ORDER BY date DESC LIMIT 1",
+                (series, since),
+            ).fetchone()
+        return {
+            "count": count,
+            "min": lo,
+            "max": hi,
+            "avg": round(avg, 2) if avg is not None else None,
+            "last": last[0] if last else None,
+        }
+
+    # ---- 触发记录与投递日志 ----
+
+    def triggers(self, level=None, since=None, series=PRIMARY_SERIES, suppressed=False):
+        """
+        查询触发记录
+
+        参数:
+            level: 阈值，None表示全部
+            since: 起始日期（含）
+            suppressed: 是否包含冷却期内被抑制的触发
+
+        返回:
+            list - [{"series", "level", "date", "suppressed"}] 按日期升序
+        """
+        sql = "SELECT series, level, date, suppressed FROM triggers WHERE series = ?"
+        args = [series]
+        if level is not None:
+            sql += " AND level = ?"
+            args.append(int(level))
+        if since is not None:
+            sql += " AND date >= ?"
+            args.append(_day(since))
+        if not suppressed:
+            sql += " AND suppressed = 0"
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY date, id", args).fetchall()
+        return [
+            {"series": s, "level": lv, "date": d, "suppressed": bool(sup)}
+            for s, lv, d, sup in rows
+        ]
+
+    def log_deliveries(self, rows):
+        """
+        追加投递日志
+
+        参数:
+            rows: [(幂等键, chat_id, 状态, 已尝试次数, 错误信息或None)]
+        """
+        if not rows:
+            return
+        now = _now()
+        self._transaction(
+            lambda conn: conn.executemany(
+                "INSERT INTO deliveries (key, chat_id, status, attempts, error, at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(key, str(cid), status, attempts, error, now) for key, cid, status, attempts, error in rows],
+            )
+        )
+
+    def deliveries(self, since=None, chat_id=None):
+        """查询投递日志 [{"key", "chat_id", "status", "attempts", "error", "at"}] 按时间升序"""
+        sql = "SELECT key, chat_id, status, attempts, error, at FROM deliveries WHERE at >= ?"
+        args = [since or ""]
+        if chat_id is not None:
+            sql += " AND chat_id = ?"
+            args.append(str(chat_id))
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY id", args).fetchall()
+        cols = ("key", "chat_id", "status", "attempts", "error", "at")
+        return [dict(zip(cols, row)) for row in rows]
+
+    def close(self):
+        self._conn.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """配置了STATE_DB时返回进程内共享的存储实例，否则返回None（并发获取数据与投递的线程共用）"""
+    global _store
+    if STATE_DB and _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = FGIStore(STATE_DB)
+    return _store
+
+
+def main(argv=None):
+    """命令行入口：python -m src.store triggers|fgi7|deliveries"""
+    parser = argparse.ArgumentParser(description="查询FGI SQLite存储")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    trig = sub.add_parser("triggers", help="触发记录")
+    trig.add_argument("--level", type=int)
+    trig.add_argument("--days", type=int, default=365)
+    trig.add_argument("--series", default=PRIMARY_SERIES)
+    trig.add_argument("--suppressed", action="store_true", help="包含冷却期内被抑制的触发")
+
+    stats = sub.add_parser("fgi7", help="FGI7统计")
+    stats.add_argument("--days", type=int, default=30)
+    stats.add_argument("--series", default=PRIMARY_SERIES)
+
+    dlv = sub.add_parser("deliveries", help="投递日志")
+    dlv.add_argument("--days", type=int, default=7)
+    dlv.add_argument("--chat-id")
+
+    args = parser.parse_args(argv)
+    store = get_store()
+    if store is None:
+        print("未配置 STATE_DB")
+        return 1
+
+    since = dt.datetime.utcnow().date() - dt.timedelta(days=args.days)
+    if args.cmd == "triggers":
+        for t in store.triggers(args.level, since, args.series, args.suppressed):
+            print(f"{t['date']}\t{t['level']}\t{'suppressed' if t['suppressed'] else 'fired'}")
+    elif args.cmd == "fgi7":
+        print(json.dumps(store.fgi7_stats(args.days, args.series), ensure_ascii=False))
+    else:
+        for d in store.deliveries(since.strftime(DATE_FMT), args.chat_id):
+            print(f"{d['at']}\t{d['chat_id']}\t{d['status']}\t{d['key']}\t{d['error'] or ''}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,65 @@
 # FGI恐慌贪婪指数监控项目 - 策略计算模块
-# 负责FGI7滑动平均计算、上穿检测、连续检测等核心策略逻辑
+# 负责FGI7滑动平均计算、上穿检测、连续检测等核心策略逻辑，以及按日增量更新的FGI7指标
 
-from statistics import mean
+import operator
+import datetime as dt
+from collections import deque
+from functools import lru_cache
+from itertools import accumulate
+from typing import Dict, NamedTuple, Optional
+
+from src.config import FGI7_WINDOW
+
+
+def rolling_mean(vals, window=FGI7_WINDOW, ndigits=2):
+    """
+    滑动平均引擎 - 前缀和一次遍历得到整条滑动平均序列
+
+    第i个窗口的和 = prefix[i+window] - prefix[i]，每个窗口O(1)，整体O(n)；
+    FGI为整数，前缀和精确无误差，结果与逐窗口mean()完全一致
+
+    参数:
+        vals: 按日期升序的数值序列
+        window: 窗口长度，默认FGI7_WINDOW
+        ndigits: 保留小数位，None表示不取整
+
+    返回:
+        list - 长度为 len(vals)-window+1 的滑动平均序列，
+               第k项对应 vals[k+window-1] 当日（含当日）的窗口平均；数据不足时为空
+    """
+    n = len(vals)
+    if window <= 0 or n < window:
+        return []
+
+    prefix = [0, *accumulate(vals)]
+    if ndigits is None:
+        return [(prefix[i + window] - prefix[i]) / window for i in range(n - window + 1)]
+    return [
+        round((prefix[i + window] - prefix[i]) / window, ndigits)
+        for i in range(n - window + 1)
+    ]
+
+
+@lru_cache(maxsize=8)
+def _fgi7_series_cached(vals, window):
+    return tuple(rolling_mean(vals, window))
+
+
+def fgi7_series(values_desc, window=FGI7_WINDOW):
+    """
+    获取整条FGI7序列（保留2位小数）
+
+    同一份数据在一次运行中会被compute_fgi7、two_consecutive_ge和汇报生成器
+    反复使用，这里按数值内容缓存，只计算一次
+
+    参数:
+        values_desc: [(date, value_int)] 按日期升序的FGI数据列表
+        window: 窗口长度，默认FGI7_WINDOW
+
+    返回:
+        tuple - FGI7序列，最后一项为今日FGI7
+    """
+    return _fgi7_series_cached(tuple(v for (_, v) in values_desc), window)
 
 
 def compute_fgi7(values_desc):
@@ -28,19 +86,12 @@ def compute_fgi7(values_desc):
             - 数据不足时返回 (None, None)
     """
     # 需要至少8天数据：7天计算今日FGI7 + 1天计算昨日FGI7
-    if len(values_desc) < 8:
+    if len(values_desc) < FGI7_WINDOW + 1:
         return None, None
 
-    # 提取数值部分，忽略日期
-    vals = [v for (_, v) in values_desc]
-
-    # 今日FGI7：最近7天平均（包含今天）
-    fgi7_today = round(mean(vals[-7:]), 2)
-
-    # 昨日FGI7：前7天平均（不包含今天）
-    fgi7_prev = round(mean(vals[-8:-1]), 2)
-
-    return fgi7_prev, fgi7_today
+    # 今日FGI7为序列最后一项，昨日FGI7为倒数第二项
+    series = fgi7_series(values_desc)
+    return series[-2], series[-1]
 
 
 def two_consecutive_ge(values_desc, thresh=90):
@@ -55,22 +106,14 @@ def two_consecutive_ge(values_desc, thresh=90):
         bool - 是否连续2天满足条件
     """
     # 需要至少9天数据：7天计算第一个FGI7 + 2天计算连续两个FGI7
-    if len(values_desc) < 7 + 2:
+    if len(values_desc) < FGI7_WINDOW + 2:
         return False
 
-    # 构造逐日的FGI7序列
-    fgi7_series = []
-    for i in range(6, len(values_desc)):
-        # 每个FGI7是当天及之前6天的7天平均
-        window = [v for (_, v) in values_desc[i - 6 : i + 1]]
-        fgi7_series.append(round(mean(window), 2))
+    # 逐日的FGI7序列由滑动平均引擎一次算出
+    fgi7 = fgi7_series(values_desc)
 
     # 检查最后两天是否都 >= 阈值
-    return (
-        len(fgi7_series) >= 2
-        and fgi7_series[-1] >= thresh
-        and fgi7_series[-2] >= thresh
-    )
+    return fgi7[-1] >= thresh and fgi7[-2] >= thresh
 
 
 def crossings(prev, today, thresholds):
@@ -91,3 +134,119 @@ def crossings(prev, today, thresholds):
         if prev is not None and prev <= t and today is not None and today > t:
             fired.append(t)
     return fired
+
+
+# 连续条件的比较方式（规则中streak的gte/gt/lte/lt）
+COMPARISONS = {"gte": operator.ge, "gt": operator.gt, "lte": operator.le, "lt": operator.lt}
+
+
+def condition_key(op: str, level) -> str:
+    """连续条件在状态中的键，如 ("gte", 90) -> gte90"""
+    return f"{op}{level}"
+
+
+class FGI7Signal(NamedTuple):
+    """某日的FGI7判定结果"""
+
+    prev7: Optional[float]  # 昨日FGI7
+    today7: Optional[float]  # 今日FGI7
+    streaks: Dict[str, int]  # 各连续条件（condition_key）：截至今日FGI7连续满足的天数
+
+
+class FGI7Tracker:
+    """
+    增量FGI7指标
+
+    序列状态中保存最后推入的日期、最近 FGI7_WINDOW+1 天的原始值（环形缓冲）、最近FGI7_WINDOW天的和，
+    以及各连续条件的连续满足天数。每次运行只需推入新的一天：缓冲加入新值并移出最旧的值，窗口和随之加减，
+    连续天数加一或清零，均为O(1)，只用到当天的值，不需要历史窗口；
+    今日FGI7 = 窗口和/窗口长度，昨日FGI7由窗口和加回缓冲最旧的值、减去今日值得出。
+    上次推入的那天与数据不一致（数据被修订）、出现缺口或连续条件变化时，按传入的数据重建（连续天数以传入数据为限）
+    """
+
+    def __init__(self, conditions=(), window: int = FGI7_WINDOW, data: Optional[Dict] = None):
+        """
+        参数:
+            conditions: 需要跟踪连续天数的条件 [(比较方式, 值)]，如 [("gte", 90)]（来自规则中fgi7的streak）
+            window: 窗口长度
+            data: to_dict() 保存的状态
+        """
+        self.conditions = {condition_key(op, level): (COMPARISONS[op], level) for op, level in conditions}
+        self.window = window
+        data = data or {}
+        self.date = data.get("date")  # 最后推入的日期 "YYYY-MM-DD"
+        self.values = deque(data.get("values", ()), maxlen=window + 1)  # 最近window+1天的原始值
+        self.total = data.get("total")  # 最近window天的和；不足window天时为None
+        self.streaks = dict(data.get("streaks", {}))
+
+    @property
+    def today7(self) -> Optional[float]:
+        # 整数窗口和除以窗口长度后取整，与 rolling_mean 的结果完全一致
+        return None if self.total is None else round(self.total / self.window, 2)
+
+    @property
+    def prev7(self) -> Optional[float]:
+        if self.total is None or len(self.values) <= self.window:
+            return None
+        return round((self.total - self.values[-1] + self.values[0]) / self.window, 2)
+
+    def to_dict(self) -> Dict:
+        return {
+            "date": self.date,
+            "values": list(self.values),
+            "total": self.total,
+            "streaks": dict(self.streaks),
+        }
+
+    def push(self, day, value: int):
+        """推入新的一天（O(1)）"""
+        w = self.window
+        if len(self.values) >= w:
+            self.total -= self.values[-w]  # 移出窗口的那天（仍留在缓冲中，用于昨日FGI7）
+        elif len(self.values) == w - 1:
+            self.total = sum(self.values)  # 窗口刚好填满
+        self.values.append(value)
+        if self.total is not None:
+            self.total += value
+            today7 = self.today7
+            for key, (op, level) in self.conditions.items():
+                self.streaks[key] = self.streaks.get(key, 0) + 1 if op(today7, level) else 0
+        self.date = str(day)
+
+    def _rebuild(self, values):
+        self.date = None
+        self.values.clear()
+        self.total = None
+        self.streaks = {key: 0 for key in self.conditions}
+        for day, value in values:
+            self.push(day, value)
+
+    def _follows(self, values) -> bool:
+        """values的最后一天是否紧接上次推入的那天（且那天的值未被修订）"""
+        day = values[-1][0]
+        if len(values) >= 2:
+            prev_day, prev_value = values[-2]
+            return str(prev_day) == self.date and prev_value == self.values[-1]
+        # 只有当天的数据时按自然日判断是否连续
+        return isinstance(day, dt.date) and str(day - dt.timedelta(days=1)) == self.date
+
+    def advance(self, values) -> FGI7Signal:
+        """
+        与按日期升序的数据对齐，返回最后一天的判定结果
+
+        常见情况下最后一天是上次推入之后的新一天，只推入这一天（只用到最后一两天的数据）；
+        最后一天已推入过（如测试模式重复运行）时直接返回已保存的结果
+        """
+        day, value = values[-1]
+        # 缓冲已满（能算出昨日FGI7）且连续条件未变时才可增量更新；旧格式的状态没有缓冲，会重建
+        if len(self.values) > self.window and set(self.streaks) == set(self.conditions):
+            if str(day) == self.date and value == self.values[-1]:
+                return self.signal()
+            if self._follows(values):
+                self.push(day, value)
+                return self.signal()
+        self._rebuild(values)
+        return self.signal()
+
+    def signal(self) -> FGI7Signal:
+        return FGI7Signal(self.prev7, self.today7, dict(self.streaks))
@@ -0,0 +1,248 @@
+# FGI恐慌贪婪指数监控项目 - 订阅者注册表
+# 每个订阅者可设置自己的语言、关注阈值和定时汇报时间；注册表保存在 state/subscribers.json
+# 注册表不存在时沿用 TELEGRAM_CHAT_ID 中的收件人与全局默认参数，行为与原来一致
+
+import os
+import sys
+import json
+import argparse
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from src.config import (
+    THRESHOLDS,
+    REPORT_LOCALE,
+    MORNING_REPORT_UTC,
+    NOON_REPORT_UTC,
+    EVENING_REPORT_UTC,
+)
+from src.notify import TG_CHAT, parse_chat_ids
+from src.state import STATE_DIR, state_lock, atomic_write_json
+
+SUBSCRIBERS_FILE = os.path.join(STATE_DIR, "subscribers.json")
+
+# 默认定时汇报：汇报类型 -> UTC小时
+DEFAULT_REPORTS = {
+    "morning": MORNING_REPORT_UTC,
+    "noon": NOON_REPORT_UTC,
+    "evening": EVENING_REPORT_UTC,
+}
+
+
+class Subscriber(NamedTuple):
+    """订阅者（不可变，可直接用作分组键的一部分）"""
+
+    chat_id: str
+    locale: str = REPORT_LOCALE
+    thresholds: Tuple[int, ...] = tuple(THRESHOLDS)
+    reports: Tuple[Tuple[str, int], ...] = tuple(DEFAULT_REPORTS.items())  # (汇报类型, UTC小时)
+    alerts: bool = True  # 是否接收卖出提醒与每日汇报
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Subscriber":
+        return cls(
+            chat_id=str(data["chat_id"]),
+            locale=data.get("locale") or REPORT_LOCALE,
+            thresholds=tuple(sorted(data.get("thresholds") or THRESHOLDS)),
+            reports=tuple(data.get("reports", DEFAULT_REPORTS).items()),
+            alerts=data.get("alerts", True),
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            "chat_id": self.chat_id,
+            "locale": self.locale,
+            "thresholds": list(self.thresholds),
+            "reports": dict(self.reports),
+            "alerts": self.alerts,
+        }
+
+    def report_hour(self, report_type: str) -> Optional[int]:
+        """该订阅者接收指定汇报的UTC小时；不接收时返回None"""
+        return dict(self.reports).get(report_type)
+
+
+class SubscriberRegistry:
+    """
+    订阅者注册表
+
+    与状态文件相同：按文件mtime/大小判断是否需要重新读取，未变化时直接返回内存中的列表
+    """
+
+    def __init__(self, path=SUBSCRIBERS_FILE):
+        self.path = path
+        self._subscribers = None
+        self._stamp = None
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def load(self) -> List[Subscriber]:
+        """返回全部订阅者；注册表不存在时由 TELEGRAM_CHAT_ID 生成默认订阅者"""
+        stamp = self._file_stamp()
+        if stamp is None:
+            return [Subscriber(cid) for cid in parse_chat_ids(TG_CHAT)]
+        if self._subscribers is not None and stamp == self._stamp:
+            return self._subscribers
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self._subscribers = [Subscriber.from_dict(d) for d in data.get("subscribers", [])]
+        self._stamp = stamp
+        return self._subscribers
+
+    def save(self, subscribers: List[Subscriber]):
+        """保存注册表（原子写入）"""
+        atomic_write_json(self.path, {"subscribers": [s.to_dict() for s in subscribers]})
+        self._subscribers = list(subscribers)
+        self._stamp = self._file_stamp()
+
+    def upsert(self, subscriber: Subscriber):
+        """新增或替换订阅者"""
+        with state_lock():
+            subs = [s for s in self.load() if s.chat_id != subscriber.chat_id]
+            subs.append(subscriber)
+            self.save(subs)
+
+    def remove(self, chat_id: str) -> bool:
+        """删除订阅者，返回是否存在"""
+        with state_lock():
+            subs = self.load()
+            kept = [s for s in subs if s.chat_id != str(chat_id)]
+            if len(kept) == len(subs):
+                return False
+            self.save(kept)
+            return True
+
+
+# 全局实例
+subscriber_registry = SubscriberRegistry()
+
+
+def due_reports(subscribers: List[Subscriber], hour: int) -> Dict[str, List[Subscriber]]:
+    """在指定UTC小时需要接收各类定时汇报的订阅者 {汇报类型: [订阅者]}"""
+    due = {}
+    for sub in subscribers:
+        for report_type, report_hour in sub.reports:
+            if report_hour == hour:
+                due.setdefault(report_type, []).append(sub)
+    return due
+
+
+def report_hours(subscribers: List[Subscriber]) -> List[int]:
+    """所有订阅者的定时汇报小时（升序去重）"""
+    return sorted({hour for sub in subscribers for _, hour in sub.reports})
+
+
+def alert_recipients(subscribers: List[Subscriber], levels=None) -> List[str]:
+    """
+    卖出提醒的收件人
+
+    参数:
+        levels: 本次触发的阈值；为None时返回所有接收提醒的订阅者，
+                否则只返回关注阈值与之有交集的订阅者
+    """
+    return [
+        sub.chat_id
+        for sub in subscribers
+        if sub.alerts and (levels is None or set(levels) & set(sub.thresholds))
+    ]
+
+
+def alert_groups(subscribers: List[Subscriber], levels) -> Dict[Tuple[int, ...], List[str]]:
+    """
+    按关注的阈值分组卖出提醒的收件人，每组的提醒只列出本组关注的档位
+
+    参数:
+        levels: 本次出现信号的阈值（按触发顺序）
+
+    返回:
+        dict - {本组关注的阈值（levels的子序列）: [chat_id]}；不关注其中任何阈值的订阅者不在结果中
+    """
+    groups = {}
+    for sub in subscribers:
+        if not sub.alerts:
+            continue
+        mine = tuple(t for t in levels if t in sub.thresholds)
+        if mine:
+            groups.setdefault(mine, []).append(sub.chat_id)
+    return groups
+
+
+def report_groups(subscribers: List[Subscriber]) -> Dict[Tuple[str, Tuple[int, ...]], List[str]]:
+    """按语言与关注的阈值分组 {(语言, 阈值): [chat_id]}，同组的汇报内容完全一致"""
+    groups = {}
+    for sub in subscribers:
+        groups.setdefault((sub.locale, tuple(sub.thresholds)), []).append(sub.chat_id)
+    return groups
+
+
+def main(argv=None):
+    """命令行入口：python -m src.subscribers list|add|remove"""
+    parser = argparse.ArgumentParser(description="管理FGI订阅者")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list", help="列出订阅者")
+
+    add = sub.add_parser("add", help="新增或更新订阅者")
+    add.add_argument("chat_id")
+    add.add_argument("--locale", default=REPORT_LOCALE)
+    add.add_argument("--thresholds", help="关注的策略阈值，逗号分隔，如 70,80")
+    add.add_argument(
+        "--reports",
+        help="定时汇报，类型=UTC小时，逗号分隔，如 morning=1,evening=13；none表示不接收",
+    )
+    add.add_argument("--no-alerts", action="store_true", help="不接收卖出提醒与每日汇报")
+
+    rm = sub.add_parser("remove", help="删除订阅者")
+    rm.add_argument("chat_id")
+
+    args = parser.parse_args(argv)
+
+    if args.cmd == "list":
+        for s in subscriber_registry.load():
+            reports = ", ".join(f"{t}@{h:02d}" for t, h in s.reports) or "-"
+            print(
+                f"{s.chat_id}\t{s.locale}\t{','.join(map(str, s.thresholds))}\t{reports}\t"
+                f"{'alerts' if s.alerts else 'no-alerts'}"
+            )
+        return 0
+
+    if args.cmd == "remove":
+        if subscriber_registry.remove(args.chat_id):
+            print(f"Removed {args.chat_id}")
+            return 0
+        print(f"{args.chat_id} not found")
+        return 1
+
+    reports = DEFAULT_REPORTS
+    if args.reports:
+        reports = {}
+        if args.reports != "none":
+            for item in args.reports.split(","):
+                report_type, hour = item.split("=")
+                reports[report_type.strip()] = int(hour)
+    thresholds = (
+        [int(t) for t in args.thresholds.split(",")] if args.thresholds else THRESHOLDS
+    )
+    unknown = set(thresholds) - set(THRESHOLDS)
+    if unknown:
+        print(f"阈值必须是策略阈值 {THRESHOLDS} 的子集: {sorted(unknown)}")
+        return 1
+    subscriber_registry.upsert(
+        Subscriber(
+            chat_id=args.chat_id,
+            locale=args.locale,
+            thresholds=tuple(sorted(thresholds)),
+            reports=tuple(reports.items()),
+            alerts=not args.no_alerts,
+        )
+    )
+    print(f"Saved {args.chat_id}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+# FGI恐慌贪婪指数监控项目 - 参数扫描模块
+# 在本地历史上网格搜索 THRESHOLDS / SELL_MAP / COOLDOWN_DAYS / FGI7窗口，多进程并行回测并排序；
+# 每个组合按 rules_for 生成与监控相同的默认规则回测（rules.yaml中自定义规则的档位固定，不参与扫描）
+
+import os
+import sys
+import time
+import argparse
+import datetime as dt
+from array import array
+from itertools import combinations, product
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from src.config import THRESHOLDS, SELL_MAP, COOLDOWN_DAYS, FGI7_WINDOW
+from src.history import HISTORY_FILE
+from src.backtest import load_fixture, primary_spec, run_backtest
+from src.rules import rules_for
+from src.strategy import rolling_mean
+
+# 默认扫描网格：3档阈值组合 × 卖出比例方案 × 冷却天数 × 窗口长度
+SWEEP_THRESHOLD_RANGE = range(55, 100, 5)
+SWEEP_LEVELS = 3
+SWEEP_SELL_PLANS = [(10, 15, 25), (5, 10, 20), (10, 20, 30), (15, 20, 25), (20, 30, 50)]
+SWEEP_COOLDOWNS = [3, 5, 7, 10, 14]
+SWEEP_WINDOWS = [3, 5, 7, 10, 14]
+
+# 排序指标：列名 -> (取值函数, 是否降序)
+SORT_KEYS = {
+    "avg_fgi": (lambda r: r["avg_sell_fgi"] or 0, True),
+    "total": (lambda r: r["total_sell_pct"], True),
+    "triggers": (lambda r: r["triggers"], True),
+    "suppressed": (lambda r: r["suppressed"], False),
+}
+
+# 工作进程内的历史数据、序列参数与滑动平均缓存（每个进程只初始化一次）
+_worker_values = None
+_worker_spec = None
+_worker_fgi7 = {}
+
+
+def build_grid(
+    threshold_range=SWEEP_THRESHOLD_RANGE,
+    levels=SWEEP_LEVELS,
+    sell_plans=SWEEP_SELL_PLANS,
+    cooldowns=SWEEP_COOLDOWNS,
+    windows=SWEEP_WINDOWS,
+):
+    """
+    生成参数组合列表
+
+    返回:
+        list - [(thresholds, sell_plan, cooldown_days, window)]，
+               thresholds与sell_plan按位置一一对应
+    """
+    grid = []
+    for thresholds in combinations(threshold_range, levels):
+        for plan, cooldown, window in product(sell_plans, cooldowns, windows):
+            grid.append((thresholds, tuple(plan[:levels]), cooldown, window))
+    return grid
+
+
+def _share_history(values):
+    """将历史写入共享内存：前半段为日期序数，后半段为FGI值（int32）"""
+    packed = array("i", [d.toordinal() for d, _ in values])
+    packed.extend(v for _, v in values)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, len(packed) * packed.itemsize))
+    shm.buf[: len(packed) * packed.itemsize] = packed.tobytes()
+    return shm
+
+
+def _init_worker(shm_name, n, spec):
+    """工作进程初始化：从共享内存读取历史，避免每个任务重复序列化"""
+    global _worker_values, _worker_spec
+    _worker_spec = spec
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        packed = array("i")
+        packed.frombytes(bytes(shm.buf[: 2 * n * packed.itemsize]))
+    finally:
+        shm.close()
+    _worker_values = [
+        (dt.date.fromordinal(d), v) for d, v in zip(packed[:n], packed[n:])
+    ]
+    _worker_fgi7.clear()
+
+
+def _evaluate(params):
+    """在工作进程中回测单个参数组合，返回汇总行"""
+    thresholds, plan, cooldown, window = params
+    fgi7 = _worker_fgi7.get(window)
+    if fgi7 is None:
+        fgi7 = _worker_fgi7[window] = rolling_mean([v for _, v in _worker_values], window)
+
+    spec = dict(
+        _worker_spec,
+        thresholds=list(thresholds),
+        sell_map=dict(zip(thresholds, plan)),
+        cooldown_days=cooldown,
+    )
+    summary = run_backtest(
+        _worker_values, spec=spec, rules=rules_for(spec, path=None), window=window, fgi7=fgi7
+    )["summary"]
+    return {
+        "thresholds": thresholds,
+        "sell_plan": plan,
+        "cooldown": cooldown,
+        "window": window,
+        "triggers": summary["triggers"],
+        "suppressed": summary["suppressed"],
+        "total_sell_pct": summary["total_sell_pct"],
+        "avg_sell_fgi": summary["avg_sell_fgi"],
+    }
+
+
+def run_sweep(values, grid, workers=None, chunksize=None, spec=None):
+    """
+    多进程执行参数扫描
+
+    历史数据只写入一次共享内存，工作进程在初始化时读取；
+    任务本身只携带参数元组，序列化开销与历史长度无关
+
+    参数:
+        values: [(date, value)] 按日期升序的FGI历史
+        grid: build_grid() 生成的参数组合
+        workers: 进程数，默认使用全部CPU
+        chunksize: 每批派发的任务数，默认按进程数自动切分
+        spec: 序列参数（最低卖出水平等未扫描的参数），默认主序列
+
+    返回:
+        list - 每个参数组合的汇总行（顺序与grid一致）
+    """
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(grid) // (workers * 8))
+
+    shm = _share_history(values)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(shm.name, len(values), spec or primary_spec()),
+        ) as pool:
+            return list(pool.map(_evaluate, grid, chunksize=chunksize))
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def rank_results(rows, sort="avg_fgi", min_triggers=1):
+    """按指定指标排序，过滤触发次数过少的组合"""
+    key, reverse = SORT_KEYS[sort]
+    rows = [r for r in rows if r["triggers"] >= min_triggers]
+    return sorted(rows, key=key, reverse=reverse)
+
+
+def format_table(rows, top=20):
+    """将排序结果格式化为紧凑表格"""
+    header = f"{'#':>3} {'阈值':<12} {'卖出%':<12} {'冷却':>4} {'窗口':>4} {'触发':>4} {'抑制':>4} {'累计%':>6} {'均FGI':>6}"
+    lines = [header]
+    for i, r in enumerate(rows[:top], 1):
+        avg = f"{r['avg_sell_fgi']:.2f}" if r["avg_sell_fgi"] is not None else "-"
+        lines.append(
+            f"{i:>3} {'/'.join(map(str, r['thresholds'])):<12} "
+            f"{'/'.join(map(str, r['sell_plan'])):<12} {r['cooldown']:>4} {r['window']:>4} "
+            f"{r['triggers']:>4} {r['suppressed']:>4} {r['total_sell_pct']:>6} {avg:>6}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """命令行入口：python -m src.sweep [--file PATH] [--workers N] [--sort KEY] [--top N]"""
+    parser = argparse.ArgumentParser(description="FGI策略参数扫描")
+    parser.add_argument(
+        "--file",
+        default=os.getenv("FGI_BACKTEST_FILE", HISTORY_FILE),
+        help="历史数据文件（CSV或alternative.me JSON），默认本地历史",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认全部CPU")
+    parser.add_argument(
+        "--sort", choices=sorted(SORT_KEYS), default="avg_fgi", help="排序指标"
+    )
+    parser.add_argument("--min-triggers", type=int, default=3, help="最少触发次数")
+    parser.add_argument("--top", type=int, default=20, help="显示前N名")
+    args = parser.parse_args(argv)
+
+    values = load_fixture(args.file)
+    if len(values) < max(SWEEP_WINDOWS) + 1:
+        print(f"Insufficient history in {args.file}; need >= {max(SWEEP_WINDOWS) + 1} days.")
+        return 1
+
+    grid = build_grid()
+    started = time.perf_counter()
+    rows = run_sweep(values, grid, workers=args.workers)
+    elapsed = time.perf_counter() - started
+
+    ranked = rank_results(rows, sort=args.sort, min_triggers=args.min_triggers)
+    print(format_table(ranked, top=args.top))
+    print("")
+    print(
+        f"组合数: {len(grid)}，有效: {len(ranked)}，历史: {len(values)}天，耗时: {elapsed:.2f} s"
+    )
+
+    # 标注当前配置的排名，便于对比手工参数
+    current = (
+        tuple(THRESHOLDS),
+        tuple(SELL_MAP[t] for t in THRESHOLDS),
+        COOLDOWN_DAYS,
+        FGI7_WINDOW,
+    )
+    for i, r in enumerate(ranked, 1):
+        if (r["thresholds"], r["sell_plan"], r["cooldown"], r["window"]) == current:
+            print(f"当前配置排名: {i}/{len(ranked)}")
+            break
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+# FGI恐慌贪婪指数监控项目 - 汇报模板引擎
+# 行式模板在首次使用时编译为Python函数，渲染只是一次函数调用；支持条件/循环、局部模板和多语言
+#
+# 模板语法（每个非指令行输出一行，最终以换行连接）:
+#   {表达式:格式}            插值，格式说明与str.format相同，如 {today7:.2f}、{change:+.2f}
+#   %if 条件 / %elif / %else / %end
+#   %for 变量 in 序列 / %end
+#   %include 局部模板名       在此处展开局部模板的所有行
+#   {局部模板名(分隔符)}       把局部模板的输出按分隔符拼成一段文本内联，默认换行
+# 插值表达式中不能出现 { } 和 !=（与str.format的语法冲突），复杂判断写在 %if 中
+
+import ast
+import re
+import builtins
+import threading
+from string import Formatter
+
+from src.config import REPORT_LOCALE
+from src.report_templates import LOCALES
+
+_DIRECTIVE = re.compile(r"^%(if|elif|else|end|for|include)\b\s*(.*)$")
+_CONVERSIONS = {"r": "repr", "s": "str", "a": "ascii"}
+
+
+class TemplateError(Exception):
+    """模板语法或渲染错误"""
+
+
+def _names(source, mode="eval"):
+    """返回表达式/语句中读取的变量名与赋值的变量名"""
+    tree = ast.parse(source, mode=mode)
+    loads, stores = set(), set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            (stores if isinstance(node.ctx, ast.Store) else loads).add(node.id)
+    return loads, stores
+
+
+class _Compiler:
+    """把一个模板（连同用到的局部模板）编译为Python源码"""
+
+    def __init__(self, name, partials):
+        self.name = name
+        self.partials = partials
+        self.loads = set()  # 模板中读取的变量名
+        self.stores = set()  # 循环变量
+        self.used = set()  # 用到的局部模板
+
+    def _expr(self, expr):
+        try:
+            loads, _ = _names(expr)
+        except SyntaxError as e:
+            raise TemplateError(f"{self.name}: 无效表达式 {expr!r}: {e}") from None
+        self.loads |= loads
+        self.used |= loads & set(self.partials)
+        return expr
+
+    def _line(self, text):
+        """模板行 -> 字符串表达式"""
+        parts = []
+        try:
+            fields = list(Formatter().parse(text))
+        except ValueError as e:
+            raise TemplateError(f"{self.name}: 无效模板行 {text!r}: {e}") from None
+        for literal, field, spec, conversion in fields:
+            if literal:
+                parts.append(repr(literal))
+            if field is None:
+                continue
+            value = self._expr(field)
+            if conversion:
+                value = f"{_CONVERSIONS[conversion]}({value})"
+            parts.append(f"format({value}, {spec!r})")
+        return " + ".join(parts) or "''"
+
+    def body(self, source, indent):
+        """编译模板行，返回源码行列表"""
+        code = []
+        depth = 0
+        for lineno, text in enumerate(source.split("\n"), 1):
+            pad = "    " * (indent + depth)
+            m = _DIRECTIVE.match(text)
+            if not m:
+                code.append(f"{pad}_out.append({self._line(text)})")
+                continue
+
+            kw, arg = m.groups()
+            if kw == "if":
+                code.append(f"{pad}if {self._expr(arg)}:")
+            elif kw in ("elif", "else"):
+                if depth == 0:
+                    raise TemplateError(f"{self.name}:{lineno}: %{kw} 缺少对应的 %if")
+                outer = "    " * (indent + depth - 1)
+                code.append(f"{outer}elif {self._expr(arg)}:" if kw == "elif" else f"{outer}else:")
+                code.append(f"{pad}pass")
+                continue
+            elif kw == "for":
+                try:
+                    loads, stores = _names(f"for {arg}: pass", mode="exec")
+                except SyntaxError as e:
+                    raise TemplateError(f"{self.name}:{lineno}: 无效循环 {arg!r}: {e}") from None
+                self.loads |= loads
+                self.stores |= stores
+                self.used |= loads & set(self.partials)
+                code.append(f"{pad}for {arg}:")
+            elif kw == "include":
+                if arg not in self.partials:
+                    raise TemplateError(f"{self.name}:{lineno}: 未知局部模板 {arg!r}")
+                self.used.add(arg)
+                code.append(f"{pad}_out.extend(_lines_{arg}())")
+                continue
+            else:  # end
+                if depth == 0:
+                    raise TemplateError(f"{self.name}:{lineno}: 多余的 %end")
+                depth -= 1
+                continue
+
+            depth += 1
+            code.append(f"{pad}    pass")
+
+        if depth:
+            raise TemplateError(f"{self.name}: 缺少 %end")
+        return code
+
+
+def compile_template(name, source, partials=None, constants=None):
+    """
+    编译模板
+
+    参数:
+        name: 模板名（用于报错）
+        source: 模板文本
+        partials: {局部模板名: 模板文本}
+        constants: 模板中可直接使用的常量（如各语言的词表）
+
+    返回:
+        function - render(context) -> str
+    """
+    partials = partials or {}
+    constants = constants or {}
+    compiler = _Compiler(name, partials)
+    main = compiler.body(source, indent=1)
+
+    # 递归收集用到的局部模板，每个编译为闭包，共享调用方的变量
+    defs = []
+    done = set()
+    while compiler.used - done:
+        pname = sorted(compiler.used - done)[0]
+        done.add(pname)
+        defs.append(f"    def _lines_{pname}():")
+        defs.append("        _out = []")
+        defs.extend(compiler.body(partials[pname], indent=2))
+        defs.append("        return _out")
+        defs.append(f"    def {pname}(_sep='\\n'):")
+        defs.append(f"        return _sep.join(_lines_{pname}())")
+
+    context_names = sorted(
+        compiler.loads
+        - compiler.stores
+        - set(partials)
+        - set(constants)
+        - set(dir(builtins))
+    )
+    code = ["def _render(_ctx):"]
+    code += [f"    {n} = _ctx[{n!r}]" for n in context_names]
+    code += defs
+    code += ["    _out = []"] + main + ["    return '\\n'.join(_out)"]
+
+    namespace = dict(constants)
+    exec(compile("\n".join(code), f"<template {name}>", "exec"), namespace)
+    render = namespace["_render"]
+    render.context_names = context_names
+    return render
+
+
+class TemplateSet:
+    """某一语言的全部已编译模板（缺失的模板、局部模板和常量沿用默认语言）"""
+
+    def __init__(self, locale):
+        base = LOCALES[REPORT_LOCALE]
+        spec = LOCALES.get(locale, base)
+        self.locale = locale if locale in LOCALES else REPORT_LOCALE
+        self.constants = {**base["constants"], **spec.get("constants", {})}
+        self.partials = {**base["partials"], **spec.get("partials", {})}
+        self.templates = {
+            name: compile_template(f"{self.locale}:{name}", source, self.partials, self.constants)
+            for name, source in {**base["templates"], **spec.get("templates", {})}.items()
+        }
+
+    def render(self, name, context):
+        """渲染指定模板"""
+        try:
+            template = self.templates[name]
+        except KeyError:
+            raise TemplateError(f"未知模板: {name}") from None
+        try:
+            return template(context)
+        except KeyError as e:
+            raise TemplateError(f"{self.locale}:{name}: 缺少变量 {e}") from None
+
+
+_sets = {}
+_sets_lock = threading.Lock()
+
+
+def get_templates(locale=None):
+    """获取指定语言的模板集（首次使用时编译，之后复用）"""
+    locale = locale or REPORT_LOCALE
+    with _sets_lock:
+        if locale not in _sets:
+            _sets[locale] = TemplateSet(locale)
+        return _sets[locale]
+
+
+def render(name, context, locale=None):
+    """用指定语言渲染模板"""
+    return get_templates(locale).render(name, context)
+
+
+def available_locales():
+    """所有已定义的语言"""
+    return sorted(LOCALES)
+
+
+# 启动时编译默认语言的模板，模板错误在导入时即暴露
+get_templates()
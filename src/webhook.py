@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FGI监控系统 - Telegram Webhook服务
+基于asyncio的轻量HTTP服务，接收Telegram推送的更新并交给Bot的Application分发处理，
+替代长轮询：无空闲轮询请求，更新到达即处理
+"""
+
+import json
+import asyncio
+import logging
+import secrets
+from http import HTTPStatus
+from typing import Optional
+
+from telegram import Update
+
+from src.config import BOT_WEBHOOK_MAX_BODY
+
+# Telegram在每次推送中携带的密钥请求头（setWebhook时指定secret_token）
+SECRET_HEADER = "x-telegram-bot-api-secret-token"
+
+
+class WebhookServer:
+    """接收Telegram更新的HTTP服务（支持keep-alive与大量并发连接）"""
+
+    def __init__(
+        self,
+        app,
+        host: str,
+        port: int,
+        path: str,
+        secret_token: Optional[str] = None,
+        max_body: int = BOT_WEBHOOK_MAX_BODY,
+    ):
+        """
+        初始化Webhook服务
+
+        参数:
+            app: 已启动的telegram.ext.Application，更新放入其update_queue
+            host/port: 监听地址
+            path: 接收更新的URL路径
+            secret_token: 请求头校验密钥，为空时不校验（仅限本机监听的本地测试）
+            max_body: 请求体大小上限（字节）
+        """
+        self.app = app
+        self.host = host
+        self.port = port
+        self.path = path
+        self.secret_token = secret_token
+        self.max_body = max_body
+        self.server = None
+        self._connections = {}  # 活动连接 writer -> 处理任务，停止时主动关闭（keep-alive连接不会自行断开）
+        self.logger = logging.getLogger(__name__)
+
+    async def start(self):
+        """开始监听"""
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        # 端口为0时由系统分配，回填实际端口
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.logger.info(f"Webhook服务已启动: http://{self.host}:{self.port}{self.path}")
+
+    async def stop(self):
+        """停止监听并关闭所有连接"""
+        if self.server is None:
+            return
+        self.server.close()
+        for writer in list(self._connections):
+            writer.close()
+        await asyncio.gather(*self._connections.values(), return_exceptions=True)
+        await self.server.wait_closed()
+        self.server = None
+        self._connections = {}
+        self.logger.info("Webhook服务已停止")
+
+    async def _handle_connection(self, reader, writer):
+        """处理一个连接上的所有请求（HTTP/1.1 keep-alive）"""
+        self._connections[writer] = asyncio.current_task()
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                status, keep_alive = await self._dispatch(*request)
+                self._write_response(writer, status, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            self.logger.error(f"Webhook连接处理失败: {e}")
+        finally:
+            self._connections.pop(writer, None)
+            writer.close()
+
+    async def _read_request(self, reader):
+        """
+        读取一个HTTP请求
+
+        返回:
+            tuple - (method, path, headers, body)；连接已关闭时返回None
+        """
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError:
+            return ("", "", {}, None)
+
+        lines = head.decode("latin-1").split("\r\n")
+        parts = lines[0].split(" ")
+        if len(parts) != 3:
+            return ("", "", {}, None)
+        method, target, version = parts
+
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        headers["_version"] = version
+
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            return ("", "", {}, None)
+        if length > self.max_body:
+            headers["_too_large"] = True
+            return (method, target.split("?", 1)[0], headers, None)
+        body = await reader.readexactly(length) if length else b""
+        return (method, target.split("?", 1)[0], headers, body)
+
+    async def _dispatch(self, method, path, headers, body):
+        """
+        校验请求并把更新放入Application的队列
+
+        更新入队后立即返回200，处理在Application中异步进行，
+        Telegram不必等待命令执行完成
+
+        返回:
+            tuple - (HTTP状态, 是否保持连接)
+        """
+        keep_alive = (
+            headers.get("_version") == "HTTP/1.1"
+            and headers.get("connection", "").lower() != "close"
+        )
+        if not method:
+            return HTTPStatus.BAD_REQUEST, False
+        if headers.get("_too_large"):
+            return HTTPStatus.REQUEST_ENTITY_TOO_LARGE, False
+        if path != self.path:
+            return HTTPStatus.NOT_FOUND, keep_alive
+        if method != "POST":
+            return HTTPStatus.METHOD_NOT_ALLOWED, keep_alive
+        if self.secret_token and not secrets.compare_digest(
+            headers.get(SECRET_HEADER, ""), self.secret_token
+        ):
+            self.logger.warning("Webhook密钥校验失败，已拒绝")
+            return HTTPStatus.FORBIDDEN, keep_alive
+
+        try:
+            update = Update.de_json(json.loads(body), self.app.bot)
+        except Exception as e:
+            self.logger.error(f"无法解析Webhook更新: {e}")
+            return HTTPStatus.BAD_REQUEST, keep_alive
+
+        if update is not None:
+            await self.app.update_queue.put(update)
+        return HTTPStatus.OK, keep_alive
+
+    @staticmethod
+    def _write_response(writer, status: HTTPStatus, keep_alive: bool):
+        """写回无响应体的HTTP响应"""
+        writer.write(
+            (
+                f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                "Content-Length: 0\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                "\r\n"
+            ).encode("latin-1")
+        )
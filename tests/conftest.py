@@ -0,0 +1,21 @@
+# 测试公共配置：state/ 等相对路径指向临时目录，进程内单例换成新实例
+
+import os
+
+import pytest
+
+
+@pytest.fixture
+def isolated_state(tmp_path, monkeypatch):
+    """在临时目录中运行，状态存储、数据缓存与订阅者均为全新实例"""
+    from src import state, series, subscribers, fgi_notifier, outbox, scheduled_reports
+    from src.data_cache import FGIDataCache
+
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(state.STATE_DIR)
+    monkeypatch.setattr(state, "state_store", state.StateStore())
+    monkeypatch.setattr(series, "fgi_cache", FGIDataCache())
+    registry = subscribers.SubscriberRegistry()
+    for module in (subscribers, fgi_notifier, outbox, scheduled_reports):
+        monkeypatch.setattr(module, "subscriber_registry", registry)
+    return tmp_path
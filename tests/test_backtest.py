@@ -0,0 +1,82 @@
+# 历史回测：整列判定的结果与逐日重放原判定逻辑一致
+
+import random
+import datetime as dt
+
+from src.backtest import format_backtest, load_fixture, run_backtest
+from src.rules import rules_for
+from src.strategy import compute_fgi7, crossings, rolling_mean, two_consecutive_ge
+
+SPEC = {
+    "key": "cnn_fgi",
+    "label": "FGI",
+    "source": "cnn",
+    "thresholds": [70, 80, 90],
+    "sell_map": {70: 10, 80: 20, 90: 30},
+    "cooldown_days": 7,
+    "min_sell_level": 60,
+}
+# 默认规则（不读取工作目录中的rules.yaml）
+RULES = rules_for(SPEC, path=None)
+
+
+def history(seed, days=400):
+    rng = random.Random(seed)
+    start = dt.date(2020, 1, 1)
+    v, out = 60, []
+    for n in range(days):
+        v = min(100, max(0, v + rng.randint(-10, 10)))
+        out.append((start + dt.timedelta(days=n), v))
+    return out
+
+
+def naive_backtest(values):
+    """逐日截取历史，按原 main() 的判定与每档独立7天冷却重放"""
+    events, last = [], {}
+    for i in range(len(values)):
+        window = values[: i + 1]
+        prev7, today7 = compute_fgi7(window)
+        fired = crossings(prev7, today7, [70, 80, 90])
+        if 90 not in fired and two_consecutive_ge(window, 90):
+            fired.append(90)
+        d = values[i][0].toordinal()
+        for level in fired:
+            ok = level not in last or d - last[level] >= 7
+            if ok:
+                last[level] = d
+            events.append((values[i][0], level, "trigger" if ok else "suppressed"))
+    return events
+
+
+def test_backtest_matches_day_by_day_replay():
+    fired = 0
+    for seed in range(10):
+        values = history(seed)
+        result = run_backtest(values, spec=SPEC, rules=RULES)
+        events = [(e["date"], e["level"], e["action"]) for e in result["events"]]
+        assert events == naive_backtest(values), seed
+
+        triggers = [e for e in result["events"] if e["action"] == "trigger"]
+        summary = result["summary"]
+        assert summary["triggers"] == len(triggers)
+        assert summary["suppressed"] == len(events) - len(triggers)
+        assert summary["total_sell_pct"] == sum(SPEC["sell_map"][e["level"]] for e in triggers)
+        assert sum(summary["by_level"].values()) == len(triggers)
+        fired += len(events)
+    assert fired > 50
+
+
+def test_precomputed_fgi7_gives_the_same_result():
+    values = history(3)
+    fgi7 = rolling_mean([v for _, v in values], 7)
+    assert run_backtest(values, spec=SPEC, rules=RULES, fgi7=fgi7) == run_backtest(values, spec=SPEC, rules=RULES)
+
+
+def test_fixture_round_trip_and_format(tmp_path):
+    values = history(5, days=60)
+    path = tmp_path / "history.csv"
+    path.write_text("".join(f"{d},{v}\n" for d, v in values), encoding="utf-8")
+    assert load_fixture(str(path)) == values
+
+    text = format_backtest(run_backtest(values, spec=SPEC, rules=RULES))
+    assert f"回测区间: {values[0][0]} ~ {values[-1][0]} (60天)" in text
@@ -0,0 +1,68 @@
+# Bot模式：Bot在运行时的同一个事件循环上启动与停止，汇报在线程池中生成
+
+import asyncio
+import threading
+
+from src import bot_handler as bot_module
+from src.runtime import FGIRuntime
+
+
+class FakeBot:
+    """记录start/stop所在的事件循环"""
+
+    def __init__(self, ok=True):
+        self.ok = ok
+        self.loops = []
+
+    async def start(self, update_mode):
+        self.loops.append(asyncio.get_running_loop())
+        return self.ok
+
+    async def stop(self):
+        self.loops.append(asyncio.get_running_loop())
+
+    async def prerender(self):
+        pass
+
+
+def _run_bot_only(bot, monkeypatch, seconds=0.1):
+    monkeypatch.setattr(bot_module, "bot_handler", bot)
+    rt = FGIRuntime(enable_monitor=False, enable_reports=False, enable_bot=True)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        loop.call_later(seconds, rt.stop)
+        return loop, await rt.run()
+
+    return asyncio.run(main())
+
+
+def test_bot_runs_on_the_runtime_loop(monkeypatch):
+    bot = FakeBot()
+    loop, code = _run_bot_only(bot, monkeypatch)
+
+    assert code == 0
+    assert bot.loops == [loop, loop]  # start与stop都在运行时的事件循环上
+
+
+def test_bot_only_mode_fails_when_the_bot_cannot_start(monkeypatch):
+    bot = FakeBot(ok=False)
+    _, code = _run_bot_only(bot, monkeypatch)
+
+    assert code == 1
+    assert len(bot.loops) == 1  # 未启动成功，不再调用stop
+
+
+def test_reports_render_off_the_event_loop(monkeypatch):
+    refreshed = []
+    monkeypatch.setattr(
+        bot_module.report_generator, "refresh_data", lambda: refreshed.append(threading.get_ident())
+    )
+    handler = bot_module.FGIBotHandler()
+
+    async def main():
+        return threading.get_ident(), await handler.render_report(threading.get_ident)
+
+    loop_thread, render_thread = asyncio.run(main())
+    assert refreshed == [render_thread]
+    assert render_thread != loop_thread
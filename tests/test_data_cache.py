@@ -0,0 +1,93 @@
+# 共享数据缓存：并发请求合并为一次拉取，过期时先返回旧数据再后台刷新
+
+import time
+import threading
+import datetime as dt
+
+import pytest
+
+from src.data_cache import FGIDataCache
+
+TODAY = dt.datetime.utcnow().date()
+FRESH = [(TODAY - dt.timedelta(days=1), 50), (TODAY, 55)]
+STALE = [(TODAY - dt.timedelta(days=2), 40), (TODAY - dt.timedelta(days=1), 45)]
+
+
+class BlockingLoader:
+    """在release()之前阻塞的loader，记录调用次数"""
+
+    def __init__(self, values=FRESH, error=None):
+        self.values = values
+        self.error = error
+        self.calls = 0
+        self.started = threading.Event()
+        self.gate = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        assert self.gate.wait(5)
+        if self.error:
+            raise self.error
+        return self.values
+
+    def release(self):
+        self.gate.set()
+
+
+def test_concurrent_misses_share_one_fetch():
+    loader = BlockingLoader()
+    cache = FGIDataCache(loader)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    assert loader.started.wait(5)
+    loader.release()
+    for t in threads:
+        t.join(5)
+
+    assert loader.calls == 1
+    assert results == [FRESH] * 8
+    assert cache.is_fresh() and cache.version == 1
+    # 已有今日数据：有效期内不再拉取
+    assert cache.get() is FRESH and loader.calls == 1
+
+
+def test_stale_data_is_served_while_refreshing():
+    loader = BlockingLoader()
+    cache = FGIDataCache(loader)
+    cache.put(STALE)
+    cache.invalidate()
+
+    assert cache.get() is STALE  # 不等待刷新
+    assert loader.started.wait(5)
+    assert cache.get() is STALE  # 刷新进行中，不再发起第二次拉取
+    loader.release()
+
+    deadline = time.monotonic() + 5
+    while cache.version < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.get() is FRESH and loader.calls == 1
+
+
+def test_refresh_can_be_awaited():
+    cache = FGIDataCache(lambda: FRESH)
+    cache.put(STALE)
+    cache.invalidate()
+    assert cache.get(allow_stale=False) is FRESH
+
+
+def test_failed_refresh_keeps_the_old_data():
+    loader = BlockingLoader(error=RuntimeError("down"))
+    loader.release()
+    cache = FGIDataCache(loader)
+    with pytest.raises(RuntimeError):
+        cache.get()
+
+    cache.put(STALE)
+    cache.invalidate()
+    with pytest.raises(RuntimeError):
+        cache.get(allow_stale=False)
+    # 失败后旧数据短时间内视为有效，不会每次请求都打到数据源
+    assert cache.get() is STALE and loader.calls == 2
@@ -0,0 +1,143 @@
+# 数据获取层：本地模拟数据源验证重试、条件请求与熔断
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src import fetcher
+from src.fetcher import CircuitBreaker, CircuitOpenError, FetchError, HTTPFetcher
+
+PAYLOAD = {"data": [{"value": "50", "timestamp": "1700000000"}]}
+
+
+class FakeAPI:
+    """按脚本依次返回状态码；支持ETag条件请求"""
+
+    def __init__(self):
+        self.script = []  # 待返回的状态码，用完后一直返回200
+        self.etag = None
+        self.requests = []
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                api.requests.append(dict(self.headers))
+                status = api.script.pop(0) if api.script else 200
+                if status == 200 and api.etag and self.headers.get("If-None-Match") == api.etag:
+                    status = 304
+                body = json.dumps(PAYLOAD).encode() if status == 200 else b""
+                self.send_response(status)
+                if api.etag:
+                    self.send_header("ETag", api.etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/fng/"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def api():
+    server = FakeAPI()
+    yield server
+    server.server.shutdown()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return fetcher._FetchState(str(tmp_path / "fetch_state.json"))
+
+
+def _fetcher(store, retries=2):
+    return HTTPFetcher(retries=retries, backoff=0, deadline=10, store=store)
+
+
+def test_retries_transient_errors(api, store):
+    api.script = [503, 429]
+
+    assert _fetcher(store).get_json(api.url) == PAYLOAD
+    assert len(api.requests) == 3
+
+
+def test_gives_up_after_retries(api, store):
+    api.script = [500, 502, 503, 504]
+
+    with pytest.raises(FetchError):
+        _fetcher(store, retries=2).get_json(api.url)
+    assert len(api.requests) == 3
+
+
+def test_client_errors_are_not_retried(api, store):
+    api.script = [404]
+
+    with pytest.raises(FetchError):
+        _fetcher(store).get_json(api.url)
+    assert len(api.requests) == 1
+
+
+def test_not_modified_reuses_persisted_response(api, store):
+    api.etag = '"v1"'
+    assert _fetcher(store).get_json(api.url) == PAYLOAD
+
+    # 新进程（新的获取器）从持久化的校验信息发起条件请求
+    assert _fetcher(store).get_json(api.url) == PAYLOAD
+    assert api.requests[-1]["If-None-Match"] == '"v1"'
+
+
+def test_open_breaker_skips_requests(api, store):
+    breaker = CircuitBreaker("fake", failures=2, cooldown=60, store=store)
+    api.script = [500] * 10
+    f = _fetcher(store, retries=0)
+
+    for _ in range(2):
+        with pytest.raises(FetchError):
+            f.get_json(api.url, breaker=breaker)
+    with pytest.raises(CircuitOpenError):
+        f.get_json(api.url, breaker=breaker)
+    assert len(api.requests) == 2
+
+
+def test_half_open_allows_a_single_probe(store, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(fetcher.time, "time", lambda: now[0])
+    breaker = CircuitBreaker("fake", failures=1, cooldown=60, store=store)
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    now[0] += 60
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        allowed = list(pool.map(lambda _: breaker.allow(), range(8)))
+    assert allowed.count(True) == 1
+
+    # 试探失败：重新计时，冷却期内仍拒绝
+    breaker.record_failure()
+    now[0] += 30
+    assert not breaker.allow()
+
+    # 下一次试探成功后关闭
+    now[0] += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.allow() and breaker.allow()
+
+
+def test_concurrent_failures_are_all_counted(store):
+    breaker = CircuitBreaker("fake", failures=1000, cooldown=60, store=store)
+    barrier = threading.Barrier(8)
+
+    def fail(_):
+        barrier.wait()
+        for _ in range(25):
+            breaker.record_failure()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(fail, range(8)))
+    assert store.get("breakers", "fake")["failures"] == 200
@@ -0,0 +1,139 @@
+# 发送调度器：按优先级与限速放行；单个收件人的429不暂停整次广播；调度器不能跨事件循环共用
+
+import time
+import asyncio
+import threading
+
+import pytest
+
+from src.governor import PRIORITY_ALERT, PRIORITY_REPORT, OutboundGovernor
+
+
+def _governor(**kwargs):
+    return OutboundGovernor(global_rate=1000, chat_interval=0, group_rate_per_minute=60000, **kwargs)
+
+
+def _gaps(times):
+    return [b - a for a, b in zip(times, times[1:])]
+
+
+async def _send_all(governor, chat_ids):
+    """每个收件人申请一次发送，返回各自被放行的耗时"""
+    started = time.monotonic()
+    done = {}
+
+    async def one(chat_id):
+        await governor.acquire(chat_id)
+        done[chat_id] = time.monotonic() - started
+
+    await asyncio.gather(*(one(c) for c in chat_ids))
+    return done
+
+
+def test_one_rate_limited_chat_does_not_pause_the_broadcast():
+    governor = _governor()
+    governor.penalize("slow", 0.5)
+
+    done = asyncio.run(_send_all(governor, ["slow", "a", "b", "c"]))
+
+    assert done["slow"] >= 0.45
+    assert max(done["a"], done["b"], done["c"]) < 0.2
+
+
+def test_rate_limits_across_several_chats_pause_everyone():
+    governor = _governor(global_pause_chats=2, global_pause_window=5)
+    governor.penalize("x", 0.5)
+    governor.penalize("y", 0.5)
+
+    done = asyncio.run(_send_all(governor, ["a", "b"]))
+
+    assert min(done.values()) >= 0.45
+
+
+def test_old_rate_limits_fall_out_of_the_window():
+    now = [0.0]
+    governor = _governor(global_pause_chats=2, global_pause_window=5, clock=lambda: now[0])
+    governor.penalize("x", 1)
+    now[0] = 10.0
+    governor.penalize("y", 1)
+
+    assert governor._take_token(now[0]) == 0.0
+
+
+def test_chat_already_waiting_is_held_after_a_rate_limit():
+    governor = _governor()
+
+    async def main():
+        await governor.acquire("a")
+        # 下一条已进入就绪堆时收到429
+        second = asyncio.ensure_future(governor.acquire("a"))
+        await asyncio.sleep(0)
+        governor.penalize("a", 0.3)
+        started = time.monotonic()
+        await second
+        return time.monotonic() - started
+
+    assert asyncio.run(main()) >= 0.25
+
+
+def test_cross_loop_use_raises_instead_of_dropping_waiters():
+    governor = _governor()
+    governor.penalize("a", 0.5)
+    entered = threading.Event()
+
+    async def waiter():
+        task = asyncio.ensure_future(governor.acquire("a"))
+        await asyncio.sleep(0)
+        entered.set()
+        await task
+
+    thread = threading.Thread(target=asyncio.run, args=(waiter(),), daemon=True)
+    thread.start()
+    entered.wait(2)
+    try:
+        with pytest.raises(RuntimeError):
+            asyncio.run(governor.acquire("b"))
+    finally:
+        thread.join(5)
+    assert not thread.is_alive()
+
+    # 旧循环上的等待者已放行，之后可以在新循环中继续使用
+    asyncio.run(governor.acquire("b"))
+
+
+def test_alerts_jump_ahead_of_queued_reports():
+    governor = OutboundGovernor(global_rate=20, chat_interval=0, group_rate_per_minute=60000)
+    order = []
+
+    async def send(chat_id, priority):
+        await governor.acquire(chat_id, priority)
+        order.append(chat_id)
+
+    async def main():
+        await asyncio.gather(
+            *(send(f"r{i}", PRIORITY_REPORT) for i in range(4)), send("alert", PRIORITY_ALERT)
+        )
+
+    asyncio.run(main())
+    assert order == ["alert", "r0", "r1", "r2", "r3"]  # 同级先到先得
+
+
+def test_per_chat_and_global_spacing():
+    governor = OutboundGovernor(global_rate=50, chat_interval=0.1, group_rate_per_minute=300)
+
+    async def main():
+        started = time.monotonic()
+        times = {}
+
+        async def send(chat_id):
+            await governor.acquire(chat_id)
+            times.setdefault(chat_id, []).append(time.monotonic() - started)
+
+        await asyncio.gather(*(send(c) for c in ["a", "a", "a", "-100", "-100", "b"]))
+        return times
+
+    times = asyncio.run(main())
+    assert min(_gaps(times["a"])) >= 0.09  # 私聊每0.1秒1条
+    assert min(_gaps(times["-100"])) >= 0.19  # 群组每分钟300条
+    every = sorted(t for ts in times.values() for t in ts)
+    assert min(_gaps(every)) >= 0.015  # 全局每秒50条
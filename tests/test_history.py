@@ -0,0 +1,79 @@
+# 本地历史与增量拉取：本地已有今日数据时不访问网络，否则只请求缺少的天数
+
+import datetime as dt
+
+import pytest
+
+from src import fgi_notifier
+from src.fetcher import FetchError
+from src.history import HISTORY_FILE, append_history, load_history
+
+TODAY = dt.date(2024, 3, 10)
+
+
+def _days(end, n, value=50):
+    return [(end - dt.timedelta(days=i), value) for i in range(n - 1, -1, -1)]
+
+
+class FakeAPI:
+    """记录request_fgi的limit参数，返回截至TODAY的数据"""
+
+    def __init__(self):
+        self.calls = []
+        self.error = False
+
+    def request_fgi(self, limit):
+        self.calls.append(limit)
+        if self.error:
+            raise FetchError("down")
+        return _days(TODAY, limit, 60)
+
+
+@pytest.fixture
+def api(isolated_state, monkeypatch):
+    fake = FakeAPI()
+    monkeypatch.setattr(fgi_notifier, "request_fgi", fake.request_fgi)
+    monkeypatch.setattr(fgi_notifier, "today_utc_date", lambda: TODAY)
+    return fake
+
+
+def test_empty_history_fetches_the_full_window(api):
+    values = fgi_notifier.fetch_fgi(window=14)
+
+    assert api.calls == [14]
+    assert values == _days(TODAY, 14, 60)
+    assert load_history() == values
+
+
+def test_only_missing_days_are_requested(api):
+    append_history(_days(TODAY - dt.timedelta(days=3), 20))
+
+    values = fgi_notifier.fetch_fgi(window=14)
+
+    assert api.calls == [3]
+    assert values == _days(TODAY - dt.timedelta(days=3), 11) + _days(TODAY, 3, 60)
+
+
+def test_up_to_date_history_does_not_touch_the_network(api):
+    append_history(_days(TODAY, 20))
+
+    assert fgi_notifier.fetch_fgi(window=14) == _days(TODAY, 14)
+    assert api.calls == []
+
+
+def test_fetch_failure_falls_back_to_local_history(api):
+    append_history(_days(TODAY - dt.timedelta(days=1), 20))
+    api.error = True
+
+    assert fgi_notifier.fetch_fgi(window=14) == _days(TODAY - dt.timedelta(days=1), 14)
+    assert api.calls == [1]
+
+
+def test_revised_values_are_appended_and_last_one_wins(isolated_state):
+    append_history([(TODAY, 40)])
+    assert append_history([(TODAY, 40)]) == []
+    assert append_history([(TODAY, 45)]) == [(TODAY, 45)]
+
+    with open(HISTORY_FILE, "a", encoding="utf-8") as f:
+        f.write("2024-03-1")  # 写入中断留下的残缺行
+    assert load_history() == [(TODAY, 45)]
@@ -0,0 +1,92 @@
+# 技术指标：一次遍历的增量结果与逐窗口直接计算一致
+
+import random
+import datetime as dt
+from statistics import median, pstdev
+
+import pytest
+
+from src.indicators import IndicatorSet, indicator_crossings
+
+
+def naive(kind, vals, window):
+    """逐窗口直接计算的参考实现（数据不足为None）"""
+    out = []
+    ema = None
+    for i in range(len(vals)):
+        size = window + 1 if kind == "roc" else window
+        if i + 1 < size:
+            out.append(None)
+            continue
+        w = vals[i + 1 - size : i + 1]
+        if kind == "sma":
+            out.append(sum(w) / window)
+        elif kind == "ema":
+            ema = sum(w) / window if ema is None else ema + 2 / (window + 1) * (vals[i] - ema)
+            out.append(ema)
+        elif kind == "wma":
+            out.append(sum((k + 1) * v for k, v in enumerate(w)) / (window * (window + 1) / 2))
+        elif kind == "median":
+            out.append(float(median(w)))
+        elif kind == "std":
+            out.append(pstdev(w))
+        elif kind == "zscore":
+            std = pstdev(w)
+            out.append((vals[i] - sum(w) / window) / std if std > 0 else 0.0)
+        elif kind == "roc":
+            out.append(None if w[0] == 0 else (vals[i] - w[0]) / w[0] * 100)
+        elif kind == "pctrank":
+            out.append(sum(v <= vals[i] for v in w) / window * 100)
+    return out
+
+
+KINDS = ["sma", "ema", "wma", "median", "std", "zscore", "roc", "pctrank"]
+
+
+def _values(seed, n=120):
+    rng = random.Random(seed)
+    start = dt.date(2024, 1, 1)
+    return [(start + dt.timedelta(days=i), rng.choice([0, rng.randint(0, 100)])) for i in range(n)]
+
+
+def test_one_pass_matches_naive_implementations():
+    specs = [
+        {"name": f"{kind}{window}", "type": kind, "window": window}
+        for kind in KINDS
+        for window in (1, 4, 7, 14)
+    ]
+    indicators = IndicatorSet(specs, ndigits=None)
+    for seed in range(5):
+        values = _values(seed)
+        vals = [v for _, v in values]
+        result = indicators.compute(values)
+        for spec in specs:
+            expected = naive(spec["type"], vals, spec["window"])
+            got = result[spec["name"]]
+            assert len(got) == len(vals)
+            for g, e in zip(got, expected):
+                assert (g is None) == (e is None), (spec, seed)
+                if e is not None:
+                    assert g == pytest.approx(e, abs=1e-9), (spec, seed)
+
+
+def test_rounding_summary_and_crossings():
+    values = [(dt.date(2024, 1, 1) + dt.timedelta(days=i), v) for i, v in enumerate([60, 62, 65, 67, 71])]
+    indicators = IndicatorSet([{"name": "sma3", "type": "sma", "window": 3}])
+
+    series = indicators.compute(values)
+    assert series["sma3"] == [None, None, 62.33, 64.67, 67.67]
+    assert indicators.lookback == 3
+    assert indicators.summary(values) == [
+        {"name": "sma3", "kind": "sma", "window": 3, "value": 67.67, "change": 3.0}
+    ]
+    assert indicator_crossings(series, "sma3", [65, 70]) == [65]
+    # 重复计算得到相同结果（指标状态每次重置）
+    assert indicators.compute(values) == series
+
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        IndicatorSet([{"name": "x", "type": "nope", "window": 3}])
+    with pytest.raises(ValueError):
+        IndicatorSet([{"name": "x", "type": "sma", "window": 3}, {"name": "x", "type": "ema", "window": 3}])
@@ -0,0 +1,63 @@
+# 监控主流程：数据在线程池中获取并补齐本地历史，判定在状态锁内进行
+
+import threading
+import datetime as dt
+
+from src import fgi_notifier, runtime
+from src.history import HISTORY_FILE, load_history
+from src.state import DATE_FMT, load_state, today_utc_date
+
+TIMEOUT = 30
+
+
+def _write_history(days):
+    """写入截至days天前的20天历史，制造days天的缺口"""
+    today = today_utc_date()
+    rows = [(today - dt.timedelta(days=days + n), 50 + n % 5) for n in range(20)]
+    with open(HISTORY_FILE, "w", encoding="utf-8") as f:
+        f.writelines(f"{d.strftime(DATE_FMT)},{v}\n" for d, v in sorted(rows))
+
+
+def _stub_request(monkeypatch):
+    """数据源桩：返回最近limit天，记录请求的天数"""
+    calls = []
+
+    def request_fgi(limit):
+        calls.append(limit)
+        today = today_utc_date()
+        return [(today - dt.timedelta(days=n), 60 + n) for n in range(limit - 1, -1, -1)]
+
+    monkeypatch.setattr(fgi_notifier, "request_fgi", request_fgi)
+    return calls
+
+
+def _run(fn, *args):
+    """在守护线程中执行，超时视为死锁"""
+    result = {}
+    worker = threading.Thread(target=lambda: result.update(rc=fn(*args)), daemon=True)
+    worker.start()
+    worker.join(TIMEOUT)
+    assert not worker.is_alive(), f"{fn.__name__} did not finish within {TIMEOUT}s (deadlock?)"
+    return result["rc"]
+
+
+def test_main_monitor_appends_history_gap(isolated_state, monkeypatch):
+    _write_history(3)
+    calls = _stub_request(monkeypatch)
+
+    assert _run(fgi_notifier.main, "monitor") == 0
+
+    assert calls == [3]
+    assert load_history()[-1] == (today_utc_date(), 60)
+    state = load_state()
+    assert state["bootstrapped"]
+    assert state["last_processed_date"] == today_utc_date().strftime(DATE_FMT)
+
+
+def test_daemon_monitor_appends_history_gap(isolated_state, monkeypatch):
+    _write_history(2)
+    _stub_request(monkeypatch)
+
+    assert _run(runtime._run_monitor_locked) == 0
+
+    assert load_history()[-1][0] == today_utc_date()
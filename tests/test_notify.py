@@ -0,0 +1,114 @@
+# Telegram投递层：本地桩服务器代替Telegram API
+
+import json
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src import outbox
+from src.governor import OutboundGovernor
+from src.notify import OutboundMessage, TelegramDelivery
+
+
+class StubTelegram:
+    """记录收到的sendMessage请求；rate_limited中的chat_id第一次请求返回429"""
+
+    def __init__(self):
+        self.requests = []
+        self.rate_limited = set()
+        self.slow = set()  # 这些chat_id的请求延迟返回
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                stub.requests.append(payload)
+                if payload["chat_id"] in stub.slow:
+                    time.sleep(0.3)
+                if payload["chat_id"] in stub.rate_limited:
+                    stub.rate_limited.discard(payload["chat_id"])
+                    body = {"ok": False, "parameters": {"retry_after": 0}}
+                    self._reply(429, body)
+                else:
+                    self._reply(200, {"ok": True, "result": {"chat": {"id": payload["chat_id"]}}})
+
+            def _reply(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def stub():
+    server = StubTelegram()
+    yield server
+    server.server.shutdown()
+
+
+def _delivery(stub, chat_ids=("1", "2")):
+    governor = OutboundGovernor(global_rate=1000, chat_interval=0, group_rate_per_minute=60000)
+    return TelegramDelivery("TOKEN", list(chat_ids), stub.url, governor=governor)
+
+
+def test_broadcast_sends_every_text_to_every_recipient(stub):
+    delivery = _delivery(stub)
+
+    results = delivery.broadcast_sync(["a", "b"])
+
+    assert [[r["ok"] for r in per_text] for per_text in results] == [[True, True], [True, True]]
+    assert sorted((p["chat_id"], p["text"]) for p in stub.requests) == [
+        ("1", "a"), ("1", "b"), ("2", "a"), ("2", "b")
+    ]
+
+
+def test_rate_limited_message_is_retried(stub):
+    stub.rate_limited.add("2")
+    delivery = _delivery(stub)
+
+    results = asyncio.run(delivery.send_many([OutboundMessage("2", "x")]))
+
+    assert results[0]["ok"]
+    assert [p["chat_id"] for p in stub.requests] == ["2", "2"]
+
+
+def test_concurrent_batches_share_one_session(stub):
+    stub.slow.add("slow")
+    delivery = _delivery(stub)
+
+    async def both():
+        return await asyncio.gather(
+            delivery.send_many([OutboundMessage("fast", "a")]),
+            delivery.send_many([OutboundMessage("slow", "b")]),
+        )
+
+    fast, slow = asyncio.run(both())
+
+    # 先结束的批量不能关闭另一批仍在使用的连接池
+    assert fast[0]["ok"] and slow[0]["ok"]
+    assert delivery._sessions == {}
+
+
+def test_sync_wrappers_refuse_running_loop(stub, tmp_path):
+    delivery = _delivery(stub)
+
+    async def inside_loop():
+        with pytest.raises(RuntimeError, match="broadcast"):
+            delivery.broadcast_sync(["a"])
+        with pytest.raises(RuntimeError, match="drain_async"):
+            outbox.drain(str(tmp_path / "outbox.json"))
+
+    asyncio.run(inside_loop())
+    assert stub.requests == []
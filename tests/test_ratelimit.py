@@ -0,0 +1,87 @@
+# 令牌桶限流：突发额度、按速率补充、内存有上限，多进程共享额度时不超额
+
+import os
+import multiprocessing
+
+import pytest
+
+from src.ratelimit import SQLiteTokenBucketLimiter, TokenBucketLimiter, make_limiter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def limiter(request, tmp_path):
+    """两种实现：每分钟6个令牌（10秒一个），容量3"""
+    clock = Clock()
+    if request.param == "memory":
+        limiter = TokenBucketLimiter(rate_per_minute=6, burst=3, clock=clock)
+    else:
+        limiter = SQLiteTokenBucketLimiter(str(tmp_path / "rl.sqlite"), rate_per_minute=6, burst=3, clock=clock)
+    yield limiter, clock
+    if request.param == "sqlite":
+        limiter.close()
+
+
+def test_burst_then_refill(limiter):
+    limiter, clock = limiter
+    assert [limiter.allow("u") for _ in range(4)] == [True, True, True, False]
+    assert limiter.allow("other")  # 按用户独立计数
+
+    clock.now += 9
+    assert not limiter.allow("u")
+    clock.now += 1
+    assert limiter.allow("u")
+    assert not limiter.allow("u")
+
+    # 长时间空闲后补满，但不超过容量
+    clock.now += 3600
+    assert [limiter.allow("u") for _ in range(4)] == [True, True, True, False]
+
+
+def test_memory_is_bounded():
+    clock = Clock()
+    limiter = TokenBucketLimiter(rate_per_minute=6, burst=3, max_users=100, clock=clock)
+    for i in range(1000):
+        limiter.allow(i)
+    assert len(limiter) == 100
+    # 最久未使用的用户被淘汰，再次出现时按新用户获得完整额度
+    assert [limiter.allow(0) for _ in range(4)] == [True, True, True, False]
+    assert len(limiter) == 100
+
+    clock.now += 30  # 超过空闲时间（容量3 / 每10秒1个），桶已补满，全部可丢弃
+    limiter.allow("new")
+    assert len(limiter) == 1
+
+
+def _hammer(path, n, results):
+    limiter = SQLiteTokenBucketLimiter(path, rate_per_minute=0.001, burst=20)
+    results.put(sum(limiter.allow("shared") for _ in range(n)))
+    limiter.close()
+
+
+def test_processes_share_the_sqlite_bucket(tmp_path):
+    path = str(tmp_path / "rl.sqlite")
+    SQLiteTokenBucketLimiter(path).close()  # 先建表
+    results = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=_hammer, args=(path, 15, results)) for _ in range(4)]
+    for p in procs:
+        p.start()
+    allowed = sum(results.get(timeout=30) for _ in procs)
+    for p in procs:
+        p.join(30)
+
+    assert allowed == 20
+
+
+def test_make_limiter_picks_the_backend(tmp_path):
+    assert isinstance(make_limiter(""), TokenBucketLimiter)
+    shared = make_limiter(os.path.join(tmp_path, "rl.sqlite"))
+    assert isinstance(shared, SQLiteTokenBucketLimiter)
+    shared.close()
@@ -0,0 +1,85 @@
+# 报告快照：每次数据更新只计算一次，其它进程在输入未变化时直接复用磁盘上的快照
+
+import datetime as dt
+
+import pytest
+
+from src import report_generator as rg
+from src.data_cache import FGIDataCache
+from src.state import load_state, mark_trigger, save_state, today_utc_date
+
+
+def _values(last=72, days=30):
+    today = today_utc_date()
+    return [(today - dt.timedelta(days=days - 1 - i), 60 + i % 7) for i in range(days - 1)] + [
+        (today, last)
+    ]
+
+
+@pytest.fixture
+def cache(isolated_state, monkeypatch):
+    cache = FGIDataCache(lambda: _values())
+    monkeypatch.setattr(rg, "fgi_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    """记录快照的实际生成次数"""
+    calls = []
+    build = rg.FGIReportGenerator._build_snapshot
+
+    def counting(self, key):
+        calls.append(key)
+        return build(self, key)
+
+    monkeypatch.setattr(rg.FGIReportGenerator, "_build_snapshot", counting)
+    return calls
+
+
+def test_reports_are_rendered_once_per_data_update(cache, builds):
+    gen = rg.FGIReportGenerator()
+    status = gen.generate_status_report()
+    gen.generate_detailed_report()
+    gen.generate_trend_report()
+    assert gen.generate_scheduled_report("morning")
+    assert gen.generate_scheduled_report("unknown") is None
+    assert len(builds) == 1
+
+    cache.put(_values(last=90))
+    assert gen.generate_status_report() != status
+    assert len(builds) == 2
+
+
+def test_cooldown_change_rebuilds_the_snapshot(cache, builds):
+    gen = rg.FGIReportGenerator()
+    gen.generate_status_report()
+
+    state = load_state()
+    mark_trigger(state, 70, today_utc_date())
+    save_state(state)
+    gen.refresh_data()
+    gen.generate_status_report()
+
+    assert len(builds) == 2
+
+
+def test_other_processes_reuse_the_snapshot_on_disk(cache, builds):
+    first = rg.FGIReportGenerator().generate_trend_report()
+    assert rg.load_snapshot().key == builds[0]
+
+    # 新实例（相当于另一个进程）输入相同，不再重新计算
+    assert rg.FGIReportGenerator().generate_trend_report() == first
+    assert len(builds) == 1
+
+
+def test_threshold_variants_share_the_snapshot(cache):
+    gen = rg.FGIReportGenerator()
+    gen.generate_status_report()
+    snap = gen.snapshot()
+
+    assert snap.variant(rg.THRESHOLDS) is snap
+    custom = snap.variant([60, 65])
+    assert custom is snap.variant((60, 65))
+    assert custom.metrics["latest_fgi"] == snap.metrics["latest_fgi"]
+    assert custom.get("status") != snap.get("status")
@@ -0,0 +1,167 @@
+# 规则引擎：由增量FGI7指标驱动的默认规则与原硬编码判定逻辑一致
+
+import datetime as dt
+import json
+import os
+import random
+
+from src.backtest import run_backtest
+from src.fgi_notifier import get_cooldown_status
+from src.rules import RuleSet, default_rules, rules_for
+from src.state import in_cooldown, today_utc_date
+from src.strategy import FGI7Tracker, compute_fgi7, crossings, two_consecutive_ge
+
+SPEC = {
+    "key": "cnn_fgi",
+    "label": "FGI",
+    "source": "cnn",
+    "thresholds": [70, 80, 90],
+    "sell_map": {70: 10, 80: 20, 90: 30},
+    "cooldown_days": 7,
+    "min_sell_level": 60,
+}
+EXAMPLE = os.path.join(os.path.dirname(__file__), os.pardir, "rules.example.yaml")
+
+
+def baseline(values, state, today):
+    """原 main() 中的判定逻辑"""
+    prev7, today7 = compute_fgi7(values)
+    fired = crossings(prev7, today7, [70, 80, 90])
+    if 90 not in fired and two_consecutive_ge(values, 90):
+        fired.append(90)
+    final = [t for t in fired if not in_cooldown(state, t, today)]
+    notes = ["FGI7<60（不卖，仅提示）"] if today7 < 60 else []
+    return fired, final, notes
+
+
+def history(seed, days=200):
+    rng = random.Random(seed)
+    start = dt.date(2024, 1, 1)
+    v, out = 75, []
+    for n in range(days):
+        v = min(100, max(0, v + rng.randint(-12, 12)))
+        out.append((start + dt.timedelta(days=n), v))
+    return out
+
+
+def test_default_rules_match_baseline_day_by_day():
+    rules = rules_for(SPEC, path=None)
+    assert rules.streak_conditions == [("gte", 90)]
+    checked = fired_days = 0
+    for seed in range(20):
+        rng = random.Random(seed)
+        values = history(seed)
+        data = None
+        for end in range(9, len(values) + 1):
+            if rng.random() < 0.05:
+                continue  # 跳过某些天（有缺口时重建）
+            fetched = values[max(0, end - 30) : end]
+            today = fetched[-1][0]
+            state = {
+                "last_trigger_at": {
+                    str(t): str(today - dt.timedelta(days=rng.randint(0, 10)))
+                    for t in (70, 80, 90)
+                    if rng.random() < 0.3
+                }
+            }
+
+            tracker = FGI7Tracker(rules.streak_conditions, data=data)
+            signal = tracker.advance(fetched)
+            # 状态经过JSON往返（与state.json/事件日志相同）
+            data = json.loads(json.dumps(tracker.to_dict()))
+            result = rules.evaluate(*rules.frame(fetched, signal), state=state, today=today)
+
+            assert (signal.prev7, signal.today7) == compute_fgi7(fetched)
+            assert tuple(result) == baseline(fetched, state, today), (seed, today)
+            # 整列判定的最后一天与两天短列一致
+            assert result == rules.evaluate(rules.columns(fetched), state=state, today=today)
+            checked += 1
+            fired_days += bool(result.fired)
+    assert checked > 3000 and fired_days > 100
+
+
+def test_incremental_runs_need_only_the_new_day():
+    rules = rules_for(SPEC, path=None)
+    start = dt.date(2024, 1, 1)
+    values = [(start + dt.timedelta(days=n), 95) for n in range(11)] + [(start + dt.timedelta(days=11), 40)]
+    tracker = FGI7Tracker(rules.streak_conditions)
+    tracker.advance(values[:8])
+    data = tracker.to_dict()
+    for end in range(9, 12):
+        # 之后每次只拿到当天的值
+        tracker = FGI7Tracker(rules.streak_conditions, data=data)
+        signal = tracker.advance(values[end - 1 : end])
+        data = json.loads(json.dumps(tracker.to_dict()))
+    assert signal == (95.0, 95.0, {"gte90": 5})
+    assert data == {"date": "2024-01-11", "values": [95] * 8, "total": 95 * 7, "streaks": {"gte90": 5}}
+
+    signal = FGI7Tracker(rules.streak_conditions, data=data).advance(values[-1:])
+    assert signal == compute_fgi7(values) + ({"gte90": 0},)
+
+
+def test_example_rules_compile_like_defaults():
+    example = rules_for(SPEC, path=EXAMPLE)
+    default = RuleSet(default_rules(SPEC), SPEC["sell_map"])
+    assert [r.name for r in example.rules] == [r.name for r in default.rules]
+    assert example.streak_conditions == default.streak_conditions
+
+
+def test_other_indicators_are_read_from_the_fetched_data():
+    rules = RuleSet(
+        [
+            {"name": "fgi_hot", "level": 80, "streak": {"indicator": "fgi", "gte": 80, "days": 3}},
+            {"name": "ema_cross", "level": 90, "crossing": {"indicator": "ema7", "above": 50}},
+        ],
+        SPEC["sell_map"],
+    )
+    assert rules.streak_conditions == []
+    start = dt.date(2024, 1, 1)
+    values = [(start + dt.timedelta(days=n), v) for n, v in enumerate([10] * 10 + [80, 85, 90])]
+    signal = FGI7Tracker(rules.streak_conditions).advance(values)
+
+    assert rules.evaluate(*rules.frame(values, signal)).fired == [80, 90]
+    assert rules.evaluate(rules.columns(values)).fired == [80, 90]
+    assert rules.evaluate(rules.columns(values[:-1])).fired == []
+
+
+def test_backtest_replays_the_rules_file(isolated_state):
+    with open("rules.yaml", "w", encoding="utf-8") as f:
+        f.write(
+            "rules:\n"
+            "  - name: hot_fgi\n"
+            "    level: 80\n"
+            "    streak: {indicator: fgi, gte: 80, days: 3}\n"
+            "    cooldown: 5\n"
+        )
+    start = dt.date(2024, 1, 1)
+    values = [(start + dt.timedelta(days=n), 50 if n < 10 else 85) for n in range(20)]
+
+    result = run_backtest(values, spec=SPEC)
+
+    assert [(e["date"].day, e["rule"], e["action"]) for e in result["events"]] == [
+        (13, "hot_fgi", "trigger"),
+        (14, "hot_fgi", "suppressed"),
+        (15, "hot_fgi", "suppressed"),
+        (16, "hot_fgi", "suppressed"),
+        (17, "hot_fgi", "suppressed"),
+        (18, "hot_fgi", "trigger"),
+        (19, "hot_fgi", "suppressed"),
+        (20, "hot_fgi", "suppressed"),
+    ]
+    assert result["summary"]["by_level"] == {80: 2}
+
+
+def test_cooldown_status_follows_the_rules(isolated_state):
+    today = today_utc_date()
+    state = {"last_trigger_at": {"80": str(today - dt.timedelta(days=2))}}
+    assert get_cooldown_status(state, SPEC) == {"70": 0, "80": 5, "90": 0}
+
+    with open("rules.yaml", "w", encoding="utf-8") as f:
+        f.write(
+            "rules:\n"
+            "  - name: hot_fgi\n"
+            "    level: 80\n"
+            "    streak: {indicator: fgi, gte: 80, days: 3}\n"
+            "    cooldown: 3\n"
+        )
+    assert get_cooldown_status(state, SPEC) == {"80": 1}
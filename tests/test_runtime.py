@@ -0,0 +1,62 @@
+# 常驻运行时：监控检测在线程池中按间隔执行，收到停止信号后退出
+
+import asyncio
+import threading
+from datetime import datetime
+
+from src import outbox, runtime
+from src.config import REPORT_MINUTE_UTC
+from src.runtime import FGIRuntime, next_report
+
+
+async def _no_outbox(*args, **kwargs):
+    return {"sent": 0, "failed": 0, "pending": 0}
+
+
+def _run_for(rt, seconds):
+    """运行运行时，seconds秒后请求停止，返回退出码"""
+
+    async def main():
+        asyncio.get_running_loop().call_later(seconds, rt.stop)
+        return await rt.run()
+
+    return asyncio.run(main())
+
+
+def test_next_report_picks_the_nearest_hour():
+    now = datetime(2024, 3, 10, 12, REPORT_MINUTE_UTC, 0)
+    assert next_report(now, [6, 12, 20]) == datetime(2024, 3, 10, 20, REPORT_MINUTE_UTC)
+    assert next_report(now, [6]) == datetime(2024, 3, 11, 6, REPORT_MINUTE_UTC)
+    assert next_report(now, []) is None
+
+
+def test_monitor_ticks_run_off_the_event_loop_until_stopped(monkeypatch):
+    ticks = []
+    monkeypatch.setattr(runtime, "_run_monitor_locked", lambda: ticks.append(threading.get_ident()))
+    monkeypatch.setattr(outbox, "drain_async", _no_outbox)
+    rt = FGIRuntime(monitor_interval=0.05, enable_reports=False, enable_bot=False)
+
+    assert _run_for(rt, 0.3) == 0
+
+    assert len(ticks) >= 3
+    assert threading.get_ident() not in ticks
+
+
+def test_failed_tick_does_not_stop_the_loop(monkeypatch):
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(runtime, "_run_monitor_locked", broken)
+    monkeypatch.setattr(outbox, "drain_async", _no_outbox)
+    rt = FGIRuntime(monitor_interval=0.05, enable_reports=False, enable_bot=False)
+
+    assert _run_for(rt, 0.2) == 0
+    assert len(calls) >= 2
+
+
+def test_nothing_to_run_exits_with_error():
+    rt = FGIRuntime(enable_monitor=False, enable_reports=False, enable_bot=False)
+    assert _run_for(rt, 1) == 1
@@ -0,0 +1,28 @@
+# 定时汇报：按cron的小时只发给该小时订阅了汇报的订阅者
+
+from src import subscribers
+from src.fgi_notifier import run_scheduled_mode
+from src.scheduled_reports import scheduled_reports_handler
+from src.subscribers import Subscriber
+
+
+def test_cron_run_sends_only_reports_due_at_that_hour(isolated_state, monkeypatch):
+    subscribers.subscriber_registry.save(
+        [
+            Subscriber("early", reports=(("morning", 0), ("evening", 12))),
+            Subscriber("late", reports=(("morning", 3),)),
+            Subscriber("noon", reports=(("noon", 0),)),
+        ]
+    )
+    monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "TOKEN")
+    monkeypatch.setenv("RUN_SCHEDULE", "30 0 * * *")
+    sent = {}
+
+    async def send(report_type, subs=None):
+        sent[report_type] = [s.chat_id for s in subs]
+        return True
+
+    monkeypatch.setattr(scheduled_reports_handler, "send_scheduled_report", send)
+
+    assert run_scheduled_mode() == 0
+    assert sent == {"morning": ["early"], "noon": ["noon"]}
@@ -0,0 +1,129 @@
+# 多数据源：落后的本地文件不能抢先于网络数据源；quorum按日取中位数
+
+import json
+import threading
+import time
+import datetime as dt
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.fetcher import FetchError
+from src.sources import AlternativeMeSource, FGISource, FileSource, build_sources, fetch_from_sources
+
+TODAY = dt.date(2024, 3, 10)
+
+
+def _payload(days):
+    epoch = dt.datetime(1970, 1, 1)
+    return {
+        "data": [
+            {"value": "60", "timestamp": str(int((dt.datetime(d.year, d.month, d.day) - epoch).total_seconds()))}
+            for d in days
+        ]
+    }
+
+
+class SlowAPI:
+    """延迟响应的alternative.me格式接口；status非200时返回错误"""
+
+    def __init__(self, delay=0.3, status=200):
+        self.delay = delay
+        self.status = status
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                time.sleep(api.delay)
+                days = [TODAY - dt.timedelta(days=n) for n in range(3)]
+                body = json.dumps(_payload(days)).encode() if api.status == 200 else b""
+                self.send_response(api.status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/fng/"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def stale_file(isolated_state):
+    with open("local.csv", "w", encoding="utf-8") as f:
+        for n in range(5, 8):
+            f.write(f"{TODAY - dt.timedelta(days=n)},40\n")
+    return FileSource("local", "local.csv")
+
+
+def test_slow_network_source_beats_stale_file(stale_file):
+    api = SlowAPI(delay=0.3)
+    try:
+        values = fetch_from_sources(
+            3, [stale_file, AlternativeMeSource("api", api.url)], strategy="first"
+        )
+    finally:
+        api.server.shutdown()
+    assert values[-1] == (TODAY, 60)
+
+
+def test_file_is_the_fallback_when_network_fails(stale_file):
+    api = SlowAPI(delay=0, status=404)
+    try:
+        values = fetch_from_sources(
+            3, [AlternativeMeSource("api", api.url), stale_file], strategy="first"
+        )
+    finally:
+        api.server.shutdown()
+    assert values[-1] == (TODAY - dt.timedelta(days=5), 40)
+
+
+class StaticSource(FGISource):
+    """内存数据源：values为{日期偏移: 值}，error非空时抛出"""
+
+    def __init__(self, name, values=None, error=None):
+        super().__init__(name)
+        self.values = values or {}
+        self.error = error
+
+    def fetch(self, limit):
+        if self.error:
+            raise FetchError(self.error)
+        return sorted((TODAY - dt.timedelta(days=n), v) for n, v in self.values.items())
+
+
+def test_quorum_takes_the_daily_median_of_agreeing_sources():
+    sources = [
+        StaticSource("a", {0: 60, 1: 55, 2: 50}),
+        StaticSource("b", {0: 61, 1: 55}),
+        StaticSource("c", {0: 99, 1: 56, 3: 10}),  # 今日数据出错、多出一天
+    ]
+    values = fetch_from_sources(3, sources, strategy="quorum", quorum=3)
+    assert values == [(TODAY - dt.timedelta(days=1), 55), (TODAY, 61)]
+
+
+def test_quorum_fails_when_too_few_sources_are_valid():
+    sources = [
+        StaticSource("a", {0: 60}),
+        StaticSource("b", {0: 150}),  # 超出0~100，视为无效
+        StaticSource("c", error="timeout"),
+    ]
+    with pytest.raises(FetchError) as e:
+        fetch_from_sources(1, sources, strategy="quorum", quorum=2)
+    assert "b: 无效数据" in str(e.value) and "c: timeout" in str(e.value)
+    # "first"策略下一个有效数据源即可
+    assert fetch_from_sources(1, sources, strategy="first") == [(TODAY, 60)]
+
+
+def test_build_sources_skips_disabled_entries():
+    sources = build_sources(
+        [
+            {"name": "api", "type": "alternative.me", "url": "http://example/fng/"},
+            {"name": "off", "type": "file", "path": "x.csv", "enabled": False},
+        ]
+    )
+    assert [s.name for s in sources] == ["api"]
+    with pytest.raises(ValueError):
+        build_sources([{"name": "x", "type": "ftp"}])
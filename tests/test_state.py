@@ -0,0 +1,175 @@
+# 状态事件日志：快照 + 日志重放与直接保存的状态一致
+
+import os
+import sys
+import json
+import subprocess
+import datetime as dt
+
+import pytest
+
+from src import state as state_module
+from src.state import (
+    LOCK_FILE,
+    StateStore,
+    atomic_write_text,
+    in_cooldown,
+    mark_trigger,
+    mark_processed,
+    set_bootstrapped,
+    series_state,
+    state_lock,
+)
+
+
+def _mutate(store, days):
+    """模拟若干次运行：每次处理一天，偶尔触发，并记录审计事件"""
+    state = store.load()
+    for n in range(days):
+        day = dt.date(2024, 1, 1) + dt.timedelta(days=n)
+        for key in ("crypto_fgi", "cnn_fgi"):
+            sub = series_state(state, key)
+            if n == 0:
+                set_bootstrapped(sub)
+            if n % 4 == 1:
+                mark_trigger(sub, 70 + 10 * (n % 3), day)
+            mark_processed(sub, day)
+        state.setdefault("series", {})["cnn_fgi"]["extra"] = {"n": n}
+        if n % 5 == 0:
+            store.record("crypto_fgi", "suppressed", date=str(day), levels=[90])
+        store.save(state)
+    return state
+
+
+def _journal(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_snapshot_plus_replay_matches_saved_state(isolated_state):
+    path = os.path.join("state", "state.json")
+    writer = StateStore(path, snapshot_every=3)
+    expected = _mutate(writer, 12)
+
+    assert StateStore(path).load() == expected
+
+    # 只保留日志时从默认状态完整重放
+    os.remove(path)
+    assert StateStore(path).load() == expected
+
+
+def test_journal_sequence_and_audit_events(isolated_state):
+    path = os.path.join("state", "state.json")
+    store = StateStore(path, snapshot_every=1000)
+    _mutate(store, 6)
+
+    events = _journal(store.journal_path)
+    assert [e["seq"] for e in events] == list(range(1, len(events) + 1))
+    assert sum(e["type"] == "suppressed" for e in events) == 2
+
+
+def test_unchanged_state_is_not_written(isolated_state):
+    store = StateStore(os.path.join("state", "state.json"))
+    _mutate(store, 2)
+    size = os.path.getsize(store.journal_path)
+
+    assert store.save(store.load()) is False
+    assert os.path.getsize(store.journal_path) == size
+
+
+def test_save_before_load(isolated_state):
+    store = StateStore(os.path.join("state", "state.json"))
+    state = {"last_processed_date": "2024-01-01", "last_trigger_at": {}, "bootstrapped": True}
+
+    assert store.save(state)
+    assert StateStore(store.path).load()["last_processed_date"] == "2024-01-01"
+
+
+def test_truncated_tail_is_skipped(isolated_state):
+    path = os.path.join("state", "state.json")
+    store = StateStore(path, snapshot_every=1000)
+    expected = _mutate(store, 3)
+    with open(store.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"seq": 999, "series": "crypto_fgi", "type": "proc')  # 写入中断
+
+    assert StateStore(path).load() == expected
+
+    # 之后的追加另起一行，不与残缺行连在一起
+    store2 = StateStore(path)
+    state = store2.load()
+    mark_processed(state, dt.date(2024, 2, 1))
+    store2.save(state)
+    assert StateStore(path).load()["last_processed_date"] == "2024-02-01"
+
+
+def test_two_writers_continue_the_sequence(isolated_state):
+    path = os.path.join("state", "state.json")
+    a, b = StateStore(path, snapshot_every=2), StateStore(path, snapshot_every=2)
+    state_a, state_b = a.load(), b.load()
+
+    mark_trigger(state_b, 80, dt.date(2024, 1, 2))
+    b.save(state_b)
+    mark_processed(state_a, dt.date(2024, 1, 1))
+    a.save(state_a)  # 续接b的事件并写快照
+
+    seqs = [e["seq"] for e in _journal(a.journal_path)]
+    assert seqs == sorted(set(seqs))
+    for state in (state_a, a.load(), StateStore(path).load()):
+        assert state["last_trigger_at"]["80"] == "2024-01-02"
+        assert state["last_processed_date"] == "2024-01-01"
+
+    # 不经快照、只从日志重放也包含双方的变化
+    os.remove(path)
+    fresh = StateStore(path).load()
+    assert fresh["last_trigger_at"]["80"] == "2024-01-02"
+    assert fresh["last_processed_date"] == "2024-01-01"
+
+
+def test_failed_atomic_write_keeps_the_old_file(isolated_state, monkeypatch):
+    path = os.path.join("state", "demo.json")
+    atomic_write_text(path, "old")
+    os.chmod(path, 0o640)
+
+    def broken_replace(src, dst):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as m:
+        m.setattr(state_module.os, "replace", broken_replace)
+        with pytest.raises(OSError):
+            atomic_write_text(path, "new")
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == "old"
+    assert os.listdir("state") == ["demo.json"]  # 临时文件已清理
+
+    atomic_write_text(path, "new")
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == "new"
+    assert os.stat(path).st_mode & 0o777 == 0o640
+
+
+def test_state_lock_is_reentrant_and_excludes_other_processes(isolated_state):
+    probe = (
+        "import fcntl, sys\n"
+        "f = open(sys.argv[1], 'a')\n"
+        "try:\n"
+        "    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)\n"
+        "except OSError:\n"
+        "    sys.exit(1)\n"
+    )
+
+    def other_process_can_lock():
+        return subprocess.run([sys.executable, "-c", probe, LOCK_FILE]).returncode == 0
+
+    with state_lock():
+        with state_lock():
+            assert not other_process_can_lock()
+        assert not other_process_can_lock()
+    assert other_process_can_lock()
+
+
+def test_in_cooldown_counts_calendar_days():
+    state = {"last_trigger_at": {"80": "2024-01-01"}}
+    assert in_cooldown(state, 80, dt.date(2024, 1, 7))
+    assert not in_cooldown(state, 80, dt.date(2024, 1, 8))
+    assert not in_cooldown(state, 80, dt.date(2024, 1, 3), cooldown_days=2)
+    assert not in_cooldown(state, 70, dt.date(2024, 1, 2))
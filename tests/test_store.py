@@ -0,0 +1,46 @@
+# SQLite存储：多个进程（连接）交错保存时互不覆盖
+
+import os
+import datetime as dt
+
+from src.state import mark_trigger, mark_processed, series_state
+from src.store import FGIStore
+
+
+def test_concurrent_writers_do_not_overwrite_each_other(isolated_state):
+    path = os.path.join("state", "fgi.sqlite")
+    a, b = FGIStore(path), FGIStore(path)
+    state_a, state_b = a.load(), b.load()
+
+    mark_trigger(state_b, 80, dt.date(2024, 1, 2))
+    mark_trigger(series_state(state_b, "cnn_fgi"), 70, dt.date(2024, 1, 2))
+    mark_processed(series_state(state_b, "cnn_fgi"), dt.date(2024, 1, 2))
+    b.save(state_b)
+
+    # a在b提交之前加载，其修改只叠加在最新状态上
+    mark_trigger(state_a, 70, dt.date(2024, 1, 3))
+    mark_processed(state_a, dt.date(2024, 1, 3))
+    a.save(state_a)
+
+    # 保存后本进程看到的也是合并结果（冷却判定不会漏掉b的触发）
+    assert a.load() == FGIStore(path).load()
+    merged = a.load()
+    assert merged["last_trigger_at"]["80"] == "2024-01-02"
+    assert merged["last_trigger_at"]["70"] == "2024-01-03"
+    assert merged["last_processed_date"] == "2024-01-03"
+    assert merged["series"]["cnn_fgi"]["last_trigger_at"] == {"70": "2024-01-02"}
+    assert merged["series"]["cnn_fgi"]["last_processed_date"] == "2024-01-02"
+    assert sorted((t["level"], t["date"]) for t in a.triggers()) == [(70, "2024-01-03"), (80, "2024-01-02")]
+
+
+def test_state_round_trip(isolated_state):
+    path = os.path.join("state", "fgi.sqlite")
+    store = FGIStore(path)
+    state = store.load()
+    mark_processed(state, dt.date(2024, 1, 5))
+    state["fgi7"] = {"date": "2024-01-05", "total": 350}
+    store.record("crypto_fgi", "suppressed", date="2024-01-05", levels=[90])
+    assert store.save(state)
+
+    assert FGIStore(path).load() == state
+    assert [t["suppressed"] for t in store.triggers(level=90, suppressed=True)] == [True]
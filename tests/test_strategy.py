@@ -0,0 +1,42 @@
+# 滑动平均引擎：前缀和结果与逐窗口mean()完全一致
+
+import random
+import datetime as dt
+from statistics import mean
+
+from src.strategy import compute_fgi7, fgi7_series, rolling_mean, two_consecutive_ge
+
+
+def naive_rolling(vals, window, ndigits=2):
+    out = [mean(vals[i : i + window]) for i in range(len(vals) - window + 1)]
+    return out if ndigits is None else [round(v, ndigits) for v in out]
+
+
+def test_rolling_mean_matches_per_window_mean():
+    rng = random.Random(0)
+    for n in range(0, 40):
+        vals = [rng.randint(0, 100) for _ in range(n)]
+        for window in (1, 3, 7, 14):
+            assert rolling_mean(vals, window) == naive_rolling(vals, window), (n, window)
+            assert rolling_mean(vals, window, ndigits=None) == naive_rolling(vals, window, None)
+
+
+def test_rolling_mean_edge_cases():
+    assert rolling_mean([], 7) == []
+    assert rolling_mean([1, 2, 3], 7) == []
+    assert rolling_mean([1, 2, 3], 0) == []
+    assert rolling_mean([1, 2, 4], 3, ndigits=2) == [2.33]
+
+
+def test_fgi7_helpers_read_the_series_tail():
+    start = dt.date(2024, 1, 1)
+    vals = [80, 85, 88, 90, 92, 95, 96, 97, 91]
+    values = [(start + dt.timedelta(days=i), v) for i, v in enumerate(vals)]
+
+    series = fgi7_series(values)
+    assert list(series) == naive_rolling(vals, 7)
+    assert compute_fgi7(values) == (series[-2], series[-1])
+    assert compute_fgi7(values[:7]) == (None, None)
+    assert two_consecutive_ge(values, 90) == (series[-1] >= 90 and series[-2] >= 90)
+    assert two_consecutive_ge(values, 85) is True
+    assert two_consecutive_ge(values[:8], 0) is False
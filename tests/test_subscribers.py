@@ -0,0 +1,69 @@
+# 订阅者：卖出提醒按关注的阈值分组渲染
+
+import datetime as dt
+
+from src import outbox, subscribers
+from src.fgi_notifier import process_series
+from src.notify import telegram_delivery
+from src.subscribers import Subscriber, alert_groups
+
+SPEC = {
+    "key": "crypto_fgi",
+    "label": "FGI",
+    "source": "alternative.me",
+    "thresholds": [70, 72, 74],
+    "sell_map": {70: 10, 72: 15, 74: 25},
+    "cooldown_days": 7,
+    "min_sell_level": 60,
+}
+
+
+def test_alert_groups_by_followed_levels():
+    subs = [
+        Subscriber("all", thresholds=(70, 80, 90)),
+        Subscriber("top", thresholds=(90,)),
+        Subscriber("low", thresholds=(70,)),
+        Subscriber("muted", thresholds=(80, 90), alerts=False),
+    ]
+
+    assert alert_groups(subs, [80, 90]) == {(80, 90): ["all"], (90,): ["top"]}
+
+
+def test_alert_lists_only_the_subscribers_levels(isolated_state, monkeypatch):
+    monkeypatch.setattr(telegram_delivery, "token", "TOKEN")
+    subscribers.subscriber_registry.save(
+        [Subscriber("all", thresholds=(70, 72, 74)), Subscriber("top", thresholds=(74,))]
+    )
+    today = dt.date(2024, 1, 8)
+    values = [(today - dt.timedelta(days=n), 70) for n in range(7, 0, -1)] + [(today, 100)]
+    state = {"bootstrapped": True, "last_processed_date": "2024-01-07", "last_trigger_at": {}}
+
+    process_series(SPEC, values, state)
+
+    texts = {m["chat_id"]: m["text"] for m in outbox.load_outbox().values()}
+    assert all(f"上穿{t}" in texts["all"] for t in (70, 72, 74))
+    assert "上穿74" in texts["top"]
+    assert "上穿70" not in texts["top"] and "上穿72" not in texts["top"]
+    assert set(state["last_trigger_at"]) == {"70", "72", "74"}
+
+
+def test_daily_report_follows_each_subscribers_thresholds(isolated_state, monkeypatch):
+    monkeypatch.setattr(telegram_delivery, "token", "TOKEN")
+    subscribers.subscriber_registry.save(
+        [Subscriber("all", thresholds=(70, 80, 90)), Subscriber("top", thresholds=(90,))]
+    )
+    spec = dict(SPEC, thresholds=[70, 80, 90], sell_map={70: 10, 80: 20, 90: 30})
+    today = dt.date(2024, 1, 9)
+    values = [(today - dt.timedelta(days=n), 65) for n in range(8, -1, -1)]
+    state = {"bootstrapped": True, "last_processed_date": "2024-01-08", "last_trigger_at": {}}
+
+    process_series(spec, values, state)
+
+    texts = {m["chat_id"]: m["text"] for m in outbox.load_outbox().values()}
+    # FGI7=65 只接近70：关注70的订阅者收到汇报，汇报列出其全部阈值
+    assert all(str(t) in texts["all"] for t in (70, 80, 90))
+    # 只关注90的订阅者不因70而收到汇报；周日的例行汇报也只列出90
+    if dt.datetime.now().weekday() == 6:
+        assert "70" not in texts["top"] and "80" not in texts["top"]
+    else:
+        assert "top" not in texts
@@ -0,0 +1,66 @@
+# 参数扫描：多进程结果与逐个组合直接回测一致
+
+import random
+import datetime as dt
+
+from src.backtest import run_backtest
+from src.rules import rules_for
+from src.sweep import build_grid, rank_results, run_sweep
+
+SPEC = {
+    "key": "cnn_fgi",
+    "label": "FGI",
+    "source": "cnn",
+    "thresholds": [70, 80, 90],
+    "sell_map": {70: 10, 80: 20, 90: 30},
+    "cooldown_days": 7,
+    "min_sell_level": 60,
+}
+
+
+def history(seed=1, days=300):
+    rng = random.Random(seed)
+    start = dt.date(2021, 1, 1)
+    v, out = 60, []
+    for n in range(days):
+        v = min(100, max(0, v + rng.randint(-10, 10)))
+        out.append((start + dt.timedelta(days=n), v))
+    return out
+
+
+def test_build_grid_pairs_thresholds_with_sell_plans():
+    grid = build_grid(range(60, 80, 5), 2, [(10, 20, 30)], [5], [7])
+    assert len(grid) == 6
+    assert grid[0] == ((60, 65), (10, 20), 5, 7)
+    assert all(len(t) == len(p) == 2 for t, p, _, _ in grid)
+
+
+def test_sweep_matches_direct_backtests():
+    values = history()
+    grid = build_grid(range(65, 100, 10), 3, [(10, 15, 25), (20, 30, 50)], [3, 7], [5, 7])
+
+    rows = run_sweep(values, grid, workers=2, spec=SPEC)
+
+    assert len(rows) == len(grid)
+    for row, (thresholds, plan, cooldown, window) in zip(rows, grid):
+        spec = dict(
+            SPEC, thresholds=list(thresholds), sell_map=dict(zip(thresholds, plan)), cooldown_days=cooldown
+        )
+        summary = run_backtest(values, spec=spec, rules=rules_for(spec, path=None), window=window)["summary"]
+        assert (row["thresholds"], row["sell_plan"], row["cooldown"], row["window"]) == (
+            thresholds, plan, cooldown, window
+        )
+        assert (row["triggers"], row["suppressed"], row["total_sell_pct"], row["avg_sell_fgi"]) == (
+            summary["triggers"], summary["suppressed"], summary["total_sell_pct"], summary["avg_sell_fgi"]
+        )
+    assert any(row["triggers"] for row in rows)
+
+
+def test_rank_results_filters_and_sorts():
+    rows = [
+        {"triggers": 0, "suppressed": 0, "total_sell_pct": 0, "avg_sell_fgi": None},
+        {"triggers": 2, "suppressed": 3, "total_sell_pct": 40, "avg_sell_fgi": 82.5},
+        {"triggers": 4, "suppressed": 1, "total_sell_pct": 60, "avg_sell_fgi": 78.0},
+    ]
+    assert [r["avg_sell_fgi"] for r in rank_results(rows)] == [82.5, 78.0]
+    assert [r["suppressed"] for r in rank_results(rows, sort="suppressed", min_triggers=0)] == [0, 1, 3]
@@ -0,0 +1,148 @@
+# 汇报模板：编译后的模板与原先逐行拼接的f-string输出逐字节一致
+
+import random
+
+import pytest
+
+from src.report_generator import threshold_metrics
+from src.templates import TemplateError, compile_template, render
+
+MOODS = {
+    "extreme_greed": "🔥 极度贪婪",
+    "greed": "📈 贪婪",
+    "neutral": "⚖️ 中性",
+    "fear": "📉 恐惧",
+    "extreme_fear": "🥶 极度恐惧",
+}
+
+
+def _trend(change):
+    if change > 0:
+        return f"📈 上升 (+{change:.2f})"
+    elif change < 0:
+        return f"📉 下降 ({change:.2f})"
+    return "➡️ 持平"
+
+
+def legacy_daily(today, latest_val, prev7, today7, thresholds, suppressed, cooling):
+    """原 generate_daily_report 的拼接逻辑"""
+    lines = []
+    lines.append("📊 FGI监控系统状态汇报")
+    lines.append(f"日期: {today} (UTC)")
+    lines.append(f"今日FGI: {latest_val}")
+    lines.append(f"FGI7: {today7:.2f} (昨日: {prev7:.2f})")
+    lines.append(f"趋势: {_trend(today7 - prev7)}")
+
+    threshold_status = []
+    for threshold in thresholds:
+        distance = threshold - today7
+        if distance <= 0:
+            threshold_status.append(f"{threshold}✅")
+        elif distance <= 5:
+            threshold_status.append(f"{threshold}⚠️({distance:.1f})")
+        else:
+            threshold_status.append(f"{threshold}😴({distance:.1f})")
+    lines.append(f"阈值状态: {' '.join(threshold_status)}")
+
+    if suppressed:
+        lines.append("🔒 有信号触发但处于冷却期")
+
+    cooling_down = [f"{t}({remaining}天)" for t, remaining in cooling]
+    if cooling_down:
+        lines.append(f"冷却状态: 冷却中: {', '.join(cooling_down)}")
+    else:
+        lines.append("冷却状态: 全部可触发")
+
+    lines.append("🤖 系统运行正常")
+    return "\n".join(lines)
+
+
+def legacy_status(m):
+    """原 FGIReportGenerator._render_status 的拼接逻辑"""
+    lines = []
+    lines.append("📊 FGI状态概览")
+    lines.append(f"📅 日期: {m['latest_date']}")
+    lines.append(f"📈 当前FGI: {m['latest_fgi']}")
+    lines.append(f"📊 FGI7: {m['today7']:.2f}")
+    lines.append(f"📈 趋势: {_trend(m['change'])}")
+    lines.append(f"💭 市场情绪: {MOODS[m['mood']]}")
+    nxt = m["next_threshold"]
+    if nxt:
+        lines.append(
+            f"🎯 下个阈值: 距离{nxt['level']}阈值还有{nxt['distance']:.1f}点 (卖出{nxt['sell_pct']}%)"
+        )
+    return "\n".join(lines)
+
+
+def _fgi7(rng):
+    return round(rng.uniform(20, 100), 2)
+
+
+def test_daily_template_matches_the_old_f_strings():
+    rng = random.Random(0)
+    for _ in range(500):
+        prev7 = _fgi7(rng)
+        today7 = prev7 if rng.random() < 0.1 else _fgi7(rng)  # 覆盖持平
+        thresholds = sorted(rng.sample([60, 65, 70, 75, 80, 85, 90, 95], rng.randint(1, 4)))
+        cooling = [(str(t), rng.randint(1, 6)) for t in thresholds if rng.random() < 0.3]
+        suppressed = rng.random() < 0.3
+        context = {
+            "today": "2024-03-10",
+            "latest_val": rng.randint(0, 100),
+            "prev7": prev7,
+            "today7": today7,
+            "change": today7 - prev7,
+            "thresholds": [{"level": t, "distance": t - today7} for t in thresholds],
+            "suppressed": suppressed,
+            "cooling": cooling,
+        }
+        expected = legacy_daily(
+            "2024-03-10", context["latest_val"], prev7, today7, thresholds, suppressed, cooling
+        )
+        assert render("daily", context, "zh") == expected
+
+
+def test_status_template_matches_the_old_f_strings():
+    rng = random.Random(1)
+    for _ in range(300):
+        prev7, today7 = _fgi7(rng), _fgi7(rng)
+        m = {
+            "latest_date": "2024-03-10",
+            "latest_fgi": rng.randint(0, 100),
+            "prev7": prev7,
+            "today7": today7,
+            "change": today7 - prev7,
+            "mood": rng.choice(sorted(MOODS)),
+            "cooldowns": {"70": None, "80": rng.choice([None, 3, 7]), "90": None},
+        }
+        m.update(threshold_metrics(m, [70, 80, 90]))
+        assert render("status", m, "zh") == legacy_status(m)
+
+
+def test_template_directives_and_partials():
+    template = compile_template(
+        "demo",
+        "%for x in items\n%if x > 1\n{x:03d}\n%else\n{label(', ')}\n%end\n%end\n%include label",
+        partials={"label": "a\nb"},
+    )
+    assert template({"items": [1, 2]}) == "a, b\n002\na\nb"
+
+    with pytest.raises(TemplateError):
+        compile_template("bad", "{1 +}")
+
+
+def test_unknown_locale_falls_back_to_the_default():
+    context = {
+        "today": "2024-03-10",
+        "latest_val": 50,
+        "prev7": 50.0,
+        "today7": 50.0,
+        "change": 0.0,
+        "thresholds": [],
+        "suppressed": False,
+        "cooling": [],
+    }
+    assert render("daily", context, "xx") == render("daily", context, "zh")
+    assert render("daily", context, "en") != render("daily", context, "zh")
+    with pytest.raises(TemplateError):
+        render("daily", {}, "zh")
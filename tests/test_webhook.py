@@ -0,0 +1,100 @@
+# Webhook服务：密钥校验、请求体上限与启动配置
+
+import json
+import asyncio
+
+import pytest
+
+from src.config import BOT_WEBHOOK_HOST
+from src.bot_handler import webhook_listen_config
+from src.webhook import SECRET_HEADER, WebhookServer
+
+PATH = "/telegram/webhook"
+UPDATE = {
+    "update_id": 1,
+    "message": {"message_id": 1, "date": 0, "chat": {"id": 1, "type": "private"}, "text": "/fgi"},
+}
+
+
+class FakeApp:
+    """只提供WebhookServer用到的 bot / update_queue"""
+
+    def __init__(self):
+        self.bot = None
+        self.update_queue = asyncio.Queue()
+
+
+async def _post(port, body, headers=None, path=PATH):
+    """发送一次POST，返回HTTP状态码"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    head = [f"POST {path} HTTP/1.1", "Host: test", f"Content-Length: {len(body)}", "Connection: close"]
+    head += [f"{k}: {v}" for k, v in (headers or {}).items()]
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    writer.close()
+    return status
+
+
+def _serve(scenario, secret_token=None, max_body=1024):
+    async def run():
+        app = FakeApp()
+        server = WebhookServer(app, "127.0.0.1", 0, PATH, secret_token=secret_token, max_body=max_body)
+        await server.start()
+        try:
+            return await scenario(server.port, app)
+        finally:
+            await server.stop()
+
+    return asyncio.run(run())
+
+
+def test_secret_is_required_when_configured():
+    body = json.dumps(UPDATE).encode()
+
+    async def scenario(port, app):
+        missing = await _post(port, body)
+        wrong = await _post(port, body, {SECRET_HEADER: "nope"})
+        ok = await _post(port, body, {SECRET_HEADER: "s3cret"})
+        return missing, wrong, ok, app.update_queue.qsize()
+
+    assert _serve(scenario, secret_token="s3cret") == (403, 403, 200, 1)
+
+
+def test_oversized_body_is_rejected_before_reading():
+    async def scenario(port, app):
+        too_large = await _post(port, b"x" * 2048)
+        wrong_path = await _post(port, b"{}", path="/other")
+        return too_large, wrong_path, app.update_queue.qsize()
+
+    assert _serve(scenario, max_body=1024) == (413, 404, 0)
+
+
+def test_public_url_without_secret_generates_one(monkeypatch):
+    monkeypatch.setenv("TELEGRAM_WEBHOOK_URL", "https://example.com")
+    monkeypatch.delenv("TELEGRAM_WEBHOOK_SECRET", raising=False)
+
+    host, secret, url = webhook_listen_config()
+    _, other, _ = webhook_listen_config()
+
+    assert url == "https://example.com"
+    assert host == BOT_WEBHOOK_HOST
+    assert secret and secret != other
+
+
+def test_no_url_and_no_secret_listens_on_loopback(monkeypatch):
+    monkeypatch.delenv("TELEGRAM_WEBHOOK_URL", raising=False)
+    monkeypatch.delenv("TELEGRAM_WEBHOOK_SECRET", raising=False)
+
+    assert webhook_listen_config() == ("127.0.0.1", None, None)
+
+
+@pytest.mark.parametrize("url", [None, "https://example.com"])
+def test_configured_secret_is_used(monkeypatch, url):
+    if url:
+        monkeypatch.setenv("TELEGRAM_WEBHOOK_URL", url)
+    else:
+        monkeypatch.delenv("TELEGRAM_WEBHOOK_URL", raising=False)
+    monkeypatch.setenv("TELEGRAM_WEBHOOK_SECRET", "s3cret")
+
+    assert webhook_listen_config() == (BOT_WEBHOOK_HOST, "s3cret", url)